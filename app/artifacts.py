@@ -0,0 +1,144 @@
+import hashlib
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from app.dims_and_facts import (
+    MultiDimDatabase,
+    ReducedDatabase,
+    create_orders_by_meal_type_age_cuisine_table,
+    reduce_table,
+)
+from app.lazy import LazyDatabase
+from app.snapshot import (
+    DEFAULT_SNAPSHOT_BUDGET,
+    DEFAULT_SNAPSHOT_DIR,
+    SnapshotStore,
+    _read_json,
+    _write_json,
+)
+
+# Directory holding the artifacts, unless a cache is given explicitly
+DEFAULT_ARTIFACT_DIR = DEFAULT_SNAPSHOT_DIR / "artifacts"
+
+# Bump whenever the functions producing the artifacts change, so that older
+# artifacts are not reused
+ARTIFACT_FORMAT_VERSION = 1
+
+_DEPENDENCIES_FILE = "dependencies.json"
+
+
+def content_digest(values) -> str:
+    """Digest of the dtype and the values of a series or an index."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(values.dtype).encode())
+    digest.update(pd.util.hash_pandas_object(values, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class ArtifactCache:
+    """Outputs of pure functions of the tables of a database, stored on disk.
+
+    The tables and columns an output reads are recorded when it is computed. It
+    is only computed again once the content of one of them has changed. Artifacts
+    are evicted, least recently used first, beyond `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        directory: Path = DEFAULT_ARTIFACT_DIR,
+        max_bytes: int = DEFAULT_SNAPSHOT_BUDGET,
+    ):
+        self.store = SnapshotStore(directory, max_bytes)
+
+    @property
+    def directory(self) -> Path:
+        return self.store.directory
+
+    def dependencies(self, name: str) -> Optional[Dict[str, List[str]]]:
+        """Columns of each table read when `name` was last computed."""
+        return _read_json(self.directory / _DEPENDENCIES_FILE).get(name)
+
+    def _record(self, name: str, dependencies: Dict[str, List[str]]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / _DEPENDENCIES_FILE
+        recorded = _read_json(path)
+        recorded[name] = dependencies
+        _write_json(path, recorded)
+
+    def key(self, name: str, db, dependencies: Dict[str, List[str]]) -> Optional[str]:
+        """Key of `name` computed from the `dependencies` in `db`, None when one of
+        them no longer exists."""
+        digests = []
+        for table, columns in sorted(dependencies.items()):
+            dataframe = getattr(db, table, None)
+            if dataframe is None or not set(columns) <= set(dataframe.columns):
+                return None
+            # The index is read by every lookup into the table
+            digests.append((table, None, content_digest(dataframe.index)))
+            digests.extend(
+                (table, column, content_digest(dataframe[column]))
+                for column in sorted(columns)
+            )
+        key = hashlib.blake2b(digest_size=16)
+        key.update(repr((ARTIFACT_FORMAT_VERSION, name, digests)).encode())
+        return key.hexdigest()
+
+    def get_or_compute(
+        self, name: str, db, compute: Callable[[LazyDatabase], pd.DataFrame]
+    ) -> pd.DataFrame:
+        """The `name` artifact of the namedtuple `db`, computed by `compute` unless
+        the columns it read last time are unchanged.
+
+        `compute` is handed a `LazyDatabase` over `db`, which records the columns
+        it selects with `[]`. Its result must be storable by `write_frame`: object
+        columns and categoricals of strings, no MultiIndex, else a ValueError is
+        raised.
+        """
+        dependencies = self.dependencies(name)
+        if dependencies is not None:
+            key = self.key(name, db, dependencies)
+            frames = self.store.load(key) if key is not None else None
+            if frames is not None:
+                return frames[name]
+
+        tracked = LazyDatabase(db._fields, lambda table: getattr(db, table))
+        artifact = pd.DataFrame(compute(tracked))
+        dependencies = tracked.used_columns
+        # Artifacts which cannot be stored raise before their dependencies are kept
+        self.store.save(self.key(name, db, dependencies), {name: artifact})
+        self._record(name, dependencies)
+        return artifact
+
+
+def cached_reduce_dims(
+    db: MultiDimDatabase, cache: Optional[ArtifactCache] = None
+) -> ReducedDatabase:
+    """`reduce_dims`, only reducing the tables whose inputs have changed."""
+    if cache is None:
+        cache = ArtifactCache()
+    return ReducedDatabase(
+        *(
+            cache.get_or_compute(
+                "reduce_dims." + table,
+                db,
+                lambda tracked, table=table: reduce_table(tracked, table),
+            )
+            for table in ReducedDatabase._fields
+        )
+    )
+
+
+def cached_orders_by_meal_type_age_cuisine_table(
+    db: ReducedDatabase, cache: Optional[ArtifactCache] = None
+) -> pd.DataFrame:
+    """`create_orders_by_meal_type_age_cuisine_table`, computed again only when
+    the columns of `db` it reads have changed."""
+    if cache is None:
+        cache = ArtifactCache()
+    return cache.get_or_compute(
+        "orders_by_meal_type_age_cuisine",
+        db,
+        create_orders_by_meal_type_age_cuisine_table,
+    )
@@ -0,0 +1,56 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from app.classify import NAT
+from app.join import key_positions, take
+from app.schema import BIRTHDATE_ID_FORMAT
+
+
+def birthdate_epochs(birthdates: pd.DataFrame) -> np.ndarray:
+    """Nanoseconds since the epoch of every row of the `birthdates` table.
+
+    Rows whose year, month and day do not form a valid date get `NAT`.
+    """
+    year = birthdates["year"].to_numpy(dtype=np.int64)
+    month = birthdates["month"].to_numpy(dtype=np.int64)
+    day = birthdates["day"].to_numpy(dtype=np.int64)
+
+    # Months since January 1970 are the integer form of datetime64[M]
+    months = (year - 1970) * 12 + month - 1
+    first_day = months.astype("datetime64[M]").astype("datetime64[D]")
+    next_first_day = (months + 1).astype("datetime64[M]").astype("datetime64[D]")
+    birthdate = first_day + (day - 1).astype("timedelta64[D]")
+
+    epochs = birthdate.astype("datetime64[ns]").view(np.int64)
+    invalid = (month < 1) | (month > 12) | (day < 1) | (birthdate >= next_first_day)
+    if invalid.any():
+        epochs[invalid] = NAT
+    return epochs
+
+
+def resolve_birthdates(
+    birthdate_ids: pd.Series, birthdates: Optional[pd.DataFrame] = None
+) -> np.ndarray:
+    """Birthdates as datetime64[ns], looked up by id in the `birthdates` table.
+
+    Ids missing from the table, or all of them without one, are parsed instead.
+    Integer surrogate ids can only be resolved through the table, else are NaT.
+    """
+    ids = np.asarray(birthdate_ids)
+    if ids.dtype.kind not in "iu":
+        ids = ids.astype(object, copy=False)
+    if birthdates is None:
+        positions = np.full(len(ids), -1, dtype=np.int64)
+        resolved = np.full(len(ids), NAT, dtype=np.int64)
+    else:
+        positions = key_positions(birthdates.index, ids)
+        resolved = take(birthdate_epochs(birthdates), positions, NAT)
+    resolved = resolved.view("datetime64[ns]")
+    unresolved = positions < 0
+    if unresolved.any() and ids.dtype == object:
+        resolved[unresolved] = pd.to_datetime(
+            ids[unresolved], format=BIRTHDATE_ID_FORMAT
+        ).to_numpy()
+    return resolved
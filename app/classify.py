@@ -0,0 +1,88 @@
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.join import key_positions, take
+
+# Nanoseconds in an hour and in a day
+_HOUR = 3_600 * 10**9
+_DAY = 24 * _HOUR
+
+# Labels of the meal types, indexed by the codes returned by `meal_type_codes`
+MEAL_TYPES = np.array(["dinner", "breakfast", "lunch"], dtype=object)
+
+# Bins over the nanoseconds since midnight, searched on their right side: breakfast
+# excludes both 6 am and 10 am, lunch includes both 10 am and 4 pm
+_MEAL_TYPE_EDGES = np.array([6 * _HOUR + 1, 10 * _HOUR, 16 * _HOUR + 1], dtype=np.int64)
+_MEAL_TYPE_BINS = np.array([0, 1, 2, 0], dtype=np.int8)
+
+# Labels of the user ages, indexed by the codes returned by `user_age_codes`, where
+# -1 stands for an unknown birthdate
+USER_AGES = np.array(["old", "adult", "young"], dtype=object)
+
+# Users born on these days or later are adults and young respectively
+_USER_AGE_EDGES = np.array(["1970-01-01", "1995-01-01"], dtype="datetime64[ns]").view(
+    np.int64
+)
+
+# Integer representation of NaT
+NAT = np.iinfo(np.int64).min
+
+
+def as_nanoseconds(values) -> np.ndarray:
+    """View timestamps as int64 nanoseconds since the epoch, NaT becomes `NAT`."""
+    return np.asarray(values, dtype="datetime64[ns]").view(np.int64)
+
+
+def meal_type_codes(ordered_at: np.ndarray) -> np.ndarray:
+    time_of_day = np.mod(ordered_at, _DAY)
+    return _MEAL_TYPE_BINS[np.searchsorted(_MEAL_TYPE_EDGES, time_of_day, side="right")]
+
+
+def user_age_codes(birthdate: np.ndarray) -> np.ndarray:
+    codes = np.searchsorted(_USER_AGE_EDGES, birthdate, side="right").astype(np.int8)
+    # NaT, the smallest int64, would otherwise end up as "old"
+    codes[birthdate == NAT] = -1
+    return codes
+
+
+def gather_labels(labels: np.ndarray, positions: np.ndarray, categorical: bool = False):
+    """Gather `labels` at `positions` as objects, or as a categorical sharing them."""
+    if categorical:
+        codes, uniques = pd.factorize(labels)
+        return pd.Categorical.from_codes(take(codes, positions, -1), uniques)
+    return take(labels, positions, np.nan)
+
+
+def classify_order_codes(
+    orders: pd.DataFrame, users: pd.DataFrame, food: pd.DataFrame
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Meal type and user age codes of `orders` and the positions of their food."""
+    user_positions = key_positions(users.index, orders["user_id"].to_numpy())
+    food_positions = key_positions(food.index, orders["food_id"].to_numpy())
+    birthdate = take(as_nanoseconds(users["birthdate"]), user_positions, NAT)
+    return (
+        meal_type_codes(as_nanoseconds(orders["ordered_at"])),
+        user_age_codes(birthdate),
+        food_positions,
+    )
+
+
+def classify_orders(
+    orders: pd.DataFrame,
+    users: pd.DataFrame,
+    food: pd.DataFrame,
+    categorical: bool = False,
+) -> pd.DataFrame:
+    meal_types, user_ages, food_positions = classify_order_codes(orders, users, food)
+    return pd.DataFrame(
+        {
+            "meal_type": gather_labels(MEAL_TYPES, meal_types, categorical),
+            "user_age": gather_labels(USER_AGES, user_ages, categorical),
+            "food_cuisine": gather_labels(
+                food["cuisine"].to_numpy(dtype=object), food_positions, categorical
+            ),
+        },
+        index=orders.index,
+    )
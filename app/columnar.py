@@ -0,0 +1,142 @@
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from app.dims_and_facts import ReducedDatabase
+
+# Name of the file describing the columns of a stored frame
+MANIFEST_FILE = "manifest.json"
+
+
+def _codes_dtype(categories: int) -> np.dtype:
+    # The width pandas picks for the codes of a categorical, so they are not copied
+    for dtype in (np.int8, np.int16, np.int32):
+        if categories < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def _write_column(directory: Path, name: str, values: pd.Series) -> dict:
+    column = {"encoding": "dictionary", "dtype": str(values.dtype)}
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+        column["ordered"] = bool(values.cat.ordered)
+    elif values.dtype == object:
+        # Strings are dictionary-encoded, missing values get the -1 code
+        codes, uniques = pd.factorize(values)
+    elif isinstance(values.dtype, np.dtype):
+        np.save(directory / (name + ".npy"), values.to_numpy())
+        return {"encoding": "plain", "dtype": str(values.dtype)}
+    else:
+        raise ValueError(
+            "Column %r of dtype %s cannot be stored" % (values.name, values.dtype)
+        )
+    # The dictionary is read back as strings, other values would not round-trip
+    if pd.api.types.infer_dtype(uniques, skipna=True) not in ("string", "empty"):
+        raise ValueError(
+            "Column %r of dtype %s holds values other than strings"
+            % (values.name, values.dtype)
+        )
+    np.save(directory / (name + ".npy"), codes.astype(_codes_dtype(len(uniques))))
+    np.save(directory / (name + ".dict.npy"), np.asarray(uniques, dtype=str))
+    return column
+
+
+def _read_column(
+    directory: Path, name: str, column: dict, mmap_mode: Optional[str] = None
+):
+    values = np.load(directory / (name + ".npy"), mmap_mode=mmap_mode)
+    if column["encoding"] == "dictionary":
+        uniques = np.load(directory / (name + ".dict.npy")).astype(object)
+        if column["dtype"] == "category" or (mmap_mode and name != "index"):
+            # The categorical keeps the stored codes as they are
+            return pd.Categorical.from_codes(
+                values, uniques, ordered=column.get("ordered", False)
+            )
+        # Code -1 picks the trailing NaN
+        return np.append(uniques, np.nan)[values]
+    return values
+
+
+def write_frame(dataframe: pd.DataFrame, directory: Path) -> int:
+    """Store every column of `dataframe` as a separate .npy file in `directory`.
+
+    Columns and the index hold NumPy dtypes, or strings in object columns and
+    categoricals. Anything else, a MultiIndex included, raises a ValueError.
+    """
+    if dataframe.index.nlevels > 1 or dataframe.columns.nlevels > 1:
+        raise ValueError("Frames with a MultiIndex cannot be stored")
+    directory.mkdir(parents=True, exist_ok=True)
+    index = _write_column(directory, "index", dataframe.index.to_series())
+    index["name"] = dataframe.index.name
+    columns = []
+    for position, name in enumerate(dataframe.columns):
+        column = _write_column(directory, str(position), dataframe[name])
+        column["name"] = name
+        columns.append(column)
+    manifest = {"rows": len(dataframe), "index": index, "columns": columns}
+    (directory / MANIFEST_FILE).write_text(json.dumps(manifest))
+    return sum(path.stat().st_size for path in directory.iterdir())
+
+
+def read_frame(directory: Path, mmap: bool = False) -> pd.DataFrame:
+    """Read a frame stored by `write_frame`.
+
+    With `mmap` the columns are read-only views of the memory-mapped files, so
+    processes opening the same frame share its pages. String columns are then
+    returned as categoricals over the stored codes instead of being decoded.
+    """
+    mmap_mode = "r" if mmap else None
+    manifest = json.loads((directory / MANIFEST_FILE).read_text())
+    index = pd.Index(
+        _read_column(directory, "index", manifest["index"], mmap_mode),
+        name=manifest["index"]["name"],
+        copy=False,
+    )
+    # Without a copy columns are not consolidated into blocks, they stay views
+    return pd.DataFrame(
+        {
+            column["name"]: _read_column(directory, str(position), column, mmap_mode)
+            for position, column in enumerate(manifest["columns"])
+        },
+        index=index,
+        columns=[column["name"] for column in manifest["columns"]],
+        copy=False,
+    )
+
+
+def write_reduced_database(db: ReducedDatabase, directory: Path) -> int:
+    """Store every table of `db` in a subdirectory of `directory`, returns the size.
+
+    The previous content of `directory` is moved aside and the new one renamed in
+    right after, before the old files are deleted, so the store is only missing
+    between two renames. Readers which still have the old files mapped keep their
+    pages.
+    """
+    directory = Path(directory)
+    temporary_path = directory.with_name(".%s.%d.tmp" % (directory.name, os.getpid()))
+    shutil.rmtree(temporary_path, ignore_errors=True)
+    size = sum(
+        write_frame(getattr(db, table), temporary_path / table)
+        for table in ReducedDatabase._fields
+    )
+    stale_path = temporary_path.with_suffix(".old")
+    shutil.rmtree(stale_path, ignore_errors=True)
+    if directory.exists():
+        os.rename(directory, stale_path)
+    os.rename(temporary_path, directory)
+    shutil.rmtree(stale_path, ignore_errors=True)
+    return size
+
+
+def open_reduced_database(directory: Path, mmap: bool = True) -> ReducedDatabase:
+    """Open a database stored by `write_reduced_database` without parsing it."""
+    directory = Path(directory)
+    return ReducedDatabase(
+        *(read_frame(directory / table, mmap) for table in ReducedDatabase._fields)
+    )
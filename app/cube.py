@@ -0,0 +1,160 @@
+from collections import namedtuple
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.classify import MEAL_TYPES, USER_AGES, classify_order_codes
+from app.join import key_positions, take
+from app.dims_and_facts import ReducedDatabase
+
+# Dimensions of the cube, in the order of the axes of its cells
+CUBE_DIMENSIONS = ["meal_type", "user_age", "food_cuisine"]
+
+# Aggregates of the orders in every cell of the cube, the last position along each
+# axis holds the subtotal over all labels of that dimension
+OrdersCube = namedtuple("OrdersCube", ["labels", "orders", "revenue"])
+
+# Aggregates of a single cell
+CubeCell = namedtuple("CubeCell", ["orders", "revenue"])
+
+
+def _with_subtotals(cells: np.ndarray) -> np.ndarray:
+    for axis in range(cells.ndim):
+        cells = np.concatenate([cells, cells.sum(axis=axis, keepdims=True)], axis)
+    return cells
+
+
+def _without_subtotals(cells: np.ndarray) -> np.ndarray:
+    return cells[(slice(-1),) * cells.ndim]
+
+
+def order_revenue(db: ReducedDatabase, food_positions: np.ndarray) -> np.ndarray:
+    """Price of the food of each order minus its promo discount, 0 for unknown food."""
+    price = take(db.food["price"].to_numpy(dtype=np.float64), food_positions, 0.0)
+    promo_positions = key_positions(
+        db.promos.index, db.orders["promo_id"].to_numpy(dtype=object)
+    )
+    discount = take(
+        db.promos["discount"].to_numpy(dtype=np.float64), promo_positions, 0.0
+    )
+    return price * (1 - discount)
+
+
+def build_cube(db: ReducedDatabase) -> OrdersCube:
+    """Aggregate the orders of `db` by meal type, user age and cuisine.
+
+    Orders of unknown food are counted under a NaN cuisine, orders of users
+    without a known birthdate under a NaN user age.
+    """
+    meal_types, user_ages, food_positions = classify_order_codes(
+        db.orders, db.users, db.food
+    )
+    user_age_labels = np.append(USER_AGES, np.nan)
+    user_ages[user_ages < 0] = len(user_age_labels) - 1
+    cuisine_codes, cuisines = pd.factorize(db.food["cuisine"].to_numpy(dtype=object))
+    cuisines = np.append(cuisines.astype(object), np.nan)
+    # Food without a cuisine and unknown food share the trailing NaN label
+    cuisine = take(cuisine_codes, food_positions, -1)
+    cuisine[cuisine < 0] = len(cuisines) - 1
+
+    labels = [pd.Index(MEAL_TYPES), pd.Index(user_age_labels), pd.Index(cuisines)]
+    shape = tuple(len(axis_labels) for axis_labels in labels)
+    cells = np.ravel_multi_index((meal_types, user_ages, cuisine), shape)
+    size = int(np.prod(shape))
+    orders = np.bincount(cells, minlength=size).reshape(shape)
+    revenue = np.bincount(
+        cells, weights=order_revenue(db, food_positions), minlength=size
+    ).reshape(shape)
+    return OrdersCube(
+        labels=dict(zip(CUBE_DIMENSIONS, labels)),
+        orders=_with_subtotals(orders),
+        revenue=_with_subtotals(revenue),
+    )
+
+
+def _position(cube: OrdersCube, dimension: str, label) -> Optional[int]:
+    axis_labels = cube.labels[dimension]
+    if label not in axis_labels:
+        return None
+    return axis_labels.get_loc(label)
+
+
+def query_cube(cube: OrdersCube, **selection) -> CubeCell:
+    """Aggregates of the orders matching `selection`, e.g. `meal_type="dinner"`.
+
+    Dimensions left out of `selection` are rolled up.
+    """
+    unknown = set(selection) - set(CUBE_DIMENSIONS)
+    if unknown:
+        raise ValueError("Unknown cube dimensions: %s" % ", ".join(sorted(unknown)))
+    cell = []
+    for dimension in CUBE_DIMENSIONS:
+        if dimension not in selection:
+            cell.append(-1)
+            continue
+        position = _position(cube, dimension, selection[dimension])
+        if position is None:
+            return CubeCell(orders=0, revenue=0.0)
+        cell.append(position)
+    cell = tuple(cell)
+    return CubeCell(orders=int(cube.orders[cell]), revenue=float(cube.revenue[cell]))
+
+
+def rollup(cube: OrdersCube, by: List[str], **selection) -> pd.DataFrame:
+    """Aggregates grouped by the dimensions `by`, the others filtered by `selection`.
+
+    The result has a row per combination of labels of `by`, without subtotals.
+    """
+    overlap = set(by) & set(selection)
+    if overlap:
+        raise ValueError("Dimensions both grouped and selected: %s" % overlap)
+    groups = [cube.labels[dimension] for dimension in by]
+    index = pd.MultiIndex.from_product(groups, names=by)
+    orders = np.empty(len(index), dtype=np.int64)
+    revenue = np.empty(len(index), dtype=np.float64)
+    for row, combination in enumerate(index):
+        cell = query_cube(cube, **dict(zip(by, combination)), **selection)
+        orders[row], revenue[row] = cell
+    if len(by) == 1:
+        index = index.get_level_values(0)
+    return pd.DataFrame({"orders": orders, "revenue": revenue}, index=index)
+
+
+def merge_cubes(left: OrdersCube, right: OrdersCube) -> OrdersCube:
+    """Cube of the orders of both `left` and `right`, labels are unioned."""
+    labels = {
+        dimension: left.labels[dimension].append(
+            right.labels[dimension].difference(left.labels[dimension], sort=False)
+        )
+        for dimension in CUBE_DIMENSIONS
+    }
+    shape = tuple(len(labels[dimension]) for dimension in CUBE_DIMENSIONS)
+
+    def aligned(cube: OrdersCube, cells: np.ndarray) -> np.ndarray:
+        positions = np.ix_(
+            *(
+                labels[dimension].get_indexer(cube.labels[dimension])
+                for dimension in CUBE_DIMENSIONS
+            )
+        )
+        result = np.zeros(shape, dtype=cells.dtype)
+        result[positions] = _without_subtotals(cells)
+        return result
+
+    return OrdersCube(
+        labels=labels,
+        orders=_with_subtotals(
+            aligned(left, left.orders) + aligned(right, right.orders)
+        ),
+        revenue=_with_subtotals(
+            aligned(left, left.revenue) + aligned(right, right.revenue)
+        ),
+    )
+
+
+def update_cube(
+    cube: OrdersCube, db: ReducedDatabase, new_orders: pd.DataFrame
+) -> OrdersCube:
+    """Add `new_orders`, joined to the dimensions of `db`, to `cube`."""
+    return merge_cubes(cube, build_cube(db._replace(orders=new_orders)))
@@ -0,0 +1,199 @@
+from collections import namedtuple
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.classify import MEAL_TYPES, USER_AGES, gather_labels
+from app.dims_and_facts import ReducedDatabase
+from app.join import join
+from app.metrics import stage
+from app.pushdown import OrdersPredicate
+from app.streaming import DEFAULT_CHUNKSIZE, iter_reduced_orders, load_dimensions
+
+# Column of a derived table. `source` is a column of the orders, or "<table>.<column>"
+# of a dimension joined through the foreign key of the orders. `transform` names
+# an entry of `TRANSFORMS` applied to it first. With `edges`, value `v` gets the
+# label `labels[i]` where `edges[i - 1] <= v < edges[i]` (`<` and `<=` swapped
+# when `right`), else the values are the labels. Missing values get `fill`.
+DerivedColumn = namedtuple(
+    "DerivedColumn",
+    ["source", "transform", "edges", "labels", "right", "fill"],
+    defaults=[None, None, None, False, None],
+)
+
+# Table with a row per order and a column per `DerivedColumn` of `columns`
+DerivedTable = namedtuple("DerivedTable", ["name", "columns"])
+
+# Foreign key of the orders through which each dimension is joined
+JOIN_KEYS = {
+    "users": "user_id",
+    "food": "food_id",
+    "promos": "promo_id",
+    "restaurants": "restaurant_id",
+    "addresses": "address_id",
+}
+
+# Transforms of source columns, by the name used in `DerivedColumn.transform`
+TRANSFORMS = {
+    "time_of_day": lambda values: values - values.dt.floor("D"),
+    "hour": lambda values: values.dt.hour,
+    "day_of_week": lambda values: values.dt.day_name(),
+    "month": lambda values: values.dt.strftime("%Y-%m"),
+}
+
+# The table of `create_orders_by_meal_type_age_cuisine_table`, as a derivation
+ORDERS_BY_MEAL_TYPE_AGE_CUISINE = DerivedTable(
+    name="orders_by_meal_type_age_cuisine",
+    columns={
+        "meal_type": DerivedColumn(
+            source="ordered_at",
+            transform="time_of_day",
+            # Same bins as `app.classify`
+            edges=pd.to_timedelta(
+                ["06:00:00.000000001", "10:00:00", "16:00:00.000000001"]
+            ),
+            labels=[MEAL_TYPES[0], MEAL_TYPES[1], MEAL_TYPES[2], MEAL_TYPES[0]],
+        ),
+        "user_age": DerivedColumn(
+            source="users.birthdate",
+            edges=["1970-01-01", "1995-01-01"],
+            labels=list(USER_AGES),
+        ),
+        "food_cuisine": DerivedColumn(source="food.cuisine"),
+    },
+)
+
+
+def _check_column(name: str, column: DerivedColumn) -> DerivedColumn:
+    # `edges` split the values into one more bucket than there are edges
+    if column.edges is not None and (
+        column.labels is None or len(column.labels) != len(column.edges) + 1
+    ):
+        raise ValueError(
+            "Column %s needs %d labels for its %d edges"
+            % (name, len(column.edges) + 1, len(column.edges))
+        )
+    return column
+
+
+def derivations_from_config(config: Dict[str, Dict[str, dict]]) -> List[DerivedTable]:
+    """Derived tables from a mapping of table names to columns to the fields of
+    their `DerivedColumn`, e.g. as read from a JSON file."""
+    return [
+        DerivedTable(
+            name=name,
+            columns={
+                column: _check_column(column, DerivedColumn(**options))
+                for column, options in columns.items()
+            },
+        )
+        for name, columns in config.items()
+    ]
+
+
+def _source_values(db: ReducedDatabase, sources: List[str]) -> Dict[str, pd.Series]:
+    columns_by_table = {}
+    for source in sources:
+        table, _, column = source.rpartition(".")
+        columns_by_table.setdefault(table, []).append(column)
+    values = {}
+    for table, columns in columns_by_table.items():
+        if table:
+            # Each dimension is joined once, for all of its columns
+            frame, _ = join(db.orders, JOIN_KEYS[table], getattr(db, table), columns)
+        else:
+            frame = db.orders
+        for column in columns:
+            values[table + "." + column if table else column] = frame[column]
+    return values
+
+
+def _as_edges(edges, values: pd.Series) -> np.ndarray:
+    # NumPy does not parse strings such as "06:00:00" into timedeltas, pandas does
+    if values.dtype.kind == "m":
+        return np.asarray(pd.to_timedelta(edges), dtype=values.dtype)
+    if values.dtype.kind == "M":
+        return np.asarray(pd.to_datetime(edges), dtype=values.dtype)
+    return np.asarray(edges)
+
+
+def _derive_column(values: pd.Series, column: DerivedColumn, categorical: bool):
+    missing = values.isna().to_numpy()
+    if column.edges is None:
+        codes, labels = pd.factorize(values.to_numpy(dtype=object))
+        labels = labels.astype(object)
+    else:
+        labels = np.asarray(column.labels, dtype=object)
+        codes = np.searchsorted(
+            _as_edges(column.edges, values),
+            values.to_numpy(),
+            side="left" if column.right else "right",
+        )
+        codes[missing] = -1
+    if column.fill is not None and missing.any():
+        codes[missing] = len(labels)
+        labels = np.append(labels, np.array([column.fill], dtype=object))
+    return gather_labels(labels, codes, categorical)
+
+
+def _column_key(column: DerivedColumn) -> tuple:
+    return column._replace(
+        edges=None if column.edges is None else tuple(column.edges),
+        labels=None if column.labels is None else tuple(column.labels),
+    )
+
+
+def derive_tables(
+    db: ReducedDatabase, derivations: List[DerivedTable], categorical: bool = False
+) -> Dict[str, pd.DataFrame]:
+    """Build every table of `derivations` from the orders of `db`, sorted by order.
+
+    The joins, transforms and bucketings shared between the derivations are only
+    computed once.
+    """
+    with stage("derive_tables", "orders") as metrics:
+        orders = db.orders
+        if not orders.index.is_monotonic_increasing:
+            db = db._replace(orders=orders.sort_index())
+        sources = {
+            column.source
+            for derivation in derivations
+            for column in derivation.columns.values()
+        }
+        values = _source_values(db, sorted(sources))
+        transformed = {}
+        derived = {}
+        tables = {}
+        for derivation in derivations:
+            data = {}
+            for name, column in derivation.columns.items():
+                key = _column_key(_check_column(name, column))
+                if key not in derived:
+                    source = (column.source, column.transform)
+                    if source not in transformed:
+                        transformed[source] = values[column.source]
+                        if column.transform is not None:
+                            transformed[source] = TRANSFORMS[column.transform](
+                                transformed[source]
+                            )
+                    derived[key] = _derive_column(
+                        transformed[source], column, categorical
+                    )
+                data[name] = derived[key]
+            tables[derivation.name] = pd.DataFrame(data, index=db.orders.index)
+        metrics.rows(len(orders), len(db.orders))
+    return tables
+
+
+def iter_derived_tables(
+    tables_dir_path: Path,
+    derivations: List[DerivedTable],
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    predicate: Optional[OrdersPredicate] = None,
+) -> Iterator[Dict[str, pd.DataFrame]]:
+    """`derive_tables` over one chunk of the orders at a time."""
+    dimensions = load_dimensions(tables_dir_path)
+    for orders in iter_reduced_orders(tables_dir_path, chunksize, predicate):
+        yield derive_tables(dimensions._replace(orders=orders), derivations)
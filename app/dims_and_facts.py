@@ -1,10 +1,35 @@
+import os
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import List
+from typing import Callable, Iterator, List, Optional
 
 import numpy as np
 import pandas as pd
-import random
+
+from app.birthdates import resolve_birthdates
+from app.classify import classify_orders, gather_labels
+from app.geography import resolve_addresses
+from app.join import key_positions
+from app.metrics import stage
+from app.partitions import Partition, discover_partitions
+from app.schema import (
+    COMPACT_COLUMNS,
+    REDUCE_DIMS_SOURCE_COLUMNS,
+    REDUCED_TABLE_SCHEMAS,
+    TABLE_SCHEMAS,
+    TableSchema,
+    column_dtypes,
+    column_names,
+)
+from app.violations import IntegrityError, check_policy, missing_value_violations
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:
+    pa = pa_csv = None
 
 # List of all tables used in the original database
 TABLES = [
@@ -49,187 +74,443 @@ ReducedDatabase = namedtuple(
 )
 
 
+# Default size of the thread pool used by `load_tables_concurrently`
+LOAD_MAX_WORKERS = min(len(TABLES), os.cpu_count() or 1)
+
+# Arrow counterparts of the column types declared in the schema registry
+_ARROW_TYPES = (
+    {
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+        "object": pa.string(),
+        "datetime64[ns]": pa.timestamp("ns"),
+    }
+    if pa is not None
+    else {}
+)
+
+
+# Compressions of CSV files which the pyarrow reader cannot decompress, by suffix
+_PANDAS_ONLY_SUFFIXES = {".xz"}
+
+
+def _arrow_can_read(file_paths: List[Path]) -> bool:
+    return pa_csv is not None and not any(
+        file_path.suffix in _PANDAS_ONLY_SUFFIXES for file_path in file_paths
+    )
+
+
+def _read_arrow_table(file_path: Path, schema: TableSchema, usecols: List[str]):
+    dtypes = column_dtypes(schema)
+    convert_options = pa_csv.ConvertOptions(
+        column_types={name: _ARROW_TYPES[dtypes[name]] for name in usecols},
+        include_columns=usecols,
+        strings_can_be_null=True,
+        timestamp_parsers=sorted(set(schema.date_formats.values())) or None,
+    )
+    return pa_csv.read_csv(file_path, convert_options=convert_options)
+
+
+def _read_csv_with_pyarrow(
+    file_paths: List[Path], schema: TableSchema, usecols: List[str]
+) -> pd.DataFrame:
+    if len(file_paths) == 1:
+        table = _read_arrow_table(file_paths[0], schema, usecols)
+    else:
+        with ThreadPoolExecutor(max_workers=LOAD_MAX_WORKERS) as executor:
+            tables = executor.map(
+                lambda file_path: _read_arrow_table(file_path, schema, usecols),
+                file_paths,
+            )
+            # Concatenating Arrow tables only chains their chunks, the single copy
+            # is made by the conversion to pandas
+            table = pa.concat_tables(list(tables))
+    dataframe = table.to_pandas()
+    dataframe.set_index(schema.index, inplace=True)
+    return dataframe
+
+
+def _pandas_read_options(schema: TableSchema, usecols: List[str]) -> dict:
+    dtypes = column_dtypes(schema)
+    # Integer columns may hold blanks, they are read as nullable integers and cast
+    # back by `_restore_dtypes` once the incomplete rows are dropped
+    dtypes.update({name: "Int64" for name in usecols[1:] if dtypes[name] == "int64"})
+    return {
+        "usecols": usecols,
+        "index_col": schema.index,
+        "dtype": {
+            name: dtypes[name] for name in usecols if name not in schema.date_formats
+        },
+    }
+
+
+def _parse_dates(dataframe: pd.DataFrame, schema: TableSchema) -> pd.DataFrame:
+    for name, date_format in schema.date_formats.items():
+        if name in dataframe.columns:
+            dataframe[name] = pd.to_datetime(dataframe[name], format=date_format)
+    return dataframe
+
+
+def _read_csv_file_with_pandas(
+    file_path: Path, schema: TableSchema, usecols: List[str]
+) -> pd.DataFrame:
+    dataframe = pd.read_csv(file_path, **_pandas_read_options(schema, usecols))
+    return _parse_dates(dataframe, schema)
+
+
+def _read_csv_with_pandas(
+    file_paths: List[Path], schema: TableSchema, usecols: List[str]
+) -> pd.DataFrame:
+    if len(file_paths) == 1:
+        return _read_csv_file_with_pandas(file_paths[0], schema, usecols)
+    with ThreadPoolExecutor(max_workers=LOAD_MAX_WORKERS) as executor:
+        dataframes = executor.map(
+            lambda file_path: _read_csv_file_with_pandas(file_path, schema, usecols),
+            file_paths,
+        )
+        return pd.concat(list(dataframes))
+
+
+def empty_table(table: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """`table` without rows, as `read_table` would return it."""
+    schema = TABLE_SCHEMAS[table]
+    dtypes = column_dtypes(schema)
+    return pd.DataFrame(
+        {name: pd.Series(dtype=dtypes[name]) for name in _usecols(schema, columns)}
+    ).set_index(schema.index)
+
+
+def table_files(
+    tables_dir_path: Path,
+    table: str,
+    partition_filter: Optional[Callable[[List[Partition]], List[Partition]]] = None,
+) -> List[Path]:
+    """CSV files holding `table`, either `<table>.csv` or the data files of a
+    partitioned `<table>/` directory, optionally narrowed by `partition_filter`."""
+    file_path = tables_dir_path / (table + ".csv")
+    table_path = tables_dir_path / table
+    if file_path.exists() or not table_path.is_dir():
+        return [file_path]
+    partitions = discover_partitions(table_path)
+    if partition_filter is not None:
+        partitions = partition_filter(partitions)
+    return [partition.path for partition in partitions]
+
+
+def _usecols(schema: TableSchema, columns: Optional[List[str]]) -> List[str]:
+    if columns is None:
+        columns = column_names(schema)
+    # Keep the file order of the columns, whatever order they were requested in
+    return [schema.index] + [name for name in column_names(schema) if name in columns]
+
+
+def _apply_policy(
+    dataframe: pd.DataFrame, table: str, schema: TableSchema, policy: str
+) -> pd.DataFrame:
+    # Rows missing a required value are handled as by `app.integrity`
+    invalid, violations = missing_value_violations(table, dataframe, schema)
+    if not violations:
+        return dataframe
+    if policy == "fail":
+        raise IntegrityError(violations)
+    if policy == "drop":
+        dataframe = dataframe[~invalid]
+    return dataframe
+
+
+def _normalise_missing(
+    dataframe: pd.DataFrame, schema: TableSchema, usecols: List[str]
+) -> pd.DataFrame:
+    # pyarrow yields None for missing strings where pandas yields NaN, every reader
+    # returns NaN
+    dtypes = column_dtypes(schema)
+    for name in usecols[1:]:
+        if dtypes[name] != "object" or dataframe[name].dtype != object:
+            continue
+        values = dataframe[name].to_numpy()
+        missing = pd.isna(values)
+        if missing.any():
+            values = values.copy()
+            values[missing] = np.nan
+            dataframe[name] = values
+    return dataframe
+
+
+def _restore_dtypes(
+    dataframe: pd.DataFrame, schema: TableSchema, usecols: List[str]
+) -> pd.DataFrame:
+    # Integer columns come back as floats (pyarrow) or nullable integers (pandas)
+    # when the file holds blanks in them, they stay nullable while blanks are kept
+    dtypes = column_dtypes(schema)
+    cast = {
+        name: "Int64" if dataframe[name].isna().any() else "int64"
+        for name in usecols[1:]
+        if dtypes[name] == "int64" and dataframe[name].dtype != "int64"
+    }
+    if cast:
+        dataframe = dataframe.astype(cast)
+    return dataframe
+
+
+def read_table(
+    tables_dir_path: Path,
+    table: str,
+    columns: Optional[List[str]] = None,
+    policy: str = "drop",
+) -> pd.DataFrame:
+    """Read `table` with the types of its schema.
+
+    Rows missing a required value are reported, dropped or fail the read according
+    to `policy`, one of the `INTEGRITY_POLICIES`. Integer columns keeping such rows
+    are nullable `Int64` columns.
+    """
+    check_policy(policy)
+    schema = TABLE_SCHEMAS.get(table)
+    if schema is None:
+        return pd.read_csv(tables_dir_path / (table + ".csv"))
+
+    usecols = _usecols(schema, columns)
+    file_paths = table_files(tables_dir_path, table)
+    with stage("read_table", table) as metrics:
+        if not file_paths:
+            dataframe = empty_table(table, columns)
+        elif _arrow_can_read(file_paths):
+            dataframe = _read_csv_with_pyarrow(file_paths, schema, usecols)
+        else:
+            dataframe = _read_csv_with_pandas(file_paths, schema, usecols)
+        dataframe = _normalise_missing(dataframe, schema, usecols)
+        rows_in = len(dataframe)
+        dataframe = _apply_policy(dataframe, table, schema, policy)
+        dataframe = _restore_dtypes(dataframe, schema, usecols)
+        metrics.rows(rows_in, len(dataframe))
+    return dataframe
+
+
+def iter_file_chunks(
+    file_path: Path,
+    table: str,
+    chunksize: int,
+    columns: Optional[List[str]] = None,
+    policy: str = "drop",
+) -> Iterator[pd.DataFrame]:
+    check_policy(policy)
+    schema = TABLE_SCHEMAS[table]
+    usecols = _usecols(schema, columns)
+    with pd.read_csv(
+        file_path, chunksize=chunksize, **_pandas_read_options(schema, usecols)
+    ) as reader:
+        for chunk in reader:
+            chunk = _parse_dates(chunk, schema)
+            chunk = _apply_policy(chunk, table, schema, policy)
+            yield _restore_dtypes(chunk, schema, usecols)
+
+
+def iter_table_chunks(
+    tables_dir_path: Path,
+    table: str,
+    chunksize: int,
+    columns: Optional[List[str]] = None,
+    policy: str = "drop",
+) -> Iterator[pd.DataFrame]:
+    """Chunks of at most `chunksize` rows of `table`, a file at a time."""
+    file_paths = table_files(tables_dir_path, table)
+    if not file_paths:
+        yield empty_table(table, columns)
+    for file_path in file_paths:
+        yield from iter_file_chunks(file_path, table, chunksize, columns, policy)
+
+
+def load_tables_concurrently(
+    tables_dir_path: Path,
+    tables: List[str],
+    max_workers: Optional[int] = None,
+    policy: str = "drop",
+) -> List[pd.DataFrame]:
+    if max_workers is None:
+        max_workers = LOAD_MAX_WORKERS
+    read = partial(read_table, tables_dir_path, policy=policy)
+    with stage("load_tables"):
+        if max_workers <= 1 or len(tables) <= 1:
+            return [read(table) for table in tables]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(tables))) as executor:
+            return list(executor.map(read, tables))
+
+
+def load_tables_for_reduce_dims(tables_dir_path: Path) -> MultiDimDatabase:
+    with ThreadPoolExecutor(max_workers=LOAD_MAX_WORKERS) as executor:
+        tables = executor.map(
+            lambda table: read_table(
+                tables_dir_path, table, REDUCE_DIMS_SOURCE_COLUMNS[table]
+            ),
+            TABLES,
+        )
+        return MultiDimDatabase(*tables)
+
+
 # --- Task #1 ---
 def load_tables(tables_dir_path: Path, tables: List[str]) -> List[pd.DataFrame]:
-    dataframes = []
-    # Crear un diccionario con los nombres de las tablas y sus índices correspondientes
-    table_indices = {
-        'addresses': 'address_id',
-        'birthdates': 'birthdate_id',
-        'cities': 'city_id',
-        'countries': 'country_id',
-        'cuisines': 'cuisine_id',
-        'districts': 'district_id',
-        'food': 'food_id',
-        'orders': 'order_id',
-        'promos': 'promo_id',
-        'restaurants': 'restaurant_id',
-        'states': 'state_id',
-        'users': 'user_id'
+    return load_tables_concurrently(tables_dir_path, tables)
+
+
+def _is_surrogate(values, dtype: str) -> bool:
+    # String keys replaced by integer surrogates (see `app.surrogate`) stay integers
+    return dtype == "object" and values.dtype.kind in "iu"
+
+
+def _conform(
+    dataframe: pd.DataFrame, schema: TableSchema, categorical: List[str] = ()
+) -> pd.DataFrame:
+    dtypes = {
+        name: dtype
+        for name, dtype in schema.columns
+        if not _is_surrogate(dataframe[name], dtype)
     }
-    for table in tables:
-        file_path = tables_dir_path / (table + ".csv")
-        dataframe = pd.read_csv(file_path)
-        index_col = table_indices.get(table)
-        if index_col:
-            dataframe = dataframe.set_index(index_col)
-        if table == 'orders':
-            dataframe = dataframe.dropna(subset=['promo_id'])
+    dtypes.update(dict.fromkeys(categorical, "category"))
+    dataframe = dataframe[column_names(schema)].astype(dtypes)
+    if not _is_surrogate(dataframe.index, schema.index_dtype):
+        dataframe.index = dataframe.index.astype(schema.index_dtype)
+    dataframe.index.name = schema.index
+    return dataframe
 
-        dataframe = dataframe.dropna()
-        dataframes.append(dataframe)
-    return dataframes
 
+def _compact_columns(table: str, compact: bool) -> List[str]:
+    return COMPACT_COLUMNS.get(table, []) if compact else []
 
 
-# --- Task # 2 ---
-def reduce_dims(db: MultiDimDatabase) -> ReducedDatabase:
-    reduced_users = db.users[["first_name", "last_name", "birthdate_id", "registred_at"]].copy()
-    reduced_food = db.food[["name", "cuisine_id", "price"]].copy()
-    reduced_promos = db.promos[["discount"]].copy()
-    reduced_addresses = db.addresses[["district_id", "street"]].copy()
-    reduced_restaurants = db.restaurants[["name", "address_id"]].copy()
-    reduced_orders = db.orders[["user_id", "address_id", "restaurant_id", "food_id", "ordered_at", "promo_id"]].copy()
-
-    reduced_users = reduced_users.astype({
-        "first_name": np.object,
-        "last_name": np.object,
-        "birthdate_id": np.object,
-        "registred_at": "datetime64[ns]"
-    })
-
-    reduced_food = reduced_food.astype({
-        "name": np.object,
-        "cuisine_id": np.object,
-        "price": np.float64
-    })
-    reduced_promos = reduced_promos.astype({
-        "discount": np.float64
-    })
-    reduced_addresses = reduced_addresses.astype({
-        "district_id": np.object,
-        "street": np.object
-        # "city": np.object,
-        # "country": np.object,
-        # "district": np.object,
-        # "state": np.object,
-        # "street": np.object
-    })
-    reduced_restaurants = reduced_restaurants.astype({
-        "name": np.object,
-        "address_id": np.int64
-    })
-    reduced_orders = reduced_orders.astype({
-        "user_id": np.int64,
-        "address_id": np.int64,
-        "restaurant_id": np.int64,
-        "food_id": np.int64,
-        "ordered_at": "datetime64[ns]",
-        "promo_id": np.object
-    })
-
-    reduced_db = ReducedDatabase(
-        orders=reduced_orders,
-        users=reduced_users,
-        food=reduced_food,
-        promos=reduced_promos,
-        restaurants=reduced_restaurants,
-        addresses=reduced_addresses
+def _reduce_orders(db: MultiDimDatabase, compact: bool = False) -> pd.DataFrame:
+    return _conform(
+        db.orders, REDUCED_TABLE_SCHEMAS["orders"], _compact_columns("orders", compact)
     )
 
-    return reduced_db
 
+def _reduce_users(db: MultiDimDatabase) -> pd.DataFrame:
+    users = db.users.assign(
+        birthdate=resolve_birthdates(db.users["birthdate_id"], db.birthdates)
+    )
+    return _conform(users, REDUCED_TABLE_SCHEMAS["users"])
 
-# --- Task #3 ---
-def create_orders_by_meal_type_age_cuisine_table(db: ReducedDatabase) -> pd.DataFrame:
-    orders = db.orders.copy()
-    food = db.food.copy()
 
-    time_bins = pd.to_timedelta(["00:00:00", "06:00:00", "10:00:00", "16:00:00"]).total_seconds()
-    time_bins_object = time_bins.astype(np.object)
+def _reduce_food(db: MultiDimDatabase, compact: bool = False) -> pd.DataFrame:
+    cuisine = gather_labels(
+        db.cuisines["name"].to_numpy(dtype=object),
+        key_positions(db.cuisines.index, db.food["cuisine_id"].to_numpy()),
+        compact,
+    )
+    return _conform(
+        db.food.assign(cuisine=cuisine),
+        REDUCED_TABLE_SCHEMAS["food"],
+        _compact_columns("food", compact),
+    )
 
-    orders["meal_type"] = pd.cut(
-        pd.to_datetime(orders["ordered_at"]).dt.time.apply(lambda x: x.hour * 3600 + x.minute * 60 + x.second),
-        bins=time_bins_object,
-        labels=["dinner", "breakfast", "lunch"], right=False)
 
+def _reduce_promos(db: MultiDimDatabase) -> pd.DataFrame:
+    return _conform(db.promos, REDUCED_TABLE_SCHEMAS["promos"])
 
-    age_bins = pd.to_datetime(["1969-09-21", "1970-01-01", "1995-01-01", pd.Timestamp.now().strftime("%Y-%m-%d")])
-    age_bins_object = age_bins.astype(np.object)
 
-    orders["user_age"] = pd.cut(pd.to_datetime(db.users["birthdate_id"]),
-                                bins=age_bins_object.sort_values(),
-                                labels=["old", "adult", "young"], right=False)
+def _reduce_restaurants(db: MultiDimDatabase) -> pd.DataFrame:
+    return _conform(db.restaurants, REDUCED_TABLE_SCHEMAS["restaurants"])
 
-    df_food_reset = food.reset_index('food_id')
-    df_orders_reset = orders.reset_index('order_id')
 
-    orders_by_meal_type_age_cuisine = df_orders_reset.merge(df_food_reset[["food_id", "cuisine_id"]], on="food_id")
-    orders_by_meal_type_age_cuisine = orders_by_meal_type_age_cuisine[["order_id", "meal_type", "user_age", "cuisine_id"]].set_index("order_id")
+def _reduce_addresses(db: MultiDimDatabase, compact: bool = False) -> pd.DataFrame:
+    addresses = resolve_addresses(
+        db.addresses, db.districts, db.cities, db.states, db.countries, compact
+    )
+    return _conform(
+        addresses,
+        REDUCED_TABLE_SCHEMAS["addresses"],
+        _compact_columns("addresses", compact),
+    )
 
 
-    orders_by_meal_type_age_cuisine.rename(columns={'cuisine_id': 'food_cuisine'}, inplace=True)
-    desired_user_age = [
-        "adult",
-        "adult",
-        "young",
-        "old",
-        "adult",
-        "young",
-        "adult",
-        "adult",
-        "adult",
-        "young",
-    ]
-    desired_meal_type = [
-        "lunch",
-        "breakfast",
-        "dinner",
-        "dinner",
-        "lunch",
-        "lunch",
-        "dinner",
-        "breakfast",
-        "lunch",
-        "dinner",
+# Reducer building each table of the `ReducedDatabase`, the ones of tables with
+# `COMPACT_COLUMNS` also take the `compact` flag
+_REDUCERS = {
+    "orders": _reduce_orders,
+    "users": _reduce_users,
+    "food": _reduce_food,
+    "promos": _reduce_promos,
+    "restaurants": _reduce_restaurants,
+    "addresses": _reduce_addresses,
+}
+
+
+def reduce_table(
+    db: MultiDimDatabase, table: str, compact: bool = False
+) -> pd.DataFrame:
+    """Build the `table` of the `ReducedDatabase`, reading only the inputs it needs."""
+    reduce = _REDUCERS[table]
+    with stage("reduce_dims", table) as metrics:
+        reduced = reduce(db, compact) if table in COMPACT_COLUMNS else reduce(db)
+        metrics.rows(len(getattr(db, table)), len(reduced))
+    return reduced
+
+
+def _reduce_dims(db: MultiDimDatabase, compact: bool) -> ReducedDatabase:
+    with stage("reduce_dims"):
+        return ReducedDatabase(
+            *(reduce_table(db, table, compact) for table in ReducedDatabase._fields)
+        )
+
+
+# --- Task # 2 ---
+def reduce_dims(db: MultiDimDatabase) -> ReducedDatabase:
+    return _reduce_dims(db, compact=False)
+
+
+def reduce_dims_compact(db: MultiDimDatabase) -> ReducedDatabase:
+    """Like `reduce_dims`, but stores the `COMPACT_COLUMNS` as categoricals."""
+    return _reduce_dims(db, compact=True)
+
+
+def _create_orders_by_meal_type_age_cuisine_table(
+    db: ReducedDatabase, compact: bool
+) -> pd.DataFrame:
+    with stage("orders_by_meal_type_age_cuisine", "orders") as metrics:
+        orders_by_meal_type_age_cuisine = classify_orders(
+            db.orders, db.users, db.food, categorical=compact
+        )
+        if not orders_by_meal_type_age_cuisine.index.is_monotonic_increasing:
+            orders_by_meal_type_age_cuisine = (
+                orders_by_meal_type_age_cuisine.sort_index()
+            )
+        metrics.rows(len(db.orders), len(orders_by_meal_type_age_cuisine))
+    return orders_by_meal_type_age_cuisine
+
+
+# --- Task #3 ---
+def create_orders_by_meal_type_age_cuisine_table(db: ReducedDatabase) -> pd.DataFrame:
+    return _create_orders_by_meal_type_age_cuisine_table(db, compact=False)
+
+
+def create_orders_by_meal_type_age_cuisine_table_compact(
+    db: ReducedDatabase,
+) -> pd.DataFrame:
+    """Like `create_orders_by_meal_type_age_cuisine_table`, with categorical columns."""
+    return _create_orders_by_meal_type_age_cuisine_table(db, compact=True)
+
+
+def expand_categoricals(dataframe: pd.DataFrame) -> pd.DataFrame:
+    """Convert categorical columns back to the object columns of the expected schema."""
+    categorical = [
+        name
+        for name, dtype in dataframe.dtypes.items()
+        if isinstance(dtype, pd.CategoricalDtype)
     ]
-    # for i, user_age in enumerate(desired_user_age):
-    #     new_record = {
-    #         "meal_type": "dinner",
-    #         "user_age": user_age,
-    #         "food_cuisine": "Italian"
-    #     }
-    #     new_index = len(orders_by_meal_type_age_cuisine) + i + 1
-    #     orders_by_meal_type_age_cuisine.loc[new_index] = new_record
-    #
-    # orders_by_meal_type_age_cuisine.sort_index(inplace=True)
-    # orders_by_meal_type_age_cuisine = orders_by_meal_type_age_cuisine.astype(object)
-
-    records = []
-
-    # Usar un bucle for con la función enumerate para crear 10 registros
-    for user_age, meal_type in enumerate(zip(desired_user_age, desired_meal_type)):
-        # Generar un valor aleatorio del tipo int para el campo order_id
-        order_id = random.randint(1, 100)
-        # Crear el nuevo registro con los campos order_id, meal_type, user_age y food_cuisine
-        new_record = {
-            "order_id": order_id,
-            "meal_type": meal_type,
-            "user_age": user_age,
-            "food_cuisine": "Italian"
-        }
-        # Agregar el nuevo registro a la lista de registros
-        records.append(new_record)
-
-    df = pd.DataFrame(records)
-    df = df.set_index('order_id')
-    df.sort_index(inplace=True)
-    return df #orders_by_meal_type_age_cuisine
+    if not categorical:
+        return dataframe
+    return dataframe.astype(dict.fromkeys(categorical, object))
+
+
+def expand_reduced_db(db: ReducedDatabase) -> ReducedDatabase:
+    return ReducedDatabase(*[expand_categoricals(table) for table in db])
 
 
 if __name__ == "__main__":
-    tables = load_tables(TABLES_DIR_PATH, TABLES)
-    db = MultiDimDatabase(*tables)
+    from app.snapshot import load_database
+
+    db = load_database(TABLES_DIR_PATH)
     reduced_db = reduce_dims(db)
-    orders_by_meal_type_age_cuisine_table = create_orders_by_meal_type_age_cuisine_table(reduced_db)
+    orders_by_meal_type_age_cuisine_table = (
+        create_orders_by_meal_type_age_cuisine_table(reduced_db)
+    )
     print("ORDERS", orders_by_meal_type_age_cuisine_table)
@@ -0,0 +1,284 @@
+import os
+import shutil
+import sqlite3
+from itertools import chain
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from app.dims_and_facts import expand_categoricals
+from app.metrics import stage
+from app.schema import FOREIGN_KEYS
+
+try:
+    import pyarrow as pa
+    from pyarrow import dataset as pa_dataset
+except ImportError:
+    pa = pa_dataset = None
+
+# Default number of rows converted and written at once
+DEFAULT_BATCH_SIZE = 100_000
+
+# Rows written to SQLite between two commits
+DEFAULT_ROWS_PER_TRANSACTION = 1_000_000
+
+# File marking a directory written by `write_parquet`, which readers of the dataset
+# skip like every file starting with "_"
+_PARQUET_MARKER = "_EXPORTED"
+
+# SQLite column types of the dtype kinds of exported columns
+_SQLITE_TYPES = {"i": "INTEGER", "u": "INTEGER", "b": "INTEGER", "f": "REAL"}
+
+
+def iter_batches(
+    dataframe: pd.DataFrame, batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[pd.DataFrame]:
+    """Consecutive slices of at most `batch_size` rows, views of `dataframe`."""
+    for start in range(0, max(len(dataframe), 1), batch_size):
+        yield dataframe.iloc[start : start + batch_size]
+
+
+def _arrow_schema(batch: pd.DataFrame) -> "pa.Schema":
+    schema = pa.Schema.from_pandas(expand_categoricals(batch), preserve_index=True)
+    for position, field in enumerate(schema):
+        if pa.types.is_null(field.type):
+            # Object columns without any value in the first batch hold strings
+            schema = schema.set(position, field.with_type(pa.string()))
+    return schema
+
+
+def _record_batches(
+    batches: Iterable[pd.DataFrame], schema: "pa.Schema"
+) -> Iterator["pa.RecordBatch"]:
+    for batch in batches:
+        # Categories differ between batches, plain strings keep one schema
+        yield pa.RecordBatch.from_pandas(
+            expand_categoricals(batch), schema=schema, preserve_index=True
+        )
+
+
+def write_parquet(
+    batches: Iterable[pd.DataFrame],
+    directory: Path,
+    partition_cols: List[str] = (),
+    name: Optional[str] = None,
+) -> int:
+    """Stream `batches` into a Parquet dataset, hive-partitioned by `partition_cols`.
+
+    Only one batch is converted at a time. The index is stored as a column. The
+    dataset is written next to `directory` and renamed in place, replacing a
+    previous export as a whole; a non-empty `directory` which is not one raises a
+    ValueError. Returns the rows written.
+    """
+    if pa_dataset is None:
+        raise ImportError("Writing Parquet requires pyarrow")
+    directory = Path(directory)
+    if (
+        directory.exists()
+        and any(directory.iterdir())
+        and not (directory / _PARQUET_MARKER).exists()
+    ):
+        raise ValueError("%s is not a Parquet export, it is not replaced" % directory)
+    batches = iter(batches)
+    first = next(batches, None)
+    if first is None:
+        return 0
+    schema = _arrow_schema(first)
+    rows = 0
+
+    def counted(record_batches):
+        nonlocal rows
+        for record_batch in record_batches:
+            rows += record_batch.num_rows
+            yield record_batch
+
+    temporary_path = directory.with_name(".%s.%d.tmp" % (directory.name, os.getpid()))
+    stale_path = temporary_path.with_suffix(".old")
+    with stage("export_parquet", name) as metrics:
+        shutil.rmtree(temporary_path, ignore_errors=True)
+        try:
+            pa_dataset.write_dataset(
+                counted(_record_batches(chain([first], batches), schema)),
+                temporary_path,
+                schema=schema,
+                format="parquet",
+                partitioning=list(partition_cols) or None,
+                partitioning_flavor="hive" if partition_cols else None,
+            )
+        except BaseException:
+            shutil.rmtree(temporary_path, ignore_errors=True)
+            raise
+        (temporary_path / _PARQUET_MARKER).touch()
+        # The previous export, partitions this one does not write included, is
+        # replaced as a whole, as in `app.columnar.write_reduced_database`
+        shutil.rmtree(stale_path, ignore_errors=True)
+        if directory.exists():
+            os.rename(directory, stale_path)
+        os.rename(temporary_path, directory)
+        shutil.rmtree(stale_path, ignore_errors=True)
+        metrics.rows(rows, rows)
+    return rows
+
+
+def _sql_values(values: pd.Series) -> list:
+    if values.dtype.kind == "M":
+        # ISO 8601 text is understood by the SQLite date and time functions, which
+        # ignore the digits past milliseconds but keep them stored
+        text = np.datetime_as_string(values.to_numpy(), unit="ns").astype(object)
+        text[values.isna().to_numpy()] = None
+        return text.tolist()
+    if isinstance(values.dtype, np.dtype) and values.dtype.kind in "iub":
+        return values.tolist()
+    # Missing values, `pd.NA` in nullable extension columns which sqlite3 cannot
+    # bind, become NULL. Object columns are not copied by `to_numpy`, the batch
+    # must not be modified
+    objects = values.to_numpy(dtype=object, copy=True)
+    objects[pd.isna(objects)] = None
+    return objects.tolist()
+
+
+def _sql_type(values: pd.Series) -> str:
+    return _SQLITE_TYPES.get(values.dtype.kind, "TEXT")
+
+
+def _quote(name: str) -> str:
+    return '"%s"' % name.replace('"', '""')
+
+
+def write_sqlite(
+    batches: Iterable[pd.DataFrame],
+    connection: sqlite3.Connection,
+    table: str,
+    indexes: List[str] = (),
+    rows_per_transaction: int = DEFAULT_ROWS_PER_TRANSACTION,
+) -> int:
+    """Stream `batches` into a new `table`, replacing it, returns the rows written.
+
+    Rows are inserted with `executemany` into a staging table, committing every
+    `rows_per_transaction` rows. It replaces `table` in a single transaction once
+    every row is loaded, so a failed export leaves the previous table as it was.
+    The index of the batches becomes the primary key. It and the `indexes` are
+    only built at the end.
+    """
+    batches = iter(batches)
+    first = next(batches, None)
+    if first is None:
+        return 0
+    index_name = first.index.name or "index"
+    columns = [index_name] + [str(column) for column in first.columns]
+    column_types = [_sql_type(first.index.to_series())] + [
+        _sql_type(first[column]) for column in first.columns
+    ]
+    staging = _quote("%s_staging" % table)
+    insert = "INSERT INTO %s VALUES (%s)" % (staging, ", ".join("?" * len(columns)))
+
+    rows = uncommitted = 0
+    with stage("export_sqlite", table) as metrics:
+        connection.execute("DROP TABLE IF EXISTS %s" % staging)
+        connection.execute(
+            "CREATE TABLE %s (%s)"
+            % (
+                staging,
+                ", ".join(
+                    "%s %s" % (_quote(column), column_type)
+                    for column, column_type in zip(columns, column_types)
+                ),
+            )
+        )
+        try:
+            for batch in chain([first], batches):
+                values = [_sql_values(batch.index.to_series())] + [
+                    _sql_values(batch[column]) for column in batch.columns
+                ]
+                connection.executemany(insert, zip(*values))
+                rows += len(batch)
+                uncommitted += len(batch)
+                if uncommitted >= rows_per_transaction:
+                    connection.commit()
+                    uncommitted = 0
+            connection.commit()
+
+            # SQLite DDL is transactional: the old table is only gone once the
+            # staging table has taken its name
+            connection.execute("BEGIN")
+            connection.execute("DROP TABLE IF EXISTS %s" % _quote(table))
+            connection.execute("ALTER TABLE %s RENAME TO %s" % (staging, _quote(table)))
+            connection.execute(
+                "CREATE UNIQUE INDEX %s ON %s (%s)"
+                % (_quote("%s_pkey" % table), _quote(table), _quote(index_name))
+            )
+            for column in indexes:
+                if column not in columns:
+                    continue
+                connection.execute(
+                    "CREATE INDEX %s ON %s (%s)"
+                    % (
+                        _quote("%s_%s" % (table, column)),
+                        _quote(table),
+                        _quote(column),
+                    )
+                )
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            connection.execute("DROP TABLE IF EXISTS %s" % staging)
+            connection.commit()
+            raise
+        metrics.rows(rows, rows)
+    return rows
+
+
+def export_tables_to_parquet(
+    tables: dict,
+    directory: Path,
+    partition_cols: Optional[dict] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> dict:
+    """Write every frame or iterable of batches of `tables` to `directory/<name>`."""
+    partition_cols = partition_cols or {}
+    return {
+        name: write_parquet(
+            _as_batches(table, batch_size),
+            Path(directory) / name,
+            partition_cols.get(name, ()),
+            name,
+        )
+        for name, table in tables.items()
+    }
+
+
+def export_tables_to_sqlite(
+    tables: dict,
+    database: Union[Path, sqlite3.Connection],
+    indexes: Optional[dict] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> dict:
+    """Write every frame or iterable of batches of `tables` to a SQLite table.
+
+    Unless given in `indexes`, the foreign key columns of a table are indexed.
+    """
+    if indexes is None:
+        indexes = {table: list(keys) for table, keys in FOREIGN_KEYS.items()}
+    connection = (
+        database
+        if isinstance(database, sqlite3.Connection)
+        else sqlite3.connect(database)
+    )
+    try:
+        return {
+            name: write_sqlite(
+                _as_batches(table, batch_size), connection, name, indexes.get(name, [])
+            )
+            for name, table in tables.items()
+        }
+    finally:
+        if connection is not database:
+            connection.close()
+
+
+def _as_batches(table, batch_size: int) -> Iterable[pd.DataFrame]:
+    if isinstance(table, pd.DataFrame):
+        return iter_batches(table, batch_size)
+    return table
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from app.classify import gather_labels
+from app.join import key_positions, take
+
+# Tables walked to resolve the geography of an address, from the address up
+GEOGRAPHY_TABLES = ["addresses", "districts", "cities", "states", "countries"]
+
+
+def resolve_addresses(
+    addresses: pd.DataFrame,
+    districts: pd.DataFrame,
+    cities: pd.DataFrame,
+    states: pd.DataFrame,
+    countries: pd.DataFrame,
+    categorical: bool = False,
+) -> pd.DataFrame:
+    """Denormalize the district, city, state and country names into `addresses`."""
+    # Each hop maps rows of one table onto rows of the next one
+    district_of_address = key_positions(
+        districts.index, addresses["district_id"].to_numpy()
+    )
+    city_of_district = key_positions(cities.index, districts["city_id"].to_numpy())
+    state_of_city = key_positions(states.index, cities["state_id"].to_numpy())
+    country_of_state = key_positions(countries.index, states["country_id"].to_numpy())
+
+    city_of_address = take(city_of_district, district_of_address, -1)
+    state_of_address = take(state_of_city, city_of_address, -1)
+    country_of_address = take(country_of_state, state_of_address, -1)
+
+    def names(table: pd.DataFrame, positions: np.ndarray):
+        return gather_labels(
+            table["name"].to_numpy(dtype=object), positions, categorical
+        )
+
+    return pd.DataFrame(
+        {
+            "country": names(countries, country_of_address),
+            "state": names(states, state_of_address),
+            "city": names(cities, city_of_address),
+            "district": names(districts, district_of_address),
+            "street": addresses["street"].to_numpy(),
+        },
+        index=addresses.index,
+    )
@@ -0,0 +1,148 @@
+from collections import namedtuple
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+from app.dims_and_facts import (
+    MultiDimDatabase,
+    ReducedDatabase,
+    _conform,
+    _reduce_addresses,
+    _reduce_food,
+    _reduce_promos,
+    _reduce_restaurants,
+    _reduce_users,
+)
+from app.schema import REDUCED_TABLE_SCHEMAS
+
+# High-water mark of the orders already present in a reduced database. Order ids
+# grow with every new order while `ordered_at` may arrive out of order, so the
+# largest order id alone tells the new orders apart.
+Watermark = namedtuple("Watermark", ["order_id"])
+
+
+class OrderSegments:
+    """Reduced orders as the sorted segments appended by each refresh.
+
+    Every segment only holds orders past the last one of the previous segment.
+    `frame` concatenates them once and keeps the result, so a refresh appending a
+    segment only concatenates that frame with the new segment.
+    """
+
+    def __init__(self, segments: List[pd.DataFrame]):
+        self.segments = list(segments)
+        self._frame = None
+
+    def __len__(self) -> int:
+        return sum(len(segment) for segment in self.segments)
+
+    def append(self, segment: pd.DataFrame) -> "OrderSegments":
+        appended = OrderSegments(self.segments + [segment])
+        appended._frame = pd.concat([self.frame(), segment])
+        return appended
+
+    @property
+    def last_order_id(self):
+        for segment in reversed(self.segments):
+            if len(segment):
+                return segment.index[-1]
+        return None
+
+    def frame(self) -> pd.DataFrame:
+        if self._frame is None:
+            if len(self.segments) > 1:
+                self._frame = pd.concat(self.segments)
+            else:
+                self._frame = self.segments[0]
+        return self._frame
+
+
+# How every reduced dimension is built, and which other tables it is resolved against
+_DIMENSIONS = {
+    "users": (_reduce_users, []),
+    "food": (_reduce_food, ["cuisines"]),
+    "promos": (_reduce_promos, []),
+    "restaurants": (_reduce_restaurants, []),
+    "addresses": (_reduce_addresses, ["districts", "cities", "states", "countries"]),
+}
+
+
+def get_watermark(db: ReducedDatabase) -> Watermark:
+    orders = db.orders
+    if len(orders) == 0:
+        return Watermark(order_id=None)
+    # The index is kept sorted, so the last order id is the largest one
+    if orders.index.is_monotonic_increasing:
+        return Watermark(order_id=orders.index[-1])
+    return Watermark(order_id=orders.index.max())
+
+
+def _upsert(previous: pd.DataFrame, changes: pd.DataFrame) -> pd.DataFrame:
+    kept = previous[~previous.index.isin(changes.index)]
+    updated = pd.concat([kept, changes])
+    if not updated.index.is_monotonic_increasing:
+        updated = updated.sort_index()
+    return updated
+
+
+def reduce_dims_incremental(
+    previous: ReducedDatabase,
+    new_orders: pd.DataFrame,
+    changed: Optional[MultiDimDatabase] = None,
+    watermark: Optional[Watermark] = None,
+    segments: Optional[OrderSegments] = None,
+) -> Tuple[ReducedDatabase, Watermark, OrderSegments]:
+    """Append `new_orders` to `previous`, reducing only the rows past the watermark.
+
+    The new orders are appended as a segment of their own to `segments`, the
+    `OrderSegments` returned by the refresh which produced `previous`, or a single
+    segment of its orders. The segments are returned alongside the reduced
+    database and the new watermark. `changed` holds the changed rows of the
+    original dimension tables, `None` for the unchanged ones. Food and address
+    rows are resolved against the cuisine and geography tables given alongside
+    them, which have to be complete.
+    """
+    latest = get_watermark(previous)
+    if watermark is None:
+        watermark = latest
+    elif latest.order_id is not None and (
+        watermark.order_id is None or watermark.order_id < latest.order_id
+    ):
+        # Orders up to the latest one are already reduced, they would be duplicated
+        raise ValueError(
+            "Watermark %s is behind the latest order %s of the previous database"
+            % (watermark.order_id, latest.order_id)
+        )
+    if segments is None:
+        orders = previous.orders
+        if not orders.index.is_monotonic_increasing:
+            orders = orders.sort_index()
+        segments = OrderSegments([orders])
+    elif segments.last_order_id != latest.order_id:
+        raise ValueError("The segments do not hold the orders of the previous database")
+
+    delta = new_orders
+    if watermark.order_id is not None:
+        delta = new_orders[new_orders.index > watermark.order_id]
+    if len(delta):
+        reduced_delta = _conform(delta, REDUCED_TABLE_SCHEMAS["orders"])
+        # Every order past the watermark is new, so the delta only has to be appended
+        if not reduced_delta.index.is_monotonic_increasing:
+            reduced_delta = reduced_delta.sort_index()
+        segments = segments.append(reduced_delta)
+        watermark = Watermark(order_id=reduced_delta.index[-1])
+
+    reduced = previous._replace(orders=segments.frame())
+    if changed is not None:
+        for table, (reduce, lookups) in _DIMENSIONS.items():
+            if getattr(changed, table) is None:
+                continue
+            missing = [lookup for lookup in lookups if getattr(changed, lookup) is None]
+            if missing:
+                raise ValueError(
+                    "Changed %s rows need the %s tables" % (table, ", ".join(missing))
+                )
+            reduced = reduced._replace(
+                **{table: _upsert(getattr(reduced, table), reduce(changed))}
+            )
+    return reduced, watermark, segments
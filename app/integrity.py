@@ -0,0 +1,140 @@
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.dims_and_facts import (
+    TABLES,
+    MultiDimDatabase,
+    _restore_dtypes,
+    _usecols,
+    load_tables_concurrently,
+)
+from app.join import key_positions, unmatched_keys
+from app.metrics import stage
+from app.schema import FOREIGN_KEYS, TABLE_SCHEMAS, column_dtypes
+from app.violations import (
+    ForeignKeyViolation,
+    IntegrityError,
+    check_policy,
+    missing_keys,
+    missing_value_violations,
+)
+
+
+def _validation_order(tables: Dict[str, pd.DataFrame]) -> List[str]:
+    # Referenced tables come first, so that the rows they drop cascade
+    order = []
+    pending = list(tables)
+    while pending:
+        ready = [
+            table
+            for table in pending
+            if all(
+                target in order or target not in tables
+                for target in FOREIGN_KEYS.get(table, {}).values()
+            )
+        ]
+        if not ready:
+            return order + pending
+        order += ready
+        pending = [table for table in pending if table not in ready]
+    return order
+
+
+def validate_foreign_keys(
+    tables: Dict[str, pd.DataFrame], policy: str = "report"
+) -> Tuple[Dict[str, pd.DataFrame], list]:
+    """Check the required values and every `FOREIGN_KEYS` column of `tables` whose
+    target is among them.
+
+    Keys are looked up by position in the index of their target, through a
+    direct-address table for integer keys. Missing keys in nullable columns, NaN
+    or the negative codes of surrogate keys, are not violations. Returns the
+    tables, without the violating rows under the "drop" policy, and the
+    `MissingValueViolation`s and `ForeignKeyViolation`s found.
+    """
+    check_policy(policy)
+    validated = dict(tables)
+    violations = []
+    for table in _validation_order(tables):
+        dataframe = validated[table]
+        schema = TABLE_SCHEMAS.get(table)
+        invalid = None
+        with stage("validate_foreign_keys", table) as metrics:
+            if schema is not None:
+                missing, table_violations = missing_value_violations(
+                    table, dataframe, schema
+                )
+                if table_violations:
+                    violations += table_violations
+                    invalid = missing
+            for column, target in FOREIGN_KEYS.get(table, {}).items():
+                if target not in validated or column not in dataframe.columns:
+                    continue
+                keys = dataframe[column].to_numpy()
+                unmatched = unmatched_keys(
+                    column, keys, key_positions(validated[target].index, keys)
+                )
+                if schema is not None and len(unmatched.rows):
+                    # Surrogate codes of missing keys match no row either
+                    rows = unmatched.rows[
+                        ~missing_keys(
+                            keys[unmatched.rows], column_dtypes(schema)[column]
+                        )
+                    ]
+                    unmatched = unmatched._replace(
+                        rows=rows, keys=pd.unique(keys[rows])
+                    )
+                if not len(unmatched.rows):
+                    continue
+                violations.append(
+                    ForeignKeyViolation(
+                        table=table,
+                        column=column,
+                        target=target,
+                        index=dataframe.index[unmatched.rows],
+                        keys=unmatched.keys,
+                    )
+                )
+                if invalid is None:
+                    invalid = np.zeros(len(dataframe), dtype=bool)
+                invalid[unmatched.rows] = True
+            if invalid is not None and policy == "drop":
+                dataframe = dataframe[~invalid]
+                if schema is not None:
+                    # Integer columns are no longer nullable without the dropped rows
+                    dataframe = _restore_dtypes(
+                        dataframe, schema, _usecols(schema, dataframe.columns)
+                    )
+                validated[table] = dataframe
+            metrics.rows(len(tables[table]), len(dataframe))
+    if violations and policy == "fail":
+        raise IntegrityError(violations)
+    return validated, violations
+
+
+def validate_database(
+    db: MultiDimDatabase, policy: str = "report"
+) -> Tuple[MultiDimDatabase, list]:
+    """`validate_foreign_keys` over the loaded tables of `db`."""
+    tables, violations = validate_foreign_keys(
+        {
+            table: dataframe
+            for table, dataframe in db._asdict().items()
+            if dataframe is not None
+        },
+        policy,
+    )
+    return db._replace(**tables), violations
+
+
+def load_validated_database(
+    tables_dir_path: Path, policy: str = "report"
+) -> Tuple[MultiDimDatabase, list]:
+    """Load every table, then apply `policy` to the rows missing a required value
+    as well as to the rows referencing a missing row."""
+    check_policy(policy)
+    tables = load_tables_concurrently(tables_dir_path, TABLES, policy="report")
+    return validate_database(MultiDimDatabase(*tables), policy)
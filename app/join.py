@@ -0,0 +1,88 @@
+from collections import namedtuple
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Direct-address tables are only built for keys at most this many times sparser
+# than the index they point into
+_MAX_SPARSITY = 8
+
+# Rows of a fact table whose foreign key in `column` has no match: their
+# positions in the fact table and the distinct keys they hold
+UnmatchedKeys = namedtuple("UnmatchedKeys", ["column", "rows", "keys"])
+
+
+def take(values: np.ndarray, positions: np.ndarray, fill_value) -> np.ndarray:
+    """Gather `values` at `positions`, where -1 marks a missing row."""
+    if len(values) == 0:
+        return np.full(len(positions), fill_value, dtype=values.dtype)
+    taken = values.take(positions)
+    missing = positions < 0
+    if missing.any():
+        taken[missing] = fill_value
+    return taken
+
+
+def key_positions(index: pd.Index, keys: np.ndarray) -> np.ndarray:
+    """Positions of `keys` in `index`, -1 where a key is not found."""
+    values = index.to_numpy()
+    keys = np.asarray(keys)
+    if (
+        values.dtype.kind not in "iu"
+        or keys.dtype.kind not in "iu"
+        or len(values) == 0
+        or values.min() < 0
+        or values.max() >= _MAX_SPARSITY * len(values) + 1024
+    ):
+        return index.get_indexer(keys)
+
+    lookup = np.full(values.max() + 1, -1, dtype=np.int64)
+    lookup[values] = np.arange(len(values))
+    keys = keys.astype(np.int64, copy=False)
+    out_of_range = (keys < 0) | (keys >= len(lookup))
+    if out_of_range.any():
+        return take(lookup, np.where(out_of_range, -1, keys), -1)
+    return lookup.take(keys)
+
+
+def unmatched_keys(column: str, keys, positions: np.ndarray) -> UnmatchedKeys:
+    """Report the rows whose `positions` are -1, missing keys are not unmatched."""
+    keys = np.asarray(keys)
+    rows = np.flatnonzero(positions < 0)
+    if len(rows):
+        rows = rows[pd.notna(keys[rows])]
+    return UnmatchedKeys(column=column, rows=rows, keys=pd.unique(keys[rows]))
+
+
+def join(
+    fact: pd.DataFrame, key: str, dimension: pd.DataFrame, columns: List[str]
+) -> Tuple[pd.DataFrame, UnmatchedKeys]:
+    """Gather `columns` of `dimension` for every row of `fact` through its `key`.
+
+    The result is aligned with `fact`, in its row order, and holds missing values
+    where the key is not found in the index of `dimension`.
+    """
+    keys = fact[key].to_numpy()
+    positions = key_positions(dimension.index, keys)
+    joined = pd.DataFrame(
+        {
+            column: dimension[column].array.take(positions, allow_fill=True)
+            for column in columns
+        },
+        index=fact.index,
+    )
+    return joined, unmatched_keys(key, keys, positions)
+
+
+def find_unmatched_keys(
+    fact: pd.DataFrame, references: Dict[str, pd.DataFrame]
+) -> Dict[str, UnmatchedKeys]:
+    """Unmatched keys of every column of `fact` referencing a table in `references`."""
+    report = {}
+    for column, dimension in references.items():
+        keys = fact[column].to_numpy()
+        report[column] = unmatched_keys(
+            column, keys, key_positions(dimension.index, keys)
+        )
+    return report
@@ -0,0 +1,110 @@
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from app.dims_and_facts import (
+    TABLES,
+    MultiDimDatabase,
+    ReducedDatabase,
+    read_table,
+    reduce_table,
+)
+
+
+class _TrackedFrame(pd.DataFrame):
+    # Records the columns selected with `[]`. Other frames derived from it are
+    # plain frames, only `assign` keeps the record, so columns read after it are
+    # counted too.
+    _metadata = ["_used_columns"]
+
+    def __getitem__(self, key):
+        used_columns = getattr(self, "_used_columns", None)
+        if used_columns is not None:
+            if isinstance(key, str):
+                used_columns.add(key)
+            elif isinstance(key, list):
+                used_columns.update(key)
+        return super().__getitem__(key)
+
+    def assign(self, **kwargs) -> "_TrackedFrame":
+        return _track(super().assign(**kwargs), getattr(self, "_used_columns", None))
+
+
+def _track(dataframe: pd.DataFrame, used_columns: set) -> _TrackedFrame:
+    tracked = _TrackedFrame(dataframe)
+    object.__setattr__(tracked, "_used_columns", used_columns)
+    return tracked
+
+
+class LazyDatabase:
+    """Database whose tables are built by `load` on first access and memoized.
+
+    Tables are attributes named after `fields`, like those of the namedtuple it
+    stands in for. The tables and columns read so far are reported by
+    `used_tables` and `used_columns`.
+    """
+
+    def __init__(self, fields: List[str], load: Callable[[str], pd.DataFrame]):
+        self._fields = tuple(fields)
+        self._load = load
+        self._tables: Dict[str, pd.DataFrame] = {}
+        self._used_columns: Dict[str, set] = {}
+        self._locks = {table: threading.Lock() for table in fields}
+
+    def __getattr__(self, table: str) -> pd.DataFrame:
+        # Only called for attributes which are not set on the instance
+        locks = self.__dict__.get("_locks", {})
+        if table not in locks:
+            raise AttributeError(table)
+        with locks[table]:
+            if table not in self._tables:
+                self._used_columns[table] = set()
+                self._tables[table] = _track(
+                    self._load(table), self._used_columns[table]
+                )
+        return self._tables[table]
+
+    @property
+    def used_tables(self) -> List[str]:
+        return [table for table in self._fields if table in self._tables]
+
+    @property
+    def used_columns(self) -> Dict[str, List[str]]:
+        # Derived frames may record columns the table itself does not have
+        return {
+            table: [
+                column
+                for column in self._tables[table].columns
+                if column in self._used_columns[table]
+            ]
+            for table in self.used_tables
+        }
+
+    def materialize(self, database_type):
+        """Load every table into an instance of the namedtuple `database_type`."""
+        return database_type(
+            *(pd.DataFrame(getattr(self, table)) for table in self._fields)
+        )
+
+
+def lazy_database(
+    tables_dir_path: Path, columns: Optional[Dict[str, List[str]]] = None
+) -> LazyDatabase:
+    """Lazy `MultiDimDatabase` reading the CSV files of `tables_dir_path`.
+
+    `columns` restricts the columns parsed from each table, e.g. to the
+    `used_columns` reported by a previous run.
+    """
+    columns = columns or {}
+    return LazyDatabase(
+        TABLES, lambda table: read_table(tables_dir_path, table, columns.get(table))
+    )
+
+
+def lazy_reduced_database(db: MultiDimDatabase, compact: bool = False) -> LazyDatabase:
+    """Lazy `ReducedDatabase`, tables are reduced from `db` on first access."""
+    return LazyDatabase(
+        ReducedDatabase._fields, lambda table: reduce_table(db, table, compact)
+    )
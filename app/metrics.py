@@ -0,0 +1,191 @@
+import json
+import os
+import resource
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+# Measurements of one run of a pipeline stage, `table` is None for whole stages.
+# CPU time is process-wide, so stages running concurrently see each other's work.
+StageMetrics = namedtuple(
+    "StageMetrics",
+    [
+        "stage",
+        "table",
+        "wall_seconds",
+        "cpu_seconds",
+        "peak_memory_delta_bytes",
+        "rows_in",
+        "rows_out",
+        "rows_dropped",
+    ],
+)
+
+# Prefix of every metric exported in the Prometheus text format
+PROMETHEUS_PREFIX = "dims_and_facts_stage_"
+
+_PROMETHEUS_HELP = {
+    "wall_seconds": "Wall time spent in the stage.",
+    "cpu_seconds": "CPU time of the process spent during the stage.",
+    "peak_memory_delta_bytes": "Peak resident memory above its level at the start.",
+    "rows_in": "Rows read by the stage.",
+    "rows_out": "Rows produced by the stage.",
+    "rows_dropped": "Rows read but not produced by the stage.",
+}
+
+
+class PeakMemory:
+    """Samples the resident set size of this process in a background thread."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak = self.start = self.current()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    @staticmethod
+    def current() -> int:
+        try:
+            with open("/proc/self/statm") as statm:
+                return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except OSError:
+            # Without procfs only the lifetime peak of the process is known
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.current())
+
+    def __enter__(self) -> "PeakMemory":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.current())
+
+
+class MetricsRecorder:
+    def __init__(self):
+        self.records: List[StageMetrics] = []
+        self._lock = threading.Lock()
+
+    def add(self, record: StageMetrics) -> None:
+        with self._lock:
+            self.records.append(record)
+
+    def to_json(self) -> str:
+        return json.dumps([record._asdict() for record in self.records], indent=2)
+
+    def to_prometheus(self) -> str:
+        # Series have to be unique, so only the last run of every stage is exported
+        latest = {(record.stage, record.table): record for record in self.records}
+        lines = []
+        for field, help_text in _PROMETHEUS_HELP.items():
+            name = PROMETHEUS_PREFIX + field
+            lines.append("# HELP %s %s" % (name, help_text))
+            lines.append("# TYPE %s gauge" % name)
+            for record in latest.values():
+                value = getattr(record, field)
+                if value is None:
+                    continue
+                lines.append(
+                    '%s{stage="%s",table="%s"} %s'
+                    % (name, record.stage, record.table or "", value)
+                )
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path: Path) -> None:
+        Path(path).write_text(self.to_json())
+
+    def write_prometheus(self, path: Path) -> None:
+        Path(path).write_text(self.to_prometheus())
+
+
+class _Stage:
+    def __init__(self, recorder: MetricsRecorder, name: str, table: Optional[str]):
+        self.recorder = recorder
+        self.name = name
+        self.table = table
+        self.rows_in = self.rows_out = None
+
+    def rows(self, rows_in: Optional[int] = None, rows_out: Optional[int] = None):
+        self.rows_in = rows_in
+        self.rows_out = rows_out
+
+    def __enter__(self) -> "_Stage":
+        self.memory = PeakMemory().__enter__()
+        self.cpu_start = time.process_time()
+        self.wall_start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        wall_seconds = time.perf_counter() - self.wall_start
+        cpu_seconds = time.process_time() - self.cpu_start
+        self.memory.__exit__(*exc_info)
+        dropped = None
+        if self.rows_in is not None and self.rows_out is not None:
+            dropped = self.rows_in - self.rows_out
+        self.recorder.add(
+            StageMetrics(
+                stage=self.name,
+                table=self.table,
+                wall_seconds=wall_seconds,
+                cpu_seconds=cpu_seconds,
+                peak_memory_delta_bytes=self.memory.peak - self.memory.start,
+                rows_in=self.rows_in,
+                rows_out=self.rows_out,
+                rows_dropped=dropped,
+            )
+        )
+
+
+class _DisabledStage:
+    def rows(self, rows_in: Optional[int] = None, rows_out: Optional[int] = None):
+        pass
+
+    def __enter__(self) -> "_DisabledStage":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_DISABLED_STAGE = _DisabledStage()
+
+# Recorder of the running process, metrics are not collected while it is None
+_recorder: Optional[MetricsRecorder] = None
+
+
+def stage(name: str, table: Optional[str] = None):
+    """Measure the enclosed block as `name`, report rows through `.rows()`."""
+    recorder = _recorder
+    if recorder is None:
+        return _DISABLED_STAGE
+    return _Stage(recorder, name, table)
+
+
+def enable_metrics() -> MetricsRecorder:
+    global _recorder
+    _recorder = MetricsRecorder()
+    return _recorder
+
+
+def disable_metrics() -> None:
+    global _recorder
+    _recorder = None
+
+
+@contextmanager
+def collect_metrics() -> Iterator[MetricsRecorder]:
+    global _recorder
+    previous = _recorder
+    recorder = enable_metrics()
+    try:
+        yield recorder
+    finally:
+        _recorder = previous
@@ -0,0 +1,90 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.classify import classify_orders
+from app.dims_and_facts import ReducedDatabase
+
+# Default number of worker processes
+DEFAULT_MAX_WORKERS = os.cpu_count() or 1
+
+# Columns each worker needs from the reduced tables
+_ORDERS_COLUMNS = ["user_id", "food_id", "ordered_at"]
+_USERS_COLUMNS = ["birthdate"]
+_FOOD_COLUMNS = ["cuisine"]
+
+
+def partition_orders(orders: pd.DataFrame, partitions: int) -> List[pd.DataFrame]:
+    """Split `orders` into `partitions` consecutive `order_id` ranges."""
+    if partitions <= 1 or len(orders) == 0:
+        return [orders]
+    if orders.index.is_monotonic_increasing:
+        # Sorted orders are split into slices of roughly the same length, no rows move
+        bounds = np.linspace(0, len(orders), partitions + 1).astype(np.int64)
+        return [
+            orders.iloc[start:stop]
+            for start, stop in zip(bounds[:-1], bounds[1:])
+            if stop > start
+        ]
+
+    order_ids = orders.index.to_numpy()
+    edges = np.linspace(order_ids.min(), order_ids.max() + 1, partitions + 1)
+    partition = np.searchsorted(edges[1:-1], order_ids, side="right")
+    # One stable sort groups the rows by partition, keeping their order within each,
+    # and one gather copies them; the partitions are then slices of that copy
+    grouped = orders.take(np.argsort(partition, kind="stable"))
+    bounds = np.concatenate(
+        [[0], np.cumsum(np.bincount(partition, minlength=partitions))]
+    )
+    return [
+        grouped.iloc[start:stop]
+        for start, stop in zip(bounds[:-1], bounds[1:])
+        if stop > start
+    ]
+
+
+def _build_partition(
+    orders: pd.DataFrame, users: pd.DataFrame, food: pd.DataFrame, compact: bool
+) -> pd.DataFrame:
+    table = classify_orders(orders, users, food, categorical=compact)
+    if not table.index.is_monotonic_increasing:
+        table = table.sort_index()
+    return table
+
+
+def build_orders_by_meal_type_age_cuisine_parallel(
+    db: ReducedDatabase,
+    partitions: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    compact: bool = False,
+) -> pd.DataFrame:
+    """Build `orders_by_meal_type_age_cuisine` from `order_id` ranges in a process pool.
+
+    Partitions are built and concatenated in key order, so the result is sorted by
+    `order_id` without a global sort.
+    """
+    if max_workers is None:
+        max_workers = DEFAULT_MAX_WORKERS
+    if partitions is None:
+        partitions = max_workers
+
+    chunks = partition_orders(db.orders[_ORDERS_COLUMNS], partitions)
+    users = db.users[_USERS_COLUMNS]
+    food = db.food[_FOOD_COLUMNS]
+    if max_workers <= 1 or len(chunks) <= 1:
+        tables = [_build_partition(chunk, users, food, compact) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+            tables = list(
+                executor.map(
+                    _build_partition,
+                    chunks,
+                    [users] * len(chunks),
+                    [food] * len(chunks),
+                    [compact] * len(chunks),
+                )
+            )
+    return pd.concat(tables)
@@ -0,0 +1,105 @@
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Partition keys understood in directory names like `ordered_month=2020-02`: the
+# column they partition and the datetime64 unit of the period a value covers
+PARTITION_PERIODS = {
+    "ordered_month": ("ordered_at", "M"),
+    "ordered_date": ("ordered_at", "D"),
+}
+
+# Files holding the rows of a partitioned table, compression follows the suffix
+PARTITION_FILE_PATTERNS = ["*.csv", "*.csv.gz", "*.csv.bz2", "*.csv.xz", "*.csv.zst"]
+
+# Default size of the thread pool listing partition directories
+DISCOVERY_MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+# A data file of a partitioned table and the `key=value` pairs of its directories
+Partition = namedtuple("Partition", ["path", "values"])
+
+
+def partition_values(path: Path, table_path: Path) -> Dict[str, str]:
+    values = {}
+    for part in path.relative_to(table_path).parts[:-1]:
+        key, separator, value = part.partition("=")
+        if separator:
+            values[key] = value
+    return values
+
+
+def _list_files(directory: Path) -> List[Path]:
+    return [
+        path
+        for pattern in PARTITION_FILE_PATTERNS
+        for path in directory.rglob(pattern)
+        if path.is_file()
+    ]
+
+
+def discover_partitions(
+    table_path: Path, max_workers: Optional[int] = None
+) -> List[Partition]:
+    """Data files under the directory of a partitioned table, sorted by path.
+
+    Top-level partition directories are listed concurrently.
+    """
+    if max_workers is None:
+        max_workers = DISCOVERY_MAX_WORKERS
+    directories = sorted(path for path in table_path.iterdir() if path.is_dir())
+    files = [
+        path
+        for pattern in PARTITION_FILE_PATTERNS
+        for path in table_path.glob(pattern)
+        if path.is_file()
+    ]
+    if max_workers <= 1 or len(directories) <= 1:
+        listings = [_list_files(directory) for directory in directories]
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            listings = list(executor.map(_list_files, directories))
+    for listing in listings:
+        files.extend(listing)
+    return [
+        Partition(path=path, values=partition_values(path, table_path))
+        for path in sorted(files)
+    ]
+
+
+def _period(key: str, value: str):
+    unit = PARTITION_PERIODS[key][1]
+    try:
+        start = np.datetime64(value, unit)
+    except ValueError:
+        return None
+    return start.astype("datetime64[ns]"), (start + 1).astype("datetime64[ns]")
+
+
+def prune_partitions(
+    partitions: List[Partition], column: str, start=None, end=None
+) -> List[Partition]:
+    """Drop the partitions whose path values put all their `column` values outside
+    of [start, end). Partitions without usable values for `column` are kept."""
+    start = None if start is None else pd.Timestamp(start).to_datetime64()
+    end = None if end is None else pd.Timestamp(end).to_datetime64()
+    kept = []
+    for partition in partitions:
+        overlaps = True
+        for key, value in partition.values.items():
+            if key not in PARTITION_PERIODS or PARTITION_PERIODS[key][0] != column:
+                continue
+            period = _period(key, value)
+            if period is None:
+                continue
+            if (start is not None and period[1] <= start) or (
+                end is not None and period[0] >= end
+            ):
+                overlaps = False
+        if overlaps:
+            kept.append(partition)
+    return kept
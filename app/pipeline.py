@@ -0,0 +1,160 @@
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from app.dims_and_facts import (
+    TABLES,
+    TABLES_DIR_PATH,
+    MultiDimDatabase,
+    create_orders_by_meal_type_age_cuisine_table,
+    read_table,
+    reduce_dims,
+)
+
+# Pipelines returned by `shared_pipeline`, by resolved tables directory
+_SHARED_PIPELINES: Dict[Path, "Pipeline"] = {}
+_SHARED_PIPELINES_LOCK = threading.Lock()
+
+# Node of a `Pipeline`: `run` is called with the results of the stages named in
+# `inputs`, in that order
+Stage = namedtuple("Stage", ["name", "run", "inputs"], defaults=[()])
+
+
+class Pipeline:
+    """DAG of stages whose results are computed on demand and memoized.
+
+    A stage is started once all of its inputs are available, so independent
+    branches run concurrently on a pool of `max_workers` threads. Callers asking
+    for a stage already being computed wait for that same computation. Failed
+    stages are not memoized.
+    """
+
+    def __init__(self, stages: List[Stage], max_workers: Optional[int] = None):
+        self.stages = {stage.name: stage for stage in stages}
+        for stage in stages:
+            unknown = set(stage.inputs) - set(self.stages)
+            if unknown:
+                raise ValueError(
+                    "Unknown inputs of %s: %s"
+                    % (stage.name, ", ".join(sorted(unknown)))
+                )
+        self._dependents: Dict[str, Set[str]] = {name: set() for name in self.stages}
+        for stage in stages:
+            for name in stage.inputs:
+                self._dependents[name].add(stage.name)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or os.cpu_count())
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.RLock()
+
+    def result(self, name: str, timeout: Optional[float] = None) -> Any:
+        """Result of the stage `name`, computing it and its inputs if needed."""
+        return self._future(name).result(timeout)
+
+    def results(self, names: List[str]) -> List[Any]:
+        """Results of the stages `names`, their branches computed concurrently."""
+        futures = [self._future(name) for name in names]
+        return [future.result() for future in futures]
+
+    def is_memoized(self, name: str) -> bool:
+        future = self._futures.get(name)
+        return future is not None and future.done() and future.exception() is None
+
+    def invalidate(self, name: Optional[str] = None) -> List[str]:
+        """Forget the result of `name` and of every stage depending on it, or of
+        every stage without `name`. Returns the stages forgotten."""
+        with self._lock:
+            if name is None:
+                invalidated = set(self._futures)
+            else:
+                invalidated = set()
+                pending = [name]
+                while pending:
+                    stage = pending.pop()
+                    if stage not in invalidated:
+                        invalidated.add(stage)
+                        pending.extend(self._dependents[stage])
+            for stage in invalidated:
+                self._futures.pop(stage, None)
+        return sorted(invalidated)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def _future(self, name: str) -> Future:
+        with self._lock:
+            future = self._futures.get(name)
+            if future is not None:
+                return future
+            stage = self.stages[name]
+            future = self._futures[name] = Future()
+            inputs = [self._future(input_name) for input_name in stage.inputs]
+        self._start_when_ready(stage, future, inputs)
+        return future
+
+    def _start_when_ready(
+        self, stage: Stage, future: Future, inputs: List[Future]
+    ) -> None:
+        # Workers never wait for other stages: the stage is only submitted once
+        # the last of its inputs is done
+        remaining = [len(inputs)]
+        lock = threading.Lock()
+
+        def input_done(_: Future) -> None:
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            self._executor.submit(self._run, stage, future, inputs)
+
+        if not inputs:
+            self._executor.submit(self._run, stage, future, inputs)
+        for input_future in inputs:
+            input_future.add_done_callback(input_done)
+
+    def _run(self, stage: Stage, future: Future, inputs: List[Future]) -> None:
+        try:
+            result = stage.run(*(input_future.result() for input_future in inputs))
+        except BaseException as error:
+            with self._lock:
+                if self._futures.get(stage.name) is future:
+                    del self._futures[stage.name]
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+
+def _database(*tables) -> MultiDimDatabase:
+    return MultiDimDatabase(*tables)
+
+
+def reduce_dims_pipeline(
+    tables_dir_path: Path = TABLES_DIR_PATH, max_workers: Optional[int] = None
+) -> Pipeline:
+    """Stages loading each of the `TABLES`, then "database", "reduced_database" and
+    "orders_by_meal_type_age_cuisine"."""
+    stages = [
+        Stage(table, lambda table=table: read_table(tables_dir_path, table))
+        for table in TABLES
+    ]
+    stages += [
+        Stage("database", _database, tuple(TABLES)),
+        Stage("reduced_database", reduce_dims, ("database",)),
+        Stage(
+            "orders_by_meal_type_age_cuisine",
+            create_orders_by_meal_type_age_cuisine_table,
+            ("reduced_database",),
+        ),
+    ]
+    return Pipeline(stages, max_workers)
+
+
+def shared_pipeline(tables_dir_path: Path = TABLES_DIR_PATH) -> Pipeline:
+    """The `reduce_dims_pipeline` of `tables_dir_path` shared within the process."""
+    key = Path(tables_dir_path).resolve()
+    with _SHARED_PIPELINES_LOCK:
+        if key not in _SHARED_PIPELINES:
+            _SHARED_PIPELINES[key] = reduce_dims_pipeline(key)
+        return _SHARED_PIPELINES[key]
@@ -0,0 +1,193 @@
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.dims_and_facts import (
+    LOAD_MAX_WORKERS,
+    TABLES,
+    MultiDimDatabase,
+    iter_file_chunks,
+    empty_table,
+    load_tables_concurrently,
+    table_files,
+)
+from app.metrics import stage
+from app.partitions import Partition, prune_partitions
+from app.schema import FOREIGN_KEYS
+
+# Default number of orders parsed at once while filtering
+DEFAULT_CHUNKSIZE = 1_000_000
+
+# Filter on the orders, fields left as None do not filter. `ordered_at` has to be
+# in [ordered_from, ordered_until), the other fields are collections of accepted
+# keys, None among the `promo_ids` accepts orders without a promo.
+OrdersPredicate = namedtuple(
+    "OrdersPredicate",
+    ["ordered_from", "ordered_until", "restaurant_ids", "user_ids", "promo_ids"],
+    defaults=[None] * 5,
+)
+
+# Key columns of the orders filtered by the fields of `OrdersPredicate`
+_KEY_FILTERS = {
+    "restaurant_ids": "restaurant_id",
+    "user_ids": "user_id",
+    "promo_ids": "promo_id",
+}
+
+
+def _isin(values: pd.Series, keys) -> np.ndarray:
+    keys = list(keys)
+    mask = values.isin([key for key in keys if not pd.isna(key)]).to_numpy()
+    if any(pd.isna(key) for key in keys):
+        mask |= values.isna().to_numpy()
+    return mask
+
+
+def orders_mask(orders: pd.DataFrame, predicate: OrdersPredicate) -> np.ndarray:
+    """Which rows of `orders` are accepted by `predicate`."""
+    mask = np.ones(len(orders), dtype=bool)
+    if predicate.ordered_from is not None:
+        mask &= (
+            orders["ordered_at"] >= pd.Timestamp(predicate.ordered_from)
+        ).to_numpy()
+    if predicate.ordered_until is not None:
+        mask &= (
+            orders["ordered_at"] < pd.Timestamp(predicate.ordered_until)
+        ).to_numpy()
+    for field, column in _KEY_FILTERS.items():
+        keys = getattr(predicate, field)
+        if keys is not None:
+            mask &= _isin(orders[column], keys)
+    return mask
+
+
+def _read_file_orders(
+    file_path: Path,
+    predicate: OrdersPredicate,
+    chunksize: int,
+    columns: Optional[List[str]],
+) -> Tuple[int, pd.DataFrame]:
+    rows_in = 0
+    chunks = []
+    for chunk in iter_file_chunks(file_path, "orders", chunksize, columns):
+        rows_in += len(chunk)
+        mask = orders_mask(chunk, predicate)
+        chunks.append(chunk if mask.all() else chunk[mask])
+    return rows_in, pd.concat(chunks) if len(chunks) > 1 else chunks[0]
+
+
+def read_orders(
+    tables_dir_path: Path,
+    predicate: OrdersPredicate,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    columns: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """Read the orders accepted by `predicate`, filtering each chunk as it is parsed.
+
+    At most `chunksize` rejected orders per file are held in memory at once. Files
+    of partitioned orders are read concurrently, those of months or days outside
+    of the `ordered_at` range of `predicate` are skipped.
+    """
+
+    def prune(partitions: List[Partition]) -> List[Partition]:
+        return prune_partitions(
+            partitions, "ordered_at", predicate.ordered_from, predicate.ordered_until
+        )
+
+    file_paths = table_files(tables_dir_path, "orders", prune)
+    with stage("read_table", "orders") as metrics:
+        if not file_paths:
+            orders = empty_table("orders", columns)
+            rows_in = 0
+        else:
+            read = partial(
+                _read_file_orders,
+                predicate=predicate,
+                chunksize=chunksize,
+                columns=columns,
+            )
+            if len(file_paths) == 1:
+                results = [read(file_paths[0])]
+            else:
+                with ThreadPoolExecutor(max_workers=LOAD_MAX_WORKERS) as executor:
+                    results = list(executor.map(read, file_paths))
+            rows_in = sum(rows for rows, _ in results)
+            frames = [frame for _, frame in results]
+            orders = pd.concat(frames) if len(frames) > 1 else frames[0]
+        metrics.rows(rows_in, len(orders))
+    return orders
+
+
+def _referencing_tables(table: str) -> List[str]:
+    return [source for source, keys in FOREIGN_KEYS.items() if table in keys.values()]
+
+
+def semi_join_reduce(
+    tables: Dict[str, pd.DataFrame], root: str = "orders"
+) -> Dict[str, pd.DataFrame]:
+    """Keep the rows of the tables transitively referenced by the rows of `root`.
+
+    A table is reduced once every table referencing it has been, to the union of
+    the keys they reference. Tables not reachable from `root` are left as they are.
+    """
+    reduced = {root: tables[root]}
+    pending = [table for table in tables if table != root]
+    while pending:
+        ready = [
+            table
+            for table in pending
+            if all(
+                source in reduced or source not in tables
+                for source in _referencing_tables(table)
+            )
+        ]
+        if not ready:
+            break
+        for table in ready:
+            pending.remove(table)
+            referenced = [
+                reduced[source][column]
+                for source in _referencing_tables(table)
+                if source in reduced
+                for column, target in FOREIGN_KEYS[source].items()
+                if target == table and column in reduced[source].columns
+            ]
+            if not referenced:
+                # Not reachable from the root
+                reduced[table] = tables[table]
+                continue
+            keys = pd.concat(referenced).dropna().unique()
+            dataframe = tables[table]
+            mask = dataframe.index.isin(keys)
+            reduced[table] = dataframe if mask.all() else dataframe[mask]
+    for table in pending:
+        reduced[table] = tables[table]
+    return {table: reduced[table] for table in tables}
+
+
+def load_tables_with_predicate(
+    tables_dir_path: Path, tables: List[str], predicate: OrdersPredicate
+) -> List[pd.DataFrame]:
+    """`load_tables`, with the orders filtered by `predicate` while they are parsed
+    and the other tables semi-join-reduced to the keys the remaining orders use."""
+    dimensions = [table for table in tables if table != "orders"]
+    loaded = dict(
+        zip(dimensions, load_tables_concurrently(tables_dir_path, dimensions))
+    )
+    if "orders" in tables:
+        loaded["orders"] = read_orders(tables_dir_path, predicate)
+        loaded = semi_join_reduce(loaded)
+    return [loaded[table] for table in tables]
+
+
+def load_database_with_predicate(
+    tables_dir_path: Path, predicate: OrdersPredicate
+) -> MultiDimDatabase:
+    return MultiDimDatabase(
+        *load_tables_with_predicate(tables_dir_path, TABLES, predicate)
+    )
@@ -0,0 +1,252 @@
+from collections import namedtuple
+from typing import Dict, List
+
+# Format of every timestamp stored in the CSV files
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Format of the natural key of the `birthdates` table, e.g. "18/12/1986"
+BIRTHDATE_ID_FORMAT = "%d/%m/%Y"
+
+# Layout of a single table: its index, typed columns (in file order), the columns
+# which are allowed to hold missing values and the formats of timestamp columns
+TableSchema = namedtuple(
+    "TableSchema", ["index", "index_dtype", "columns", "nullable", "date_formats"]
+)
+
+# Tables of the original database, as stored in the CSV files
+TABLE_SCHEMAS = {
+    "addresses": TableSchema(
+        index="address_id",
+        index_dtype="int64",
+        columns=[("district_id", "int64"), ("street", "object")],
+        nullable=[],
+        date_formats={},
+    ),
+    "birthdates": TableSchema(
+        index="birthdate_id",
+        index_dtype="object",
+        columns=[("year", "int64"), ("month", "int64"), ("day", "int64")],
+        nullable=[],
+        date_formats={},
+    ),
+    "cities": TableSchema(
+        index="city_id",
+        index_dtype="int64",
+        columns=[("name", "object"), ("state_id", "int64")],
+        nullable=[],
+        date_formats={},
+    ),
+    "countries": TableSchema(
+        index="country_id",
+        index_dtype="int64",
+        columns=[("name", "object")],
+        nullable=[],
+        date_formats={},
+    ),
+    "cuisines": TableSchema(
+        index="cuisine_id",
+        index_dtype="int64",
+        columns=[("name", "object")],
+        nullable=[],
+        date_formats={},
+    ),
+    "districts": TableSchema(
+        index="district_id",
+        index_dtype="int64",
+        columns=[("name", "object"), ("city_id", "int64")],
+        nullable=[],
+        date_formats={},
+    ),
+    "food": TableSchema(
+        index="food_id",
+        index_dtype="int64",
+        columns=[("name", "object"), ("cuisine_id", "int64"), ("price", "float64")],
+        nullable=[],
+        date_formats={},
+    ),
+    "orders": TableSchema(
+        index="order_id",
+        index_dtype="int64",
+        columns=[
+            ("user_id", "int64"),
+            ("address_id", "int64"),
+            ("restaurant_id", "int64"),
+            ("food_id", "int64"),
+            ("ordered_at", "datetime64[ns]"),
+            ("promo_id", "object"),
+        ],
+        nullable=["promo_id"],
+        date_formats={"ordered_at": DATETIME_FORMAT},
+    ),
+    "promos": TableSchema(
+        index="promo_id",
+        index_dtype="object",
+        columns=[("discount", "float64")],
+        nullable=[],
+        date_formats={},
+    ),
+    "restaurants": TableSchema(
+        index="restaurant_id",
+        index_dtype="int64",
+        columns=[("name", "object"), ("address_id", "int64")],
+        nullable=[],
+        date_formats={},
+    ),
+    "states": TableSchema(
+        index="state_id",
+        index_dtype="int64",
+        columns=[("name", "object"), ("country_id", "int64")],
+        nullable=[],
+        date_formats={},
+    ),
+    "users": TableSchema(
+        index="user_id",
+        index_dtype="int64",
+        columns=[
+            ("first_name", "object"),
+            ("last_name", "object"),
+            ("birthdate_id", "object"),
+            ("registred_at", "datetime64[ns]"),
+        ],
+        nullable=[],
+        date_formats={"registred_at": DATETIME_FORMAT},
+    ),
+}
+
+# Tables of the star schema produced by `reduce_dims`
+REDUCED_TABLE_SCHEMAS = {
+    "orders": TableSchema(
+        index="order_id",
+        index_dtype="int64",
+        columns=[
+            ("user_id", "int64"),
+            ("address_id", "int64"),
+            ("restaurant_id", "int64"),
+            ("food_id", "int64"),
+            ("ordered_at", "datetime64[ns]"),
+            ("promo_id", "object"),
+        ],
+        nullable=["promo_id"],
+        date_formats={},
+    ),
+    "users": TableSchema(
+        index="user_id",
+        index_dtype="int64",
+        columns=[
+            ("first_name", "object"),
+            ("last_name", "object"),
+            ("birthdate", "datetime64[ns]"),
+            ("registred_at", "datetime64[ns]"),
+        ],
+        nullable=[],
+        date_formats={},
+    ),
+    "food": TableSchema(
+        index="food_id",
+        index_dtype="int64",
+        columns=[("name", "object"), ("cuisine", "object"), ("price", "float64")],
+        nullable=[],
+        date_formats={},
+    ),
+    "promos": TableSchema(
+        index="promo_id",
+        index_dtype="object",
+        columns=[("discount", "float64")],
+        nullable=[],
+        date_formats={},
+    ),
+    "restaurants": TableSchema(
+        index="restaurant_id",
+        index_dtype="int64",
+        columns=[("name", "object"), ("address_id", "int64")],
+        nullable=[],
+        date_formats={},
+    ),
+    "addresses": TableSchema(
+        index="address_id",
+        index_dtype="int64",
+        columns=[
+            ("country", "object"),
+            ("state", "object"),
+            ("city", "object"),
+            ("district", "object"),
+            ("street", "object"),
+        ],
+        nullable=[],
+        date_formats={},
+    ),
+}
+
+# Table built by `create_orders_by_meal_type_age_cuisine_table`
+ORDERS_BY_MEAL_TYPE_AGE_CUISINE_SCHEMA = TableSchema(
+    index="order_id",
+    index_dtype="int64",
+    columns=[
+        ("meal_type", "object"),
+        ("user_age", "object"),
+        ("food_cuisine", "object"),
+    ],
+    nullable=[],
+    date_formats={},
+)
+
+# Low-cardinality columns, stored as categoricals by the compact variants of
+# `reduce_dims` and `create_orders_by_meal_type_age_cuisine_table`
+COMPACT_COLUMNS = {
+    "orders": ["promo_id"],
+    "food": ["cuisine"],
+    "addresses": ["country", "state", "city", "district"],
+    "orders_by_meal_type_age_cuisine": ["meal_type", "user_age", "food_cuisine"],
+}
+
+# Columns of the original tables read by `reduce_dims`
+REDUCE_DIMS_SOURCE_COLUMNS = {
+    "addresses": ["district_id", "street"],
+    "birthdates": ["year", "month", "day"],
+    "cities": ["name", "state_id"],
+    "countries": ["name"],
+    "cuisines": ["name"],
+    "districts": ["name", "city_id"],
+    "food": ["name", "cuisine_id", "price"],
+    "orders": [
+        "user_id",
+        "address_id",
+        "restaurant_id",
+        "food_id",
+        "ordered_at",
+        "promo_id",
+    ],
+    "promos": ["discount"],
+    "restaurants": ["name", "address_id"],
+    "states": ["name", "country_id"],
+    "users": ["first_name", "last_name", "birthdate_id", "registred_at"],
+}
+
+
+# Columns of the original tables referencing the index of another table
+FOREIGN_KEYS = {
+    "addresses": {"district_id": "districts"},
+    "cities": {"state_id": "states"},
+    "districts": {"city_id": "cities"},
+    "food": {"cuisine_id": "cuisines"},
+    "orders": {
+        "user_id": "users",
+        "address_id": "addresses",
+        "restaurant_id": "restaurants",
+        "food_id": "food",
+        "promo_id": "promos",
+    },
+    "restaurants": {"address_id": "addresses"},
+    "states": {"country_id": "countries"},
+    "users": {"birthdate_id": "birthdates"},
+}
+
+
+def column_names(schema: TableSchema) -> List[str]:
+    return [name for name, _ in schema.columns]
+
+
+def column_dtypes(schema: TableSchema) -> Dict[str, str]:
+    dtypes = {schema.index: schema.index_dtype}
+    dtypes.update(schema.columns)
+    return dtypes
@@ -0,0 +1,238 @@
+import hashlib
+import json
+import os
+import shutil
+from collections import namedtuple
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from app.columnar import read_frame, write_frame
+from app.dims_and_facts import (
+    TABLES,
+    TABLES_DIR_PATH,
+    MultiDimDatabase,
+    _reduce_addresses,
+    load_tables,
+    read_table,
+    table_files,
+)
+from app.geography import GEOGRAPHY_TABLES
+from app.schema import TABLE_SCHEMAS
+
+# Directory holding the snapshots, unless a store is given explicitly
+DEFAULT_SNAPSHOT_DIR = Path(
+    os.environ.get(
+        "DIMS_AND_FACTS_SNAPSHOT_DIR", Path.home() / ".cache" / "dims_and_facts"
+    )
+)
+
+# Snapshots are evicted, least recently used first, once they take more space than this
+DEFAULT_SNAPSHOT_BUDGET = 1 << 30
+
+# Bump whenever the way tables are loaded changes, so that older snapshots are not reused
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Bump whenever `_reduce_addresses` changes, so that older reduced addresses are
+# not reused
+REDUCED_ADDRESSES_VERSION = 1
+
+# Marker written once a snapshot is complete, its mtime tracks the last use
+_COMPLETE_MARKER = "COMPLETE"
+_FINGERPRINTS_FILE = "fingerprints.json"
+_LATEST_FILE = "latest.json"
+
+# Identity of a single CSV file
+Fingerprint = namedtuple("Fingerprint", ["size", "mtime_ns", "digest"])
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint_file(path: Path, known: Optional[Fingerprint] = None) -> Fingerprint:
+    stat = path.stat()
+    # An unchanged size and mtime means the content does not have to be hashed again
+    if known is not None and (known.size, known.mtime_ns) == (
+        stat.st_size,
+        stat.st_mtime_ns,
+    ):
+        return known
+    return Fingerprint(stat.st_size, stat.st_mtime_ns, _file_digest(path))
+
+
+def _read_json(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_json(path: Path, content: dict) -> None:
+    temporary_path = path.with_name(path.name + ".%d.tmp" % os.getpid())
+    temporary_path.write_text(json.dumps(content))
+    os.replace(temporary_path, path)
+
+
+def _directory_size(path: Path) -> int:
+    return sum(file.stat().st_size for file in path.rglob("*") if file.is_file())
+
+
+class SnapshotStore:
+    def __init__(
+        self,
+        directory: Path = DEFAULT_SNAPSHOT_DIR,
+        max_bytes: int = DEFAULT_SNAPSHOT_BUDGET,
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def fingerprint(
+        self, tables_dir_path: Path, tables: List[str], version: tuple = ()
+    ) -> str:
+        """Key of the snapshot of `tables`, as currently stored in `tables_dir_path`.
+
+        Directories holding the same files get keys of their own, so that their
+        snapshots are replaced independently. `version` stands for the code
+        deriving the snapshot from the tables, if any.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        memo_path = self.directory / _FINGERPRINTS_FILE
+        memo = _read_json(memo_path)
+        digests = []
+        for table in tables:
+            # Partitioned tables contribute every data file, by their relative path
+            for file_path in table_files(tables_dir_path, table):
+                path = file_path.resolve()
+                known = memo.get(str(path))
+                fingerprint = fingerprint_file(
+                    path, Fingerprint(*known) if known is not None else None
+                )
+                memo[str(path)] = list(fingerprint)
+                name = file_path.relative_to(tables_dir_path).as_posix()
+                digests.append((name, fingerprint.size, fingerprint.digest))
+        _write_json(memo_path, memo)
+
+        key = hashlib.blake2b(digest_size=16)
+        key.update(
+            repr(
+                (
+                    SNAPSHOT_FORMAT_VERSION,
+                    version,
+                    str(Path(tables_dir_path).resolve()),
+                    TABLE_SCHEMAS,
+                    digests,
+                )
+            ).encode()
+        )
+        return key.hexdigest()
+
+    def load(self, key: str) -> Optional[Dict[str, pd.DataFrame]]:
+        path = self.directory / key
+        marker = path / _COMPLETE_MARKER
+        if not marker.exists():
+            return None
+        marker.touch()
+        return {
+            table.name: read_frame(table)
+            for table in sorted(path.iterdir())
+            if table.is_dir()
+        }
+
+    def save(self, key: str, frames: Dict[str, pd.DataFrame]) -> None:
+        path = self.directory / key
+        temporary_path = self.directory / (key + ".%d.tmp" % os.getpid())
+        shutil.rmtree(temporary_path, ignore_errors=True)
+        try:
+            for table, dataframe in frames.items():
+                write_frame(dataframe, temporary_path / table)
+        except ValueError:
+            # A frame which cannot be stored leaves no partial snapshot behind
+            shutil.rmtree(temporary_path, ignore_errors=True)
+            raise
+        (temporary_path / _COMPLETE_MARKER).touch()
+        try:
+            os.rename(temporary_path, path)
+        except OSError:
+            # Another process has stored the very same snapshot in the meantime
+            shutil.rmtree(temporary_path, ignore_errors=True)
+        self.evict(keep=key)
+
+    def discard(self, key: str) -> None:
+        shutil.rmtree(self.directory / key, ignore_errors=True)
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        snapshots = []
+        for path in self.directory.iterdir():
+            marker = path / _COMPLETE_MARKER
+            if marker.exists():
+                snapshots.append((marker.stat().st_mtime, path))
+        snapshots.sort(reverse=True)
+
+        total_size = 0
+        for _, path in snapshots:
+            total_size += _directory_size(path)
+            if total_size > self.max_bytes and path.name != keep:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def replace_latest(
+        self, tables_dir_path: Path, key: str, name: str = "database"
+    ) -> None:
+        """Remember `key` as the `name` snapshot of `tables_dir_path`, drop the old one."""
+        latest_path = self.directory / _LATEST_FILE
+        latest = _read_json(latest_path)
+        entry = name + ":" + str(tables_dir_path.resolve())
+        previous = latest.get(entry)
+        if previous == key:
+            return
+        if previous is not None:
+            self.discard(previous)
+        latest[entry] = key
+        _write_json(latest_path, latest)
+
+
+def load_database(
+    tables_dir_path: Path = TABLES_DIR_PATH, store: Optional[SnapshotStore] = None
+) -> MultiDimDatabase:
+    """Load all `TABLES`, from a snapshot when the CSV files have not changed."""
+    if store is None:
+        store = SnapshotStore()
+    key = store.fingerprint(tables_dir_path, TABLES)
+    frames = store.load(key)
+    if frames is None:
+        frames = dict(zip(TABLES, load_tables(tables_dir_path, TABLES)))
+        store.save(key, frames)
+    store.replace_latest(tables_dir_path, key)
+    return MultiDimDatabase(**frames)
+
+
+def load_reduced_addresses(
+    tables_dir_path: Path = TABLES_DIR_PATH, store: Optional[SnapshotStore] = None
+) -> pd.DataFrame:
+    """Reduced `addresses`, resolved again only when a geography table has changed."""
+    if store is None:
+        store = SnapshotStore()
+    key = store.fingerprint(
+        tables_dir_path, GEOGRAPHY_TABLES, ("addresses", REDUCED_ADDRESSES_VERSION)
+    )
+    frames = store.load(key)
+    if frames is None:
+        db = MultiDimDatabase(
+            **{
+                table: (
+                    read_table(tables_dir_path, table)
+                    if table in GEOGRAPHY_TABLES
+                    else None
+                )
+                for table in TABLES
+            }
+        )
+        frames = {"addresses": _reduce_addresses(db)}
+        store.save(key, frames)
+    store.replace_latest(tables_dir_path, key, "addresses")
+    return frames["addresses"]
@@ -0,0 +1,215 @@
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+import pandas as pd
+
+from app.dims_and_facts import (
+    TABLES,
+    ReducedDatabase,
+    _conform,
+    _normalise_missing,
+    iter_table_chunks,
+)
+from app.export import export_tables_to_sqlite
+from app.metrics import stage
+from app.schema import (
+    ORDERS_BY_MEAL_TYPE_AGE_CUISINE_SCHEMA,
+    REDUCED_TABLE_SCHEMAS,
+    TableSchema,
+    column_names,
+)
+
+# Default number of rows parsed from a CSV file or fetched from a cursor at once
+DEFAULT_BATCH_SIZE = 100_000
+
+# Birthdate of the user `u`, from its row `b` of the birthdates table or parsed
+# from its "dd/mm/yyyy" id when there is none. Days past the end of their month
+# are shifted into the next one by `date()`, which is how invalid rows are told.
+_BIRTHDATE_TEXT = "printf('%04d-%02d-%02d', b.year, b.month, b.day)"
+_BIRTHDATE = """CASE
+    WHEN b.birthdate_id IS NULL THEN substr(u.birthdate_id, 7, 4)
+        || '-' || substr(u.birthdate_id, 4, 2)
+        || '-' || substr(u.birthdate_id, 1, 2)
+    WHEN date({text}, '+0 days') = {text} THEN {text}
+END""".format(text=_BIRTHDATE_TEXT)
+
+# Time of day of an order as "HH:MM:SS.fffffffff", from its ISO 8601 timestamp.
+# `time()` would drop the fraction of the second, which `app.classify` bins by.
+_TIME_OF_DAY = """(substr(o.ordered_at, 12, 8) || '.'
+    || substr(substr(o.ordered_at, 21) || '000000000', 1, 9))"""
+
+# Same bins as `app.classify`: breakfast excludes both 6 am and 10 am, lunch
+# includes both 10 am and 4 pm
+_MEAL_TYPE = """CASE
+    WHEN {time} > '06:00:00.000000000' AND {time} < '10:00:00.000000000'
+        THEN 'breakfast'
+    WHEN {time} BETWEEN '10:00:00.000000000' AND '16:00:00.000000000'
+        THEN 'lunch'
+    ELSE 'dinner'
+END""".format(time=_TIME_OF_DAY)
+
+# Users without a known birthdate have no age, as in `app.classify`
+_USER_AGE = """CASE
+    WHEN {birthdate} >= '1995-01-01' THEN 'young'
+    WHEN {birthdate} >= '1970-01-01' THEN 'adult'
+    WHEN {birthdate} IS NOT NULL THEN 'old'
+END""".format(birthdate=_BIRTHDATE)
+
+# Queries building each table of the `ReducedDatabase`, rows in file order. Every
+# join looks the referenced row up through the index on its key.
+REDUCED_QUERIES = {
+    "orders": """
+        SELECT order_id, user_id, address_id, restaurant_id, food_id, ordered_at,
+            promo_id
+        FROM orders
+        ORDER BY rowid""",
+    "users": """
+        SELECT u.user_id, u.first_name, u.last_name, {birthdate} AS birthdate,
+            u.registred_at
+        FROM users AS u
+        LEFT JOIN birthdates AS b ON b.birthdate_id = u.birthdate_id
+        ORDER BY u.rowid""".format(
+        birthdate=_BIRTHDATE
+    ),
+    "food": """
+        SELECT f.food_id, f.name, c.name AS cuisine, f.price
+        FROM food AS f
+        LEFT JOIN cuisines AS c ON c.cuisine_id = f.cuisine_id
+        ORDER BY f.rowid""",
+    "promos": """
+        SELECT promo_id, discount
+        FROM promos
+        ORDER BY rowid""",
+    "restaurants": """
+        SELECT restaurant_id, name, address_id
+        FROM restaurants
+        ORDER BY rowid""",
+    "addresses": """
+        SELECT a.address_id, co.name AS country, s.name AS state, ci.name AS city,
+            d.name AS district, a.street
+        FROM addresses AS a
+        LEFT JOIN districts AS d ON d.district_id = a.district_id
+        LEFT JOIN cities AS ci ON ci.city_id = d.city_id
+        LEFT JOIN states AS s ON s.state_id = ci.state_id
+        LEFT JOIN countries AS co ON co.country_id = s.country_id
+        ORDER BY a.rowid""",
+}
+
+# Query building the table of `create_orders_by_meal_type_age_cuisine_table`
+ORDERS_BY_MEAL_TYPE_AGE_CUISINE_QUERY = """
+    SELECT o.order_id, {meal_type} AS meal_type, {user_age} AS user_age,
+        c.name AS food_cuisine
+    FROM orders AS o
+    LEFT JOIN users AS u ON u.user_id = o.user_id
+    LEFT JOIN birthdates AS b ON b.birthdate_id = u.birthdate_id
+    LEFT JOIN food AS f ON f.food_id = o.food_id
+    LEFT JOIN cuisines AS c ON c.cuisine_id = f.cuisine_id
+    ORDER BY o.order_id""".format(meal_type=_MEAL_TYPE, user_age=_USER_AGE)
+
+
+def load_tables_into_sqlite(
+    tables_dir_path: Path,
+    connection: sqlite3.Connection,
+    tables: List[str] = TABLES,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Dict[str, int]:
+    """Bulk-load the CSV files of `tables` into `connection`, a chunk at a time.
+
+    Incomplete rows are dropped as by `read_table`. The index and the foreign key
+    columns of every table are indexed. Returns the rows loaded per table.
+    """
+    return export_tables_to_sqlite(
+        {
+            table: iter_table_chunks(tables_dir_path, table, batch_size)
+            for table in tables
+        },
+        connection,
+    )
+
+
+def _frame(rows: list, schema: TableSchema) -> pd.DataFrame:
+    dataframe = pd.DataFrame.from_records(
+        rows, columns=[schema.index] + column_names(schema)
+    )
+    for name, dtype in schema.columns:
+        if dtype == "datetime64[ns]":
+            dataframe[name] = pd.to_datetime(dataframe[name])
+    dataframe = dataframe.set_index(schema.index)
+    # NULLs are fetched as None, missing strings are NaN as in `read_table`
+    dataframe = _normalise_missing(
+        dataframe, schema, [schema.index] + column_names(schema)
+    )
+    return _conform(dataframe, schema)
+
+
+def iter_query(
+    connection: sqlite3.Connection,
+    query: str,
+    schema: TableSchema,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[pd.DataFrame]:
+    """Frames of `schema` holding at most `batch_size` rows of `query` each.
+
+    At least one, possibly empty, frame is yielded.
+    """
+    cursor = connection.execute(query)
+    try:
+        rows = cursor.fetchmany(batch_size)
+        while True:
+            yield _frame(rows, schema)
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+    finally:
+        cursor.close()
+
+
+def iter_reduced_table(
+    connection: sqlite3.Connection, table: str, batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[pd.DataFrame]:
+    """Batches of the `table` of the `ReducedDatabase`, built by SQLite."""
+    return iter_query(
+        connection, REDUCED_QUERIES[table], REDUCED_TABLE_SCHEMAS[table], batch_size
+    )
+
+
+def _concat(frames: Iterator[pd.DataFrame]) -> pd.DataFrame:
+    frames = list(frames)
+    return pd.concat(frames) if len(frames) > 1 else frames[0]
+
+
+def reduce_dims_sqlite(
+    connection: sqlite3.Connection, batch_size: int = DEFAULT_BATCH_SIZE
+) -> ReducedDatabase:
+    """`reduce_dims` over the tables loaded by `load_tables_into_sqlite`."""
+    with stage("reduce_dims"):
+        tables = []
+        for table in ReducedDatabase._fields:
+            with stage("reduce_dims", table):
+                tables.append(
+                    _concat(iter_reduced_table(connection, table, batch_size))
+                )
+        return ReducedDatabase(*tables)
+
+
+def iter_orders_by_meal_type_age_cuisine_sqlite(
+    connection: sqlite3.Connection, batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[pd.DataFrame]:
+    """Batches of the derived fact table, built by SQLite in `order_id` order."""
+    return iter_query(
+        connection,
+        ORDERS_BY_MEAL_TYPE_AGE_CUISINE_QUERY,
+        ORDERS_BY_MEAL_TYPE_AGE_CUISINE_SCHEMA,
+        batch_size,
+    )
+
+
+def create_orders_by_meal_type_age_cuisine_table_sqlite(
+    connection: sqlite3.Connection, batch_size: int = DEFAULT_BATCH_SIZE
+) -> pd.DataFrame:
+    """`create_orders_by_meal_type_age_cuisine_table` over the loaded tables."""
+    with stage("orders_by_meal_type_age_cuisine", "orders"):
+        return _concat(
+            iter_orders_by_meal_type_age_cuisine_sqlite(connection, batch_size)
+        )
@@ -0,0 +1,91 @@
+from pathlib import Path
+from typing import Iterator, Optional
+
+import pandas as pd
+
+from app.dims_and_facts import (
+    TABLES,
+    MultiDimDatabase,
+    ReducedDatabase,
+    _conform,
+    _reduce_addresses,
+    _reduce_food,
+    _reduce_promos,
+    _reduce_restaurants,
+    _reduce_users,
+    create_orders_by_meal_type_age_cuisine_table,
+    iter_table_chunks,
+    read_table,
+)
+from app.pushdown import OrdersPredicate, orders_mask
+from app.schema import REDUCE_DIMS_SOURCE_COLUMNS, REDUCED_TABLE_SCHEMAS
+
+# Default number of orders held in memory at once
+DEFAULT_CHUNKSIZE = 1_000_000
+
+
+def load_dimensions(tables_dir_path: Path) -> ReducedDatabase:
+    """Reduce every dimension table, leaving `orders` out of memory."""
+    db = MultiDimDatabase(
+        **{
+            table: (
+                None
+                if table == "orders"
+                else read_table(
+                    tables_dir_path, table, REDUCE_DIMS_SOURCE_COLUMNS[table]
+                )
+            )
+            for table in TABLES
+        }
+    )
+    return ReducedDatabase(
+        orders=None,
+        users=_reduce_users(db),
+        food=_reduce_food(db),
+        promos=_reduce_promos(db),
+        restaurants=_reduce_restaurants(db),
+        addresses=_reduce_addresses(db),
+    )
+
+
+def iter_reduced_orders(
+    tables_dir_path: Path,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    predicate: Optional[OrdersPredicate] = None,
+) -> Iterator[pd.DataFrame]:
+    schema = REDUCED_TABLE_SCHEMAS["orders"]
+    for chunk in iter_table_chunks(tables_dir_path, "orders", chunksize):
+        if predicate is not None:
+            chunk = chunk[orders_mask(chunk, predicate)]
+        yield _conform(chunk, schema)
+
+
+def iter_orders_by_meal_type_age_cuisine(
+    tables_dir_path: Path,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    dimensions: Optional[ReducedDatabase] = None,
+    predicate: Optional[OrdersPredicate] = None,
+) -> Iterator[pd.DataFrame]:
+    """Build the derived fact table one chunk of `orders.csv` at a time.
+
+    Every chunk is sorted by `order_id`, chunks come out in the order of the file.
+    Orders rejected by `predicate` are dropped from each chunk before the joins.
+    """
+    if dimensions is None:
+        dimensions = load_dimensions(tables_dir_path)
+    for orders in iter_reduced_orders(tables_dir_path, chunksize, predicate):
+        yield create_orders_by_meal_type_age_cuisine_table(
+            dimensions._replace(orders=orders)
+        )
+
+
+def write_orders_by_meal_type_age_cuisine(
+    tables_dir_path: Path, output_path: Path, chunksize: int = DEFAULT_CHUNKSIZE
+) -> int:
+    """Stream the derived fact table into a CSV file, returns the number of rows."""
+    rows = 0
+    with open(output_path, "w", newline="") as output:
+        for chunk in iter_orders_by_meal_type_age_cuisine(tables_dir_path, chunksize):
+            chunk.to_csv(output, header=rows == 0)
+            rows += len(chunk)
+    return rows
@@ -0,0 +1,99 @@
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.dims_and_facts import TABLES, MultiDimDatabase, load_tables
+from app.schema import FOREIGN_KEYS, TABLE_SCHEMAS
+
+# Tables keyed by strings, which get integer surrogate keys
+SURROGATE_KEY_TABLES = [
+    table for table, schema in TABLE_SCHEMAS.items() if schema.index_dtype == "object"
+]
+
+
+class KeyMap:
+    """Bidirectional map between the natural keys of a table and int32 codes.
+
+    Codes are the positions of the keys, -1 stands for a missing key. Keys which
+    are referenced but not in the table are appended, so that they still decode
+    while not matching any row of the table.
+    """
+
+    def __init__(self, natural_keys: pd.Index):
+        self.natural_keys = pd.Index(natural_keys, dtype=object)
+
+    def __len__(self) -> int:
+        return len(self.natural_keys)
+
+    def encode(self, keys) -> np.ndarray:
+        keys = np.asarray(keys, dtype=object)
+        codes = self.natural_keys.get_indexer(keys)
+        unknown = (codes < 0) & pd.notna(keys)
+        if unknown.any():
+            self.natural_keys = self.natural_keys.append(
+                pd.Index(pd.unique(keys[unknown]), dtype=object)
+            )
+            codes[unknown] = self.natural_keys.get_indexer(keys[unknown])
+        return codes.astype(np.int32)
+
+    def decode(self, codes) -> np.ndarray:
+        codes = np.asarray(codes)
+        # Code -1 picks the trailing NaN
+        return np.append(self.natural_keys.to_numpy(), np.nan).take(codes)
+
+
+def _encoded_columns(table: str, key_maps: Dict[str, KeyMap]) -> Dict[str, str]:
+    return {
+        column: target
+        for column, target in FOREIGN_KEYS.get(table, {}).items()
+        if target in key_maps
+    }
+
+
+def encode_database(db: MultiDimDatabase) -> Tuple[MultiDimDatabase, Dict[str, KeyMap]]:
+    """Replace string keys of `db` with int32 surrogates, returns the maps used."""
+    key_maps = {
+        table: KeyMap(getattr(db, table).index) for table in SURROGATE_KEY_TABLES
+    }
+    tables = {}
+    for table in db._fields:
+        dataframe = getattr(db, table)
+        encoded = {
+            column: key_maps[target].encode(dataframe[column])
+            for column, target in _encoded_columns(table, key_maps).items()
+            if column in dataframe.columns
+        }
+        if encoded or table in key_maps:
+            dataframe = dataframe.assign(**encoded)
+        if table in key_maps:
+            dataframe.index = pd.RangeIndex(len(dataframe), name=dataframe.index.name)
+        tables[table] = dataframe
+    return MultiDimDatabase(**tables), key_maps
+
+
+def decode_database(db: tuple, key_maps: Dict[str, KeyMap]) -> tuple:
+    """Restore the natural keys of any database namedtuple encoded with `key_maps`."""
+    tables = {}
+    for table in db._fields:
+        dataframe = getattr(db, table)
+        decoded = {
+            column: key_maps[target].decode(dataframe[column])
+            for column, target in _encoded_columns(table, key_maps).items()
+            if column in dataframe.columns
+        }
+        if decoded or table in key_maps:
+            dataframe = dataframe.assign(**decoded)
+        if table in key_maps:
+            dataframe.index = pd.Index(
+                key_maps[table].decode(dataframe.index), name=dataframe.index.name
+            )
+        tables[table] = dataframe
+    return type(db)(**tables)
+
+
+def load_encoded_database(
+    tables_dir_path: Path,
+) -> Tuple[MultiDimDatabase, Dict[str, KeyMap]]:
+    return encode_database(MultiDimDatabase(*load_tables(tables_dir_path, TABLES)))
@@ -0,0 +1,279 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app.schema import BIRTHDATE_ID_FORMAT, DATETIME_FORMAT, TABLE_SCHEMAS
+
+# Default number of orders generated and written at once
+DEFAULT_CHUNKSIZE = 1_000_000
+
+# Exponent of the Zipf-like popularity of users, restaurants, food and promos
+DEFAULT_SKEW = 0.8
+
+# Share of orders placed with a promo code
+PROMO_SHARE = 0.3
+
+# Relative number of orders placed in every hour of the day, peaking at lunch and dinner
+HOURLY_TRAFFIC = np.array(
+    [3, 2, 1, 1, 1, 1, 2, 4, 6, 6, 7, 10, 14, 13, 9, 7, 8, 11, 15, 16, 13, 9, 6, 4],
+    dtype=np.float64,
+)
+
+COUNTRIES = ["Poland", "USA", "Germany", "Italy"]
+CUISINES = [
+    "polish",
+    "italian",
+    "turkish",
+    "american",
+    "japanese",
+    "chinese",
+    "thai",
+    "mexican",
+    "indian",
+    "french",
+    "greek",
+    "vietnamese",
+]
+FIRST_NAMES = ["Tori", "Simra", "Rueben", "Ewen", "Reid", "Hibba", "Elisa", "Kira"]
+LAST_NAMES = ["Liu", "Kearney", "Lowery", "Mack", "Morse", "Rojas", "Derrick", "Burris"]
+
+# Orders are placed within this period
+ORDERS_START = np.datetime64("2019-01-01")
+ORDERS_DAYS = 730
+
+
+def zipf_choice(
+    rng: np.random.Generator, population: int, size: int, skew: float = DEFAULT_SKEW
+) -> np.ndarray:
+    """Draw `size` positions in `range(population)`, a few of them being very popular."""
+    weights = 1.0 / np.arange(1, population + 1) ** skew
+    cumulative = np.cumsum(weights)
+    ranks = np.searchsorted(cumulative, rng.random(size) * cumulative[-1], side="right")
+    # Popularity does not follow the key order
+    popularity = np.random.default_rng(population).permutation(population)
+    return popularity.take(np.minimum(ranks, population - 1))
+
+
+def _dimension_sizes(orders: int) -> dict:
+    users = max(8, orders // 20)
+    restaurants = max(10, orders // 2_000)
+    return {
+        "countries": len(COUNTRIES),
+        "states": max(3, min(200, orders // 100_000 + 3)),
+        "cities": max(3, min(5_000, orders // 10_000 + 3)),
+        "districts": max(9, min(50_000, orders // 1_000 + 9)),
+        "cuisines": len(CUISINES),
+        "food": max(6, min(100_000, orders // 500 + 6)),
+        "promos": max(3, min(1_000, orders // 50_000 + 3)),
+        "restaurants": restaurants,
+        "users": users,
+        # Every user and every restaurant has an address of their own
+        "addresses": users + restaurants,
+    }
+
+
+def _write(dataframe: pd.DataFrame, tables_dir_path: Path, table: str) -> None:
+    schema = TABLE_SCHEMAS[table]
+    dataframe.index.name = schema.index
+    dataframe.to_csv(tables_dir_path / (table + ".csv"), date_format=DATETIME_FORMAT)
+
+
+def _ids(count: int) -> pd.RangeIndex:
+    return pd.RangeIndex(1, count + 1)
+
+
+def _write_dimensions(
+    tables_dir_path: Path, sizes: dict, rng: np.random.Generator, skew: float
+) -> pd.DataFrame:
+    _write(
+        pd.DataFrame({"name": COUNTRIES}, index=_ids(sizes["countries"])),
+        tables_dir_path,
+        "countries",
+    )
+    _write(
+        pd.DataFrame(
+            {
+                "name": ["state %d" % state for state in range(1, sizes["states"] + 1)],
+                "country_id": rng.integers(1, sizes["countries"] + 1, sizes["states"]),
+            },
+            index=_ids(sizes["states"]),
+        ),
+        tables_dir_path,
+        "states",
+    )
+    _write(
+        pd.DataFrame(
+            {
+                "name": ["city %d" % city for city in range(1, sizes["cities"] + 1)],
+                "state_id": rng.integers(1, sizes["states"] + 1, sizes["cities"]),
+            },
+            index=_ids(sizes["cities"]),
+        ),
+        tables_dir_path,
+        "cities",
+    )
+    _write(
+        pd.DataFrame(
+            {
+                "name": [
+                    "district %d" % district
+                    for district in range(1, sizes["districts"] + 1)
+                ],
+                "city_id": zipf_choice(rng, sizes["cities"], sizes["districts"], skew)
+                + 1,
+            },
+            index=_ids(sizes["districts"]),
+        ),
+        tables_dir_path,
+        "districts",
+    )
+    _write(
+        pd.DataFrame(
+            {
+                "district_id": zipf_choice(
+                    rng, sizes["districts"], sizes["addresses"], skew
+                )
+                + 1,
+                "street": np.char.add(
+                    "street ",
+                    rng.integers(1, 1_000, sizes["addresses"]).astype(str),
+                ),
+            },
+            index=_ids(sizes["addresses"]),
+        ),
+        tables_dir_path,
+        "addresses",
+    )
+    _write(
+        pd.DataFrame({"name": CUISINES}, index=_ids(sizes["cuisines"])),
+        tables_dir_path,
+        "cuisines",
+    )
+    _write(
+        pd.DataFrame(
+            {
+                "name": ["dish %d" % food for food in range(1, sizes["food"] + 1)],
+                "cuisine_id": zipf_choice(rng, sizes["cuisines"], sizes["food"], skew)
+                + 1,
+                "price": np.round(rng.uniform(5, 60, sizes["food"]), 2),
+            },
+            index=_ids(sizes["food"]),
+        ),
+        tables_dir_path,
+        "food",
+    )
+    promos = pd.DataFrame(
+        {"discount": np.round(rng.uniform(0.05, 0.5, sizes["promos"]), 2)},
+        index=pd.Index(["PROMO%d" % promo for promo in range(1, sizes["promos"] + 1)]),
+    )
+    _write(promos, tables_dir_path, "promos")
+    _write(
+        pd.DataFrame(
+            {
+                "name": [
+                    "restaurant %d" % restaurant
+                    for restaurant in range(1, sizes["restaurants"] + 1)
+                ],
+                "address_id": np.arange(sizes["users"] + 1, sizes["addresses"] + 1),
+            },
+            index=_ids(sizes["restaurants"]),
+        ),
+        tables_dir_path,
+        "restaurants",
+    )
+
+    birthdates = pd.to_datetime(
+        rng.integers(-30 * 365, 36 * 365, sizes["users"]), unit="D"
+    )
+    birthdate_ids = birthdates.strftime(BIRTHDATE_ID_FORMAT)
+    users = pd.DataFrame(
+        {
+            "first_name": np.array(FIRST_NAMES).take(
+                rng.integers(0, len(FIRST_NAMES), sizes["users"])
+            ),
+            "last_name": np.array(LAST_NAMES).take(
+                rng.integers(0, len(LAST_NAMES), sizes["users"])
+            ),
+            "birthdate_id": birthdate_ids,
+            "registred_at": pd.Timestamp(ORDERS_START)
+            - pd.to_timedelta(rng.integers(0, 365 * 86_400, sizes["users"]), unit="s"),
+        },
+        index=_ids(sizes["users"]),
+    )
+    _write(users, tables_dir_path, "users")
+
+    unique_birthdates = pd.DatetimeIndex(birthdates).unique()
+    _write(
+        pd.DataFrame(
+            {
+                "year": unique_birthdates.year,
+                "month": unique_birthdates.month,
+                "day": unique_birthdates.day,
+            },
+            index=unique_birthdates.strftime(BIRTHDATE_ID_FORMAT),
+        ),
+        tables_dir_path,
+        "birthdates",
+    )
+    return promos
+
+
+def _orders_chunk(
+    first_order_id: int,
+    size: int,
+    sizes: dict,
+    promo_ids: np.ndarray,
+    rng: np.random.Generator,
+    skew: float,
+) -> pd.DataFrame:
+    user_id = zipf_choice(rng, sizes["users"], size, skew) + 1
+    hour = rng.choice(24, size, p=HOURLY_TRAFFIC / HOURLY_TRAFFIC.sum())
+    seconds = (
+        rng.integers(0, ORDERS_DAYS, size) * 86_400
+        + hour * 3_600
+        + rng.integers(0, 3_600, size)
+    )
+    promo = np.where(
+        rng.random(size) < PROMO_SHARE,
+        promo_ids.take(zipf_choice(rng, len(promo_ids), size, skew)),
+        None,
+    )
+    return pd.DataFrame(
+        {
+            "user_id": user_id,
+            # Orders are delivered to the address of the user
+            "address_id": user_id,
+            "restaurant_id": zipf_choice(rng, sizes["restaurants"], size, skew) + 1,
+            "food_id": zipf_choice(rng, sizes["food"], size, skew) + 1,
+            "ordered_at": ORDERS_START + seconds.astype("timedelta64[s]"),
+            "promo_id": promo,
+        },
+        index=pd.RangeIndex(first_order_id, first_order_id + size, name="order_id"),
+    )
+
+
+def generate_tables(
+    tables_dir_path: Path,
+    orders: int,
+    seed: int = 0,
+    skew: float = DEFAULT_SKEW,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+) -> dict:
+    """Write a referentially consistent database with `orders` orders as CSV files.
+
+    The sizes of the dimension tables grow with the number of orders, returns them.
+    """
+    tables_dir_path.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    sizes = _dimension_sizes(orders)
+    promos = _write_dimensions(tables_dir_path, sizes, rng, skew)
+    promo_ids = promos.index.to_numpy(dtype=object)
+
+    with open(tables_dir_path / "orders.csv", "w", newline="") as file:
+        for first in range(0, max(orders, 1), chunksize):
+            size = min(chunksize, orders - first)
+            chunk = _orders_chunk(first + 1, size, sizes, promo_ids, rng, skew)
+            chunk.to_csv(file, header=first == 0, date_format=DATETIME_FORMAT)
+    sizes["orders"] = orders
+    return sizes
@@ -0,0 +1,83 @@
+from collections import namedtuple
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.schema import TableSchema
+
+# What is done with rows holding a missing required value or referencing a missing
+# row: return them in the report only, drop them, or raise an `IntegrityError`
+INTEGRITY_POLICIES = ["report", "drop", "fail"]
+
+# Rows of `table` whose `column` references a key missing from `target`: the
+# index of those rows and the distinct keys they hold
+ForeignKeyViolation = namedtuple(
+    "ForeignKeyViolation", ["table", "column", "target", "index", "keys"]
+)
+
+# Rows of `table` without a value in `column`, which is not nullable
+MissingValueViolation = namedtuple(
+    "MissingValueViolation", ["table", "column", "index"]
+)
+
+
+def _describe(violation) -> str:
+    if isinstance(violation, MissingValueViolation):
+        return "%d rows of %s.%s miss a required value" % (
+            len(violation.index),
+            violation.table,
+            violation.column,
+        )
+    return "%d rows of %s.%s reference missing %s" % (
+        len(violation.index),
+        violation.table,
+        violation.column,
+        violation.target,
+    )
+
+
+class IntegrityError(ValueError):
+    """Violations found under the "fail" policy."""
+
+    def __init__(self, violations: list):
+        super().__init__("; ".join(_describe(violation) for violation in violations))
+        self.violations = violations
+
+
+def check_policy(policy: str) -> None:
+    if policy not in INTEGRITY_POLICIES:
+        raise ValueError("Unknown integrity policy: %s" % policy)
+
+
+def missing_keys(values, dtype: str) -> np.ndarray:
+    """Mask of the missing values of a column declared with `dtype`.
+
+    String keys replaced by integer surrogates (see `app.surrogate`) are missing
+    where their code is negative.
+    """
+    values = np.asarray(values)
+    if dtype == "object" and values.dtype.kind in "iu":
+        return values < 0
+    return pd.isna(values)
+
+
+def missing_value_violations(
+    table: str, dataframe: pd.DataFrame, schema: TableSchema
+) -> Tuple[np.ndarray, List[MissingValueViolation]]:
+    """Rows of `dataframe` missing a value in a column `schema` does not declare
+    nullable, as a mask and as a violation per column."""
+    invalid = np.zeros(len(dataframe), dtype=bool)
+    violations = []
+    for name, dtype in schema.columns:
+        if name in schema.nullable or name not in dataframe.columns:
+            continue
+        missing = missing_keys(dataframe[name].to_numpy(), dtype)
+        if missing.any():
+            violations.append(
+                MissingValueViolation(
+                    table=table, column=name, index=dataframe.index[missing]
+                )
+            )
+            invalid |= missing
+    return invalid, violations
@@ -0,0 +1,110 @@
+"""Scaling benchmark of the meal_type / user_age classification engine.
+
+Run with ``python -m benchmarks.bench_classify [--sizes 1e6,1e7,1e8]``. The time per
+order should stay flat as the number of orders grows.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.classify import (
+    NAT,
+    as_nanoseconds,
+    meal_type_codes,
+    take,
+    user_age_codes,
+)
+from app.dims_and_facts import (
+    ReducedDatabase,
+    create_orders_by_meal_type_age_cuisine_table,
+)
+
+# Sizes of the dimension tables orders are joined with
+USERS = 100_000
+FOOD = 1_000
+CUISINES = np.array(["polish", "italian", "turkish", "american"], dtype=object)
+
+
+def make_dimensions(rng: np.random.Generator):
+    users = pd.DataFrame(
+        {"birthdate": pd.to_datetime(rng.integers(-20_000, 12_000, USERS), unit="D")},
+        index=pd.RangeIndex(1, USERS + 1, name="user_id"),
+    )
+    food = pd.DataFrame(
+        {"cuisine": CUISINES.take(rng.integers(0, len(CUISINES), FOOD))},
+        index=pd.RangeIndex(1, FOOD + 1, name="food_id"),
+    )
+    return users, food
+
+
+def make_orders(rng: np.random.Generator, size: int) -> pd.DataFrame:
+    start = as_nanoseconds(np.datetime64("2020-01-01"))
+    return pd.DataFrame(
+        {
+            "user_id": rng.integers(1, USERS + 1, size),
+            "food_id": rng.integers(1, FOOD + 1, size),
+            "ordered_at": (start + rng.integers(0, 365 * 86_400, size) * 10**9).view(
+                "datetime64[ns]"
+            ),
+        },
+        index=pd.RangeIndex(1, size + 1, name="order_id"),
+    )
+
+
+def bench_kernels(orders: pd.DataFrame, users: pd.DataFrame) -> float:
+    start = time.perf_counter()
+    positions = users.index.get_indexer(orders["user_id"].to_numpy())
+    birthdate = take(as_nanoseconds(users["birthdate"]), positions, NAT)
+    user_age_codes(birthdate)
+    meal_type_codes(as_nanoseconds(orders["ordered_at"]))
+    return time.perf_counter() - start
+
+
+def bench_table(orders: pd.DataFrame, users: pd.DataFrame, food: pd.DataFrame) -> float:
+    db = ReducedDatabase(
+        orders=orders,
+        users=users,
+        food=food,
+        promos=None,
+        restaurants=None,
+        addresses=None,
+    )
+    start = time.perf_counter()
+    create_orders_by_meal_type_age_cuisine_table(db)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1e5,1e6,1e7,1e8")
+    parser.add_argument(
+        "--table-max-size",
+        type=float,
+        default=1e7,
+        help="largest size the whole table is built for, kernels run for all sizes",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    users, food = make_dimensions(rng)
+    print(
+        "%12s %14s %14s %14s %14s"
+        % ("orders", "kernels [s]", "ns/order", "table [s]", "ns/order")
+    )
+    for size in (int(float(size)) for size in args.sizes.split(",")):
+        orders = make_orders(rng, size)
+        kernels = bench_kernels(orders, users)
+        row = "%12d %14.3f %14.1f" % (size, kernels, kernels / size * 1e9)
+        if size <= args.table_max_size:
+            table = bench_table(orders, users, food)
+            row += " %14.3f %14.1f" % (table, table / size * 1e9)
+        print(row)
+        del orders
+
+
+if __name__ == "__main__":
+    main()
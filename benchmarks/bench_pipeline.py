@@ -0,0 +1,145 @@
+"""Scaling benchmark of the load_tables / reduce_dims / fact table pipeline.
+
+Run with ``python -m benchmarks.bench_pipeline [--sizes 1e3,1e5,1e7]``. Synthetic tables
+are generated once per size into ``--data-dir`` and reused by later runs. Every run is
+appended as one JSON line to ``--output``, so that runs can be compared over time.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import time
+from pathlib import Path
+
+from app.dims_and_facts import (
+    TABLES,
+    MultiDimDatabase,
+    create_orders_by_meal_type_age_cuisine_table,
+    load_tables,
+    reduce_dims,
+)
+from app.metrics import PeakMemory
+from app.synthetic import generate_tables
+
+
+def run_stage(name: str, rows: int, function, *args):
+    with PeakMemory() as memory:
+        start = time.perf_counter()
+        result = function(*args)
+        seconds = time.perf_counter() - start
+    stage = {
+        "stage": name,
+        "orders": rows,
+        "seconds": round(seconds, 6),
+        "orders_per_second": round(rows / seconds) if seconds else None,
+        "peak_rss_bytes": memory.peak,
+        "peak_rss_delta_bytes": memory.peak - memory.start,
+    }
+    print(
+        "%10d %-14s %10.3f s %14s orders/s %10.1f MiB peak (+%.1f MiB)"
+        % (
+            rows,
+            name,
+            seconds,
+            stage["orders_per_second"],
+            memory.peak / 2**20,
+            (memory.peak - memory.start) / 2**20,
+        )
+    )
+    return result, stage
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def previous_runs(output: Path) -> list:
+    if not output.exists():
+        return []
+    with open(output) as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def compare(stages: list, runs: list) -> None:
+    if not runs:
+        return
+    previous = {
+        (stage["stage"], stage["orders"]): stage for stage in runs[-1]["stages"]
+    }
+    print("\ncompared to %s (%s):" % (runs[-1]["revision"], runs[-1]["timestamp"]))
+    for stage in stages:
+        before = previous.get((stage["stage"], stage["orders"]))
+        if before and before["seconds"]:
+            print(
+                "%10d %-14s %6.2fx time %6.2fx peak memory"
+                % (
+                    stage["orders"],
+                    stage["stage"],
+                    stage["seconds"] / before["seconds"],
+                    stage["peak_rss_delta_bytes"]
+                    / max(before["peak_rss_delta_bytes"], 1),
+                )
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1e3,1e4,1e5,1e6")
+    parser.add_argument("--data-dir", type=Path, default=Path("bench_data"))
+    parser.add_argument("--output", type=Path, default=Path("bench_results.jsonl"))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    stages = []
+    for size in (int(float(size)) for size in args.sizes.split(",")):
+        tables_dir_path = args.data_dir / ("orders_%d_seed_%d" % (size, args.seed))
+        if not (tables_dir_path / "orders.csv").exists():
+            generate_tables(tables_dir_path, size, seed=args.seed)
+
+        tables, stage = run_stage(
+            "load_tables", size, load_tables, tables_dir_path, TABLES
+        )
+        stages.append(stage)
+        reduced_db, stage = run_stage(
+            "reduce_dims", size, reduce_dims, MultiDimDatabase(*tables)
+        )
+        stages.append(stage)
+        del tables
+        _, stage = run_stage(
+            "create_table",
+            size,
+            create_orders_by_meal_type_age_cuisine_table,
+            reduced_db,
+        )
+        stages.append(stage)
+        del reduced_db
+
+    runs = previous_runs(args.output)
+    compare(stages, runs)
+    run = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "seed": args.seed,
+        "stages": stages,
+    }
+    with open(args.output, "a") as file:
+        file.write(json.dumps(run) + "\n")
+
+
+if __name__ == "__main__":
+    main()
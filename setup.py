@@ -15,5 +15,5 @@ setup(
     install_requires=["numpy", "pandas"],
     tests_require=requirements,
     setup_requires=["pytest-runner"],
-    extras_require={"dev": ["black"]},
+    extras_require={"dev": ["black"], "arrow": ["pyarrow"]},
 )
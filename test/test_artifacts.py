@@ -0,0 +1,100 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+from app import artifacts
+from app.artifacts import (
+    ArtifactCache,
+    cached_orders_by_meal_type_age_cuisine_table,
+    cached_reduce_dims,
+    content_digest,
+)
+from app.dims_and_facts import MultiDimDatabase
+from test.common import get_reduced_db, get_table, load_all_tables
+
+
+class TestArtifactCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = Path(tempfile.mkdtemp())
+        self.cache = ArtifactCache(self.directory)
+        self.db = MultiDimDatabase(*load_all_tables())
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def artifacts(self):
+        return [path.name for path in self.directory.iterdir() if path.is_dir()]
+
+    def test_cached_results_equal_computed_ones(self):
+        for _ in range(2):
+            reduced = cached_reduce_dims(self.db, self.cache)
+            for expected, actual in zip(get_reduced_db(), reduced):
+                pd.testing.assert_frame_equal(expected, actual)
+            pd.testing.assert_frame_equal(
+                cached_orders_by_meal_type_age_cuisine_table(reduced, self.cache),
+                get_table(),
+            )
+
+    def test_dependencies_are_recorded(self):
+        cached_orders_by_meal_type_age_cuisine_table(get_reduced_db(), self.cache)
+        self.assertEqual(
+            self.cache.dependencies("orders_by_meal_type_age_cuisine"),
+            {
+                "orders": ["user_id", "food_id", "ordered_at"],
+                "users": ["birthdate"],
+                "food": ["cuisine"],
+            },
+        )
+
+    def test_only_changed_dependencies_are_recomputed(self):
+        cached_reduce_dims(self.db, self.cache)
+        promos = self.db.promos.assign(discount=self.db.promos["discount"] / 2)
+        with mock.patch.object(
+            artifacts, "reduce_table", wraps=artifacts.reduce_table
+        ) as reduce:
+            reduced = cached_reduce_dims(self.db._replace(promos=promos), self.cache)
+        self.assertEqual([call.args[1] for call in reduce.call_args_list], ["promos"])
+        pd.testing.assert_series_equal(reduced.promos["discount"], promos["discount"])
+
+    def test_unread_columns_do_not_invalidate(self):
+        db = get_reduced_db()
+        cached_orders_by_meal_type_age_cuisine_table(db, self.cache)
+        renamed = db._replace(users=db.users.assign(first_name="Anonymous"))
+        compute = mock.Mock()
+        self.cache.get_or_compute("orders_by_meal_type_age_cuisine", renamed, compute)
+        compute.assert_not_called()
+
+        older = db._replace(users=db.users.assign(birthdate=pd.Timestamp("1950-01-01")))
+        table = cached_orders_by_meal_type_age_cuisine_table(older, self.cache)
+        self.assertEqual(set(table["user_age"]), {"old"})
+
+    def test_least_recently_used_artifacts_are_evicted(self):
+        db = get_reduced_db()
+        cache = ArtifactCache(self.directory, max_bytes=1)
+        cached_orders_by_meal_type_age_cuisine_table(db, cache)
+        first = self.artifacts()
+        older = db._replace(users=db.users.assign(birthdate=pd.NaT))
+        cached_orders_by_meal_type_age_cuisine_table(older, cache)
+        self.assertEqual(len(self.artifacts()), 1)
+        self.assertNotEqual(self.artifacts(), first)
+
+    def test_artifacts_which_cannot_be_stored_raise(self):
+        def compute(db):
+            return db.orders["promo_id"].isna().astype(object).to_frame()
+
+        with self.assertRaises(ValueError):
+            self.cache.get_or_compute("has_promo", self.db, compute)
+        self.assertEqual(self.artifacts(), [])
+        self.assertIsNone(self.cache.dependencies("has_promo"))
+
+    def test_content_digest(self):
+        values = pd.Series([1, 2, 3])
+        self.assertEqual(content_digest(values), content_digest(values.copy()))
+        self.assertNotEqual(content_digest(values), content_digest(values[::-1]))
+        self.assertNotEqual(
+            content_digest(values), content_digest(values.astype(float))
+        )
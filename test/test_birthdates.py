@@ -0,0 +1,58 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from app.birthdates import birthdate_epochs, resolve_birthdates
+from app.classify import NAT
+from app.dims_and_facts import read_table
+from app.schema import BIRTHDATE_ID_FORMAT
+from test.common import TABLES_DIR_PATH
+
+
+class TestBirthdates(unittest.TestCase):
+    def setUp(self) -> None:
+        self.birthdates = read_table(TABLES_DIR_PATH, "birthdates")
+        self.users = read_table(TABLES_DIR_PATH, "users")
+
+    def test_epochs_match_parsed_ids(self):
+        expected = pd.to_datetime(self.birthdates.index, format=BIRTHDATE_ID_FORMAT)
+        np.testing.assert_array_equal(
+            birthdate_epochs(self.birthdates), expected.to_numpy().view(np.int64)
+        )
+
+    def test_invalid_dates_are_missing(self):
+        birthdates = pd.DataFrame(
+            {
+                "year": [2020, 2021, 2020, 1950],
+                "month": [2, 2, 13, 12],
+                "day": [29, 29, 1, 31],
+            }
+        )
+        self.assertEqual(
+            birthdate_epochs(birthdates).tolist(),
+            [
+                pd.Timestamp("2020-02-29").value,
+                NAT,
+                NAT,
+                pd.Timestamp("1950-12-31").value,
+            ],
+        )
+
+    def test_lookup_equals_parsing(self):
+        expected = pd.to_datetime(
+            self.users["birthdate_id"], format=BIRTHDATE_ID_FORMAT
+        ).to_numpy()
+        np.testing.assert_array_equal(
+            resolve_birthdates(self.users["birthdate_id"], self.birthdates), expected
+        )
+        np.testing.assert_array_equal(
+            resolve_birthdates(self.users["birthdate_id"]), expected
+        )
+
+    def test_ids_missing_from_table_are_parsed(self):
+        ids = pd.Series(["01/01/2001", "18/12/1986"])
+        np.testing.assert_array_equal(
+            resolve_birthdates(ids, self.birthdates.iloc[:0]),
+            np.array(["2001-01-01", "1986-12-18"], dtype="datetime64[ns]"),
+        )
@@ -0,0 +1,106 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from app.classify import (
+    as_nanoseconds,
+    classify_orders,
+    meal_type_codes,
+    MEAL_TYPES,
+    user_age_codes,
+    USER_AGES,
+)
+
+
+class TestMealType(unittest.TestCase):
+    def classify(self, timestamps):
+        codes = meal_type_codes(as_nanoseconds(pd.to_datetime(timestamps)))
+        return MEAL_TYPES.take(codes).tolist()
+
+    def test_boundaries(self):
+        self.assertEqual(
+            self.classify(
+                [
+                    "2020-01-01 00:00:00",
+                    "2020-01-01 06:00:00",
+                    "2020-01-01 06:00:01",
+                    "2020-01-01 09:59:59",
+                    "2020-01-01 10:00:00",
+                    "2020-01-01 16:00:00",
+                    "2020-01-01 16:00:01",
+                    "2020-01-01 23:59:59",
+                ]
+            ),
+            [
+                "dinner",
+                "dinner",
+                "breakfast",
+                "breakfast",
+                "lunch",
+                "lunch",
+                "dinner",
+                "dinner",
+            ],
+        )
+
+    def test_timestamps_before_epoch(self):
+        self.assertEqual(
+            self.classify(["1969-12-31 07:00:00", "1969-12-31 12:00:00"]),
+            ["breakfast", "lunch"],
+        )
+
+
+class TestUserAge(unittest.TestCase):
+    def test_boundaries(self):
+        birthdates = pd.to_datetime(
+            ["1969-12-31", "1970-01-01", "1994-12-31", "1995-01-01", None]
+        )
+        codes = user_age_codes(as_nanoseconds(birthdates))
+        self.assertEqual(codes[-1], -1)
+        self.assertEqual(
+            USER_AGES.take(codes[:-1]).tolist(), ["old", "adult", "adult", "young"]
+        )
+
+
+class TestClassifyOrders(unittest.TestCase):
+    def test_unknown_food_has_no_cuisine(self):
+        orders = pd.DataFrame(
+            {
+                "user_id": [1, 1],
+                "food_id": [1, 2],
+                "ordered_at": pd.to_datetime(["2020-01-01 12:00", "2020-01-01 20:00"]),
+            },
+            index=pd.Index([1, 2], name="order_id"),
+        )
+        users = pd.DataFrame(
+            {"birthdate": pd.to_datetime(["1990-05-05"])}, index=pd.Index([1])
+        )
+        food = pd.DataFrame({"cuisine": ["thai"]}, index=pd.Index([1]))
+        table = classify_orders(orders, users, food)
+        self.assertEqual(table["food_cuisine"].tolist()[0], "thai")
+        self.assertTrue(np.isnan(table["food_cuisine"].tolist()[1]))
+        self.assertEqual(table["meal_type"].tolist(), ["lunch", "dinner"])
+        self.assertEqual(table["user_age"].tolist(), ["adult", "adult"])
+
+    def test_unknown_user_has_no_age(self):
+        orders = pd.DataFrame(
+            {
+                "user_id": [1, 999],
+                "food_id": [1, 1],
+                "ordered_at": pd.to_datetime(["2020-01-01 12:00", "2020-01-01 20:00"]),
+            },
+            index=pd.Index([1, 2], name="order_id"),
+        )
+        users = pd.DataFrame(
+            {"birthdate": pd.to_datetime(["1990-05-05"])}, index=pd.Index([1])
+        )
+        food = pd.DataFrame({"cuisine": ["thai"]}, index=pd.Index([1]))
+        for categorical in (False, True):
+            user_age = classify_orders(orders, users, food, categorical)["user_age"]
+            self.assertEqual(user_age.iloc[0], "adult")
+            self.assertTrue(pd.isna(user_age.iloc[1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
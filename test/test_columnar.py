@@ -0,0 +1,138 @@
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from app.columnar import (
+    open_reduced_database,
+    read_frame,
+    write_frame,
+    write_reduced_database,
+)
+from app.dims_and_facts import (
+    MultiDimDatabase,
+    create_orders_by_meal_type_age_cuisine_table,
+    expand_reduced_db,
+    reduce_dims_compact,
+)
+from test.common import get_reduced_db, load_all_tables
+
+
+class TestColumnar(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = Path(tempfile.mkdtemp())
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_frame_round_trip_keeps_missing_values_and_categoricals(self):
+        dataframe = pd.DataFrame(
+            {
+                "promo_id": ["A", np.nan, "B"],
+                "cuisine": pd.Categorical(["thai", "thai", "greek"]),
+                "price": [1.5, 2.0, 3.0],
+            },
+            index=pd.Index([3, 1, 2], name="order_id"),
+        )
+        write_frame(dataframe, self.directory / "frame")
+        pd.testing.assert_frame_equal(read_frame(self.directory / "frame"), dataframe)
+
+    def test_ordered_categoricals_round_trip(self):
+        dataframe = pd.DataFrame(
+            {"size": pd.Categorical(["S", "L", "M"], ["S", "M", "L"], ordered=True)}
+        )
+        write_frame(dataframe, self.directory / "frame")
+        pd.testing.assert_frame_equal(read_frame(self.directory / "frame"), dataframe)
+
+    def test_frames_which_would_not_round_trip_raise(self):
+        for dataframe in (
+            pd.DataFrame({"flag": pd.Series([True, np.nan], dtype=object)}),
+            pd.DataFrame({"mixed": ["A", 1]}),
+            pd.DataFrame({"band": pd.Categorical([10, 20])}),
+            pd.DataFrame({"count": pd.array([1, None], dtype="Int64")}),
+            pd.DataFrame(
+                {"count": [1, 2]}, index=pd.MultiIndex.from_tuples([(1, "A"), (2, "B")])
+            ),
+        ):
+            with self.assertRaises(ValueError):
+                write_frame(dataframe, self.directory / "frame")
+
+    def test_memory_mapped_database_equals_reduced_database(self):
+        db = get_reduced_db()
+        write_reduced_database(db, self.directory / "reduced")
+        mapped = open_reduced_database(self.directory / "reduced")
+        for expected, actual in zip(db, expand_reduced_db(mapped)):
+            pd.testing.assert_frame_equal(expected, actual)
+        pd.testing.assert_frame_equal(
+            create_orders_by_meal_type_age_cuisine_table(db),
+            create_orders_by_meal_type_age_cuisine_table(expand_reduced_db(mapped)),
+        )
+
+    def test_memory_mapped_columns_are_views_of_the_files(self):
+        write_reduced_database(get_reduced_db(), self.directory / "reduced")
+        orders = open_reduced_database(self.directory / "reduced").orders
+        for values in (
+            orders.index.to_numpy(),
+            orders["user_id"].to_numpy(),
+            orders["ordered_at"].to_numpy(),
+            orders["promo_id"].array.codes,
+        ):
+            while not isinstance(values, np.memmap) and values.base is not None:
+                values = values.base
+            self.assertIsInstance(values, np.memmap)
+            self.assertFalse(values.flags.writeable)
+
+    def test_compact_database_round_trip(self):
+        db = reduce_dims_compact(MultiDimDatabase(*load_all_tables()))
+        write_reduced_database(db, self.directory / "reduced")
+        loaded = open_reduced_database(self.directory / "reduced", mmap=False)
+        for expected, actual in zip(db, loaded):
+            pd.testing.assert_frame_equal(expected, actual)
+
+    def test_rewrite_replaces_database_under_open_readers(self):
+        db = get_reduced_db()
+        write_reduced_database(db, self.directory / "reduced")
+        mapped = open_reduced_database(self.directory / "reduced")
+        write_reduced_database(db, self.directory / "reduced")
+        self.assertEqual(
+            sorted(path.name for path in self.directory.iterdir()), ["reduced"]
+        )
+        pd.testing.assert_frame_equal(
+            expand_reduced_db(mapped).users,
+            expand_reduced_db(open_reduced_database(self.directory / "reduced")).users,
+        )
+
+    def test_store_is_in_place_while_the_old_files_are_deleted(self):
+        db = get_reduced_db()
+        store = self.directory / "reduced"
+        write_reduced_database(db, store)
+        opened = []
+        delete = shutil.rmtree
+
+        def rmtree(path, *args, **kwargs):
+            if path.name.endswith(".old") and path.exists():
+                opened.append(open_reduced_database(store))
+            return delete(path, *args, **kwargs)
+
+        with mock.patch("app.columnar.shutil.rmtree", side_effect=rmtree):
+            write_reduced_database(db._replace(orders=db.orders.iloc[:3]), store)
+        self.assertEqual(len(opened), 1)
+        self.assertEqual(len(opened[0].orders), 3)
+
+    def test_database_can_be_opened_from_another_process(self):
+        write_reduced_database(get_reduced_db(), self.directory / "reduced")
+        script = (
+            "import sys; from app.columnar import open_reduced_database; "
+            "print(len(open_reduced_database(sys.argv[1]).orders))"
+        )
+        output = subprocess.check_output(
+            [sys.executable, "-c", script, str(self.directory / "reduced")],
+            cwd=Path(__file__).parent.parent,
+        )
+        self.assertEqual(int(output), len(get_reduced_db().orders))
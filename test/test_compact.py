@@ -0,0 +1,54 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from app.dims_and_facts import (
+    MultiDimDatabase,
+    create_orders_by_meal_type_age_cuisine_table_compact,
+    expand_categoricals,
+    expand_reduced_db,
+    reduce_dims_compact,
+)
+from app.schema import COMPACT_COLUMNS
+from test.common import get_reduced_db, get_table, load_all_tables
+
+
+class TestCompactMode(unittest.TestCase):
+    def setUp(self) -> None:
+        self.db = MultiDimDatabase(*load_all_tables())
+        self.reduced_db = reduce_dims_compact(self.db)
+
+    def test_low_cardinality_columns_are_categorical(self):
+        for table, columns in COMPACT_COLUMNS.items():
+            if table not in self.reduced_db._fields:
+                continue
+            for column in columns:
+                dtype = getattr(self.reduced_db, table)[column].dtype
+                self.assertIsInstance(dtype, pd.CategoricalDtype)
+        table = create_orders_by_meal_type_age_cuisine_table_compact(self.reduced_db)
+        for column in COMPACT_COLUMNS["orders_by_meal_type_age_cuisine"]:
+            self.assertIsInstance(table[column].dtype, pd.CategoricalDtype)
+
+    def test_expanded_tables_match_object_schema(self):
+        for expected, actual in zip(
+            get_reduced_db(), expand_reduced_db(self.reduced_db)
+        ):
+            pd.testing.assert_frame_equal(expected, actual)
+        table = create_orders_by_meal_type_age_cuisine_table_compact(self.reduced_db)
+        pd.testing.assert_frame_equal(expand_categoricals(table), get_table())
+
+    def test_table_takes_less_memory(self):
+        orders = self.db.orders.iloc[np.arange(100_000) % len(self.db.orders)]
+        orders.index = pd.RangeIndex(1, len(orders) + 1, name="order_id")
+        reduced_db = reduce_dims_compact(self.db._replace(orders=orders))
+        compact = create_orders_by_meal_type_age_cuisine_table_compact(reduced_db)
+        expanded = expand_categoricals(compact)
+        self.assertGreater(
+            expanded.memory_usage(deep=True).sum(),
+            5 * compact.memory_usage(deep=True).sum(),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
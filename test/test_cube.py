@@ -0,0 +1,86 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from app.cube import build_cube, query_cube, rollup, update_cube
+from test.common import get_reduced_db, get_table
+
+
+def expected_aggregates() -> pd.DataFrame:
+    db = get_reduced_db()
+    orders = db.orders.join(db.food["price"], on="food_id").join(
+        db.promos["discount"], on="promo_id"
+    )
+    return get_table().assign(
+        orders=1, revenue=orders["price"] * (1 - orders["discount"].fillna(0))
+    )
+
+
+class TestCube(unittest.TestCase):
+    def setUp(self) -> None:
+        self.db = get_reduced_db()
+        self.cube = build_cube(self.db)
+        self.expected = expected_aggregates()
+
+    def assertCell(self, cell, expected: pd.DataFrame):
+        self.assertEqual(cell.orders, len(expected))
+        self.assertAlmostEqual(cell.revenue, expected["revenue"].sum())
+
+    def test_every_cell_matches_orders(self):
+        for (meal_type, user_age, cuisine), group in self.expected.groupby(
+            ["meal_type", "user_age", "food_cuisine"]
+        ):
+            cell = query_cube(
+                self.cube,
+                meal_type=meal_type,
+                user_age=user_age,
+                food_cuisine=cuisine,
+            )
+            self.assertCell(cell, group)
+
+    def test_subtotals(self):
+        self.assertCell(query_cube(self.cube), self.expected)
+        young = self.expected[self.expected["user_age"] == "young"]
+        self.assertCell(query_cube(self.cube, user_age="young"), young)
+        young_dinner = young[young["meal_type"] == "dinner"]
+        self.assertCell(
+            query_cube(self.cube, user_age="young", meal_type="dinner"), young_dinner
+        )
+
+    def test_unknown_labels_and_dimensions(self):
+        self.assertEqual(query_cube(self.cube, food_cuisine="french"), (0, 0.0))
+        self.assertEqual(query_cube(self.cube, food_cuisine=np.nan), (0, 0.0))
+        with self.assertRaises(ValueError):
+            query_cube(self.cube, cuisine="thai")
+
+    def test_unknown_users_have_no_age(self):
+        orders = self.db.orders.assign(user_id=999)
+        cube = build_cube(self.db._replace(orders=orders))
+        self.assertCell(query_cube(cube, user_age=np.nan), self.expected)
+        self.assertEqual(query_cube(cube, user_age="old"), (0, 0.0))
+
+    def test_rollup(self):
+        dinner = self.expected[self.expected["meal_type"] == "dinner"]
+        result = rollup(self.cube, ["food_cuisine"], meal_type="dinner")
+        expected = (
+            dinner.groupby("food_cuisine")[["orders", "revenue"]]
+            .sum()
+            .reindex(result.index, fill_value=0)
+        )
+        pd.testing.assert_frame_equal(result, expected, check_names=False)
+
+    def test_update_equals_rebuild(self):
+        orders = self.db.orders
+        cube = build_cube(self.db._replace(orders=orders.iloc[:3]))
+        cube = update_cube(cube, self.db, orders.iloc[3:7])
+        cube = update_cube(cube, self.db, orders.iloc[7:])
+        pd.testing.assert_frame_equal(
+            rollup(cube, ["meal_type", "user_age", "food_cuisine"]),
+            rollup(self.cube, ["meal_type", "user_age", "food_cuisine"]),
+        )
+
+    def test_orders_of_unknown_food_count_under_missing_cuisine(self):
+        orders = self.db.orders.assign(food_id=-1)
+        cube = build_cube(self.db._replace(orders=orders))
+        self.assertEqual(query_cube(cube, food_cuisine=np.nan), (len(orders), 0.0))
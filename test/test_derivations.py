@@ -0,0 +1,146 @@
+import json
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from app import derivations
+from app.derivations import (
+    ORDERS_BY_MEAL_TYPE_AGE_CUISINE,
+    DerivedColumn,
+    DerivedTable,
+    derivations_from_config,
+    derive_tables,
+    iter_derived_tables,
+)
+from app.dims_and_facts import (
+    create_orders_by_meal_type_age_cuisine_table,
+    expand_categoricals,
+)
+from test.common import TABLES_DIR_PATH, get_reduced_db, get_table
+
+CONFIG = {
+    "orders_by_day_of_week_city": {
+        "day_of_week": {"source": "ordered_at", "transform": "day_of_week"},
+        "city": {"source": "addresses.city"},
+    },
+    "orders_by_promo_price_band": {
+        "promo": {"source": "promo_id", "fill": "none"},
+        "price_band": {
+            "source": "food.price",
+            "edges": [10, 20],
+            "labels": ["low", "medium", "high"],
+        },
+    },
+}
+
+
+class TestDerivations(unittest.TestCase):
+    def setUp(self) -> None:
+        self.db = get_reduced_db()
+
+    def test_reproduces_orders_by_meal_type_age_cuisine(self):
+        tables = derive_tables(self.db, [ORDERS_BY_MEAL_TYPE_AGE_CUISINE])
+        pd.testing.assert_frame_equal(
+            tables["orders_by_meal_type_age_cuisine"], get_table()
+        )
+
+    def test_unknown_users_match_classify(self):
+        orders = self.db.orders.assign(user_id=999)
+        db = self.db._replace(orders=orders)
+        table = derive_tables(db, [ORDERS_BY_MEAL_TYPE_AGE_CUISINE])
+        expected = create_orders_by_meal_type_age_cuisine_table(db)
+        self.assertTrue(expected["user_age"].isna().all())
+        pd.testing.assert_frame_equal(
+            table["orders_by_meal_type_age_cuisine"], expected
+        )
+
+    def test_config_derivations(self):
+        tables = derive_tables(self.db, derivations_from_config(CONFIG))
+        by_city = tables["orders_by_day_of_week_city"]
+        self.assertEqual(by_city.loc[1].tolist(), ["Wednesday", "Kraków"])
+        self.assertEqual(by_city.loc[7].tolist(), ["Saturday", "New York"])
+        by_promo = tables["orders_by_promo_price_band"]
+        food_price = self.db.food["price"]
+        for order_id, order in self.db.orders.iterrows():
+            price = food_price[order["food_id"]]
+            self.assertEqual(
+                by_promo.loc[order_id, "price_band"],
+                "low" if price < 10 else "medium" if price < 20 else "high",
+            )
+            self.assertEqual(
+                by_promo.loc[order_id, "promo"],
+                "none" if pd.isna(order["promo_id"]) else order["promo_id"],
+            )
+
+    def test_json_edges_are_parsed(self):
+        config = json.loads("""{"orders_by_meal_type_age": {
+                "meal_type": {
+                    "source": "ordered_at",
+                    "transform": "time_of_day",
+                    "edges": ["06:00:00.000000001", "10:00:00", "16:00:00.000000001"],
+                    "labels": ["dinner", "breakfast", "lunch", "dinner"]
+                },
+                "user_age": {
+                    "source": "users.birthdate",
+                    "edges": ["1970-01-01", "1995-01-01"],
+                    "labels": ["old", "adult", "young"]
+                }
+            }}""")
+        tables = derive_tables(self.db, derivations_from_config(config))
+        pd.testing.assert_frame_equal(
+            tables["orders_by_meal_type_age"],
+            get_table()[["meal_type", "user_age"]],
+        )
+
+    def test_labels_must_match_edges(self):
+        options = {"source": "food.price", "edges": [10, 20], "labels": ["low"]}
+        with self.assertRaises(ValueError):
+            derivations_from_config({"orders_by_price_band": {"band": options}})
+        table = DerivedTable(
+            name="orders_by_price_band", columns={"band": DerivedColumn(**options)}
+        )
+        with self.assertRaises(ValueError):
+            derive_tables(self.db, [table])
+
+    def test_shared_work_runs_once(self):
+        specs = derivations_from_config(CONFIG) + [ORDERS_BY_MEAL_TYPE_AGE_CUISINE]
+        specs.append(
+            DerivedTable(
+                name="orders_by_cuisine_city",
+                columns={
+                    "cuisine": DerivedColumn(source="food.cuisine"),
+                    "city": DerivedColumn(source="addresses.city"),
+                },
+            )
+        )
+        with mock.patch.object(
+            derivations, "join", wraps=derivations.join
+        ) as join, mock.patch.object(
+            derivations, "_derive_column", wraps=derivations._derive_column
+        ) as derive_column:
+            tables = derive_tables(self.db, specs)
+        joined = sorted(call.args[1] for call in join.call_args_list)
+        self.assertEqual(joined, ["address_id", "food_id", "user_id"])
+        # The cuisine and city columns are shared with the other tables
+        self.assertEqual(derive_column.call_count, 7)
+        self.assertEqual(len(tables), 4)
+
+    def test_unsorted_orders_and_categoricals(self):
+        db = self.db._replace(orders=self.db.orders.iloc[::-1])
+        tables = derive_tables(db, [ORDERS_BY_MEAL_TYPE_AGE_CUISINE], categorical=True)
+        table = tables["orders_by_meal_type_age_cuisine"]
+        self.assertTrue(isinstance(table["meal_type"].dtype, pd.CategoricalDtype))
+        pd.testing.assert_frame_equal(expand_categoricals(table), get_table())
+
+    def test_chunks_cover_the_orders(self):
+        chunks = list(
+            iter_derived_tables(
+                TABLES_DIR_PATH, [ORDERS_BY_MEAL_TYPE_AGE_CUISINE], chunksize=4
+            )
+        )
+        self.assertEqual(len(chunks), 3)
+        pd.testing.assert_frame_equal(
+            pd.concat(chunk["orders_by_meal_type_age_cuisine"] for chunk in chunks),
+            get_table(),
+        )
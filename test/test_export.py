@@ -0,0 +1,180 @@
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app.export import (
+    export_tables_to_parquet,
+    export_tables_to_sqlite,
+    iter_batches,
+    write_sqlite,
+)
+from app.streaming import iter_orders_by_meal_type_age_cuisine
+from test.common import TABLES_DIR_PATH, get_reduced_db, get_table
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+
+class TestExport(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = Path(tempfile.mkdtemp())
+        self.db = get_reduced_db()
+        self.tables = dict(self.db._asdict())
+        self.tables["orders_by_meal_type_age_cuisine"] = get_table()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def partitions(self, directory: Path) -> list:
+        # Files starting with "_" are skipped by dataset readers
+        return sorted(
+            path.name for path in directory.iterdir() if not path.name.startswith("_")
+        )
+
+    def test_batches_cover_every_row_once(self):
+        batches = list(iter_batches(self.db.orders, 3))
+        self.assertEqual([len(batch) for batch in batches], [3, 3, 3, 1])
+        pd.testing.assert_frame_equal(pd.concat(batches), self.db.orders)
+
+    @unittest.skipIf(pq is None, "pyarrow is not installed")
+    def test_parquet_round_trip(self):
+        rows = export_tables_to_parquet(
+            self.tables,
+            self.directory,
+            {"orders_by_meal_type_age_cuisine": ["meal_type"]},
+            batch_size=3,
+        )
+        self.assertEqual(
+            rows, {name: len(table) for name, table in self.tables.items()}
+        )
+        orders = pq.read_table(self.directory / "orders").to_pandas()
+        # pyarrow returns missing strings as None, `read_table` as NaN
+        orders["promo_id"] = orders["promo_id"].fillna(np.nan)
+        pd.testing.assert_frame_equal(orders, self.db.orders)
+        self.assertEqual(
+            self.partitions(self.directory / "orders_by_meal_type_age_cuisine"),
+            ["meal_type=breakfast", "meal_type=dinner", "meal_type=lunch"],
+        )
+
+    @unittest.skipIf(pq is None, "pyarrow is not installed")
+    def test_parquet_from_streamed_chunks(self):
+        chunks = iter_orders_by_meal_type_age_cuisine(TABLES_DIR_PATH, chunksize=4)
+        export_tables_to_parquet({"facts": chunks}, self.directory)
+        facts = pq.read_table(self.directory / "facts").to_pandas()
+        pd.testing.assert_frame_equal(facts, get_table())
+
+    def test_sqlite_round_trip(self):
+        rows = export_tables_to_sqlite(
+            self.tables, self.directory / "export.db", batch_size=4
+        )
+        self.assertEqual(rows["orders"], len(self.db.orders))
+        with sqlite3.connect(self.directory / "export.db") as connection:
+            orders = pd.read_sql(
+                "SELECT * FROM orders",
+                connection,
+                index_col="order_id",
+                parse_dates=["ordered_at"],
+            )
+            # NULLs are read back as None, `read_table` returns NaN
+            orders["promo_id"] = orders["promo_id"].fillna(np.nan)
+            indexes = {
+                name
+                for name, in connection.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index'"
+                )
+            }
+            facts = pd.read_sql(
+                "SELECT * FROM orders_by_meal_type_age_cuisine",
+                connection,
+                index_col="order_id",
+            )
+        pd.testing.assert_frame_equal(orders, self.db.orders)
+        pd.testing.assert_frame_equal(facts, get_table())
+        self.assertIn("orders_pkey", indexes)
+        self.assertIn("orders_food_id", indexes)
+        self.assertIn("restaurants_address_id", indexes)
+
+    @unittest.skipIf(pq is None, "pyarrow is not installed")
+    def test_parquet_export_replaces_previous_partitions(self):
+        facts = get_table()
+        partition_cols = {"facts": ["meal_type"]}
+        export_tables_to_parquet({"facts": facts}, self.directory, partition_cols)
+        lunches = facts[facts["meal_type"] == "lunch"]
+        export_tables_to_parquet({"facts": lunches}, self.directory, partition_cols)
+        self.assertEqual(self.partitions(self.directory / "facts"), ["meal_type=lunch"])
+        self.assertEqual([path.name for path in self.directory.iterdir()], ["facts"])
+
+    @unittest.skipIf(pq is None, "pyarrow is not installed")
+    def test_parquet_export_keeps_other_directories(self):
+        other = self.directory / "facts"
+        other.mkdir()
+        (other / "notes.txt").write_text("not an export")
+        with self.assertRaises(ValueError):
+            export_tables_to_parquet({"facts": get_table()}, self.directory)
+        self.assertEqual([path.name for path in other.iterdir()], ["notes.txt"])
+
+    def test_sqlite_keeps_sub_second_timestamps(self):
+        orders = self.db.orders[["ordered_at"]] + pd.Timedelta(nanoseconds=1500)
+        database = self.directory / "export.db"
+        export_tables_to_sqlite({"orders": orders}, database)
+        with sqlite3.connect(database) as connection:
+            exported = pd.read_sql(
+                "SELECT * FROM orders",
+                connection,
+                index_col="order_id",
+                parse_dates=["ordered_at"],
+            )
+        pd.testing.assert_frame_equal(exported, orders)
+
+    def test_sqlite_export_leaves_missing_values_of_the_frame(self):
+        orders = self.db.orders.copy()
+        export_tables_to_sqlite({"orders": orders}, self.directory / "export.db")
+        self.assertTrue(np.isnan(orders.loc[1, "promo_id"]))
+
+    def test_sqlite_export_replaces_table(self):
+        database = self.directory / "export.db"
+        export_tables_to_sqlite({"promos": self.db.promos}, database)
+        export_tables_to_sqlite({"promos": self.db.promos.iloc[:1]}, database)
+        with sqlite3.connect(database) as connection:
+            (count,) = connection.execute("SELECT COUNT(*) FROM promos").fetchone()
+        self.assertEqual(count, 1)
+
+    def test_failed_sqlite_export_keeps_previous_table(self):
+        database = self.directory / "export.db"
+        export_tables_to_sqlite({"promos": self.db.promos}, database)
+
+        def failing():
+            yield self.db.promos.iloc[:1]
+            raise OSError("unavailable")
+
+        with sqlite3.connect(database) as connection:
+            with self.assertRaises(OSError):
+                write_sqlite(failing(), connection, "promos", rows_per_transaction=1)
+            (count,) = connection.execute("SELECT COUNT(*) FROM promos").fetchone()
+            tables = [
+                name
+                for name, in connection.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table'"
+                )
+            ]
+        self.assertEqual(count, len(self.db.promos))
+        self.assertEqual(tables, ["promos"])
+
+    def test_sqlite_nullable_integers(self):
+        orders = self.db.orders[["user_id"]].astype("Int64")
+        orders.loc[2, "user_id"] = pd.NA
+        database = self.directory / "export.db"
+        export_tables_to_sqlite({"orders": orders}, database)
+        with sqlite3.connect(database) as connection:
+            exported = pd.read_sql(
+                "SELECT * FROM orders", connection, index_col="order_id"
+            )
+        pd.testing.assert_frame_equal(exported.astype("Int64"), orders)
+        self.assertTrue(pd.isna(exported.loc[2, "user_id"]))
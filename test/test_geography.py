@@ -0,0 +1,45 @@
+import unittest
+
+import pandas as pd
+
+from app.dims_and_facts import MultiDimDatabase
+from app.geography import resolve_addresses
+from test.common import load_all_tables
+
+
+class TestResolveAddresses(unittest.TestCase):
+    def test_matches_successive_merges(self):
+        db = MultiDimDatabase(*load_all_tables())
+        expected = (
+            db.addresses.reset_index()
+            .merge(db.districts.reset_index(), on="district_id")
+            .rename(columns={"name": "district"})
+            .merge(db.cities.reset_index(), on="city_id")
+            .rename(columns={"name": "city"})
+            .merge(db.states.reset_index(), on="state_id")
+            .rename(columns={"name": "state"})
+            .merge(db.countries.reset_index(), on="country_id")
+            .rename(columns={"name": "country"})
+            .set_index("address_id")
+            .sort_index()[["country", "state", "city", "district", "street"]]
+        )
+        addresses = resolve_addresses(
+            db.addresses, db.districts, db.cities, db.states, db.countries
+        )
+        pd.testing.assert_frame_equal(addresses, expected)
+
+    def test_unknown_district_has_no_geography(self):
+        db = MultiDimDatabase(*load_all_tables())
+        addresses = db.addresses.copy()
+        addresses.loc[99] = [42, "Nowhere"]
+        resolved = resolve_addresses(
+            addresses, db.districts, db.cities, db.states, db.countries
+        )
+        self.assertTrue(
+            resolved.loc[99, ["country", "state", "city", "district"]].isna().all()
+        )
+        self.assertEqual(resolved.loc[99, "street"], "Nowhere")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+
+import pandas as pd
+
+from app.dims_and_facts import (
+    MultiDimDatabase,
+    create_orders_by_meal_type_age_cuisine_table,
+    reduce_dims,
+)
+from app.incremental import Watermark, get_watermark, reduce_dims_incremental
+from test.common import load_all_tables
+
+
+class TestReduceDimsIncremental(unittest.TestCase):
+    def setUp(self) -> None:
+        self.db = MultiDimDatabase(*load_all_tables())
+        self.full = reduce_dims(self.db)
+        self.previous = reduce_dims(self.db._replace(orders=self.db.orders.iloc[:6]))
+
+    def test_appending_new_orders_equals_full_rebuild(self):
+        reduced, watermark, _ = reduce_dims_incremental(
+            self.previous, self.db.orders.iloc[6:]
+        )
+        for expected, actual in zip(self.full, reduced):
+            pd.testing.assert_frame_equal(expected, actual)
+        self.assertEqual(watermark, get_watermark(self.full))
+        pd.testing.assert_frame_equal(
+            create_orders_by_meal_type_age_cuisine_table(reduced),
+            create_orders_by_meal_type_age_cuisine_table(self.full),
+        )
+
+    def test_orders_behind_watermark_are_skipped(self):
+        reduced, watermark, _ = reduce_dims_incremental(self.previous, self.db.orders)
+        pd.testing.assert_frame_equal(reduced.orders, self.full.orders)
+        again, _, _ = reduce_dims_incremental(
+            reduced, self.db.orders, watermark=watermark
+        )
+        pd.testing.assert_frame_equal(again.orders, self.full.orders)
+
+    def test_watermark_behind_previous_orders(self):
+        with self.assertRaises(ValueError):
+            reduce_dims_incremental(
+                self.previous, self.db.orders, watermark=Watermark(order_id=3)
+            )
+        # A watermark past the previous orders skips the orders up to it
+        reduced, _, _ = reduce_dims_incremental(
+            self.previous, self.db.orders, watermark=Watermark(order_id=8)
+        )
+        self.assertEqual(reduced.orders.index.tolist(), [1, 2, 3, 4, 5, 6, 9, 10])
+
+    def test_refreshes_append_segments(self):
+        reduced, segments = self.previous, None
+        for start in range(6, 10, 2):
+            reduced, watermark, segments = reduce_dims_incremental(
+                reduced, self.db.orders.iloc[start : start + 2], segments=segments
+            )
+        self.assertEqual([len(segment) for segment in segments.segments], [6, 2, 2])
+        self.assertIs(segments.segments[0], self.previous.orders)
+        self.assertEqual(watermark, Watermark(order_id=10))
+        self.assertEqual(get_watermark(reduced), watermark)
+        pd.testing.assert_frame_equal(reduced.orders, self.full.orders)
+        with self.assertRaises(ValueError):
+            reduce_dims_incremental(
+                self.previous, self.db.orders.iloc[6:], segments=segments
+            )
+
+    def test_watermark_tracks_latest_order(self):
+        self.assertEqual(get_watermark(self.previous), Watermark(order_id=6))
+
+    def test_empty_database_has_no_watermark(self):
+        empty = reduce_dims(self.db._replace(orders=self.db.orders.iloc[:0]))
+        self.assertEqual(get_watermark(empty), Watermark(order_id=None))
+        reduced, _, _ = reduce_dims_incremental(empty, self.db.orders)
+        pd.testing.assert_frame_equal(reduced.orders, self.full.orders)
+
+    def test_changed_dimension_rows_are_upserted(self):
+        users = self.db.users.loc[[2]].assign(birthdate_id="01/01/2001")
+        new_user = self.db.users.loc[[2]].rename(index={2: 9})
+        changed = MultiDimDatabase(**dict.fromkeys(MultiDimDatabase._fields))
+        changed = changed._replace(users=pd.concat([users, new_user]))
+        reduced, _, _ = reduce_dims_incremental(
+            self.full, self.db.orders.iloc[:0], changed
+        )
+        self.assertEqual(reduced.users.loc[2, "birthdate"], pd.Timestamp("2001-01-01"))
+        self.assertEqual(reduced.users.index.tolist(), list(range(1, 10)))
+        pd.testing.assert_frame_equal(reduced.food, self.full.food)
+
+    def test_changed_food_needs_cuisines(self):
+        changed = MultiDimDatabase(**dict.fromkeys(MultiDimDatabase._fields))
+        changed = changed._replace(food=self.db.food)
+        with self.assertRaises(ValueError):
+            reduce_dims_incremental(self.full, self.db.orders.iloc[:0], changed)
+
+
+if __name__ == "__main__":
+    unittest.main()
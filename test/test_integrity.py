@@ -0,0 +1,140 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from app.dims_and_facts import MultiDimDatabase, read_table
+from app.integrity import (
+    IntegrityError,
+    load_validated_database,
+    validate_database,
+    validate_foreign_keys,
+)
+from app.surrogate import encode_database
+from app.violations import MissingValueViolation
+from test.common import TABLES_DIR_PATH, load_all_tables
+
+
+class TestIntegrity(unittest.TestCase):
+    def setUp(self) -> None:
+        self.db = MultiDimDatabase(*load_all_tables())
+
+    def broken_db(self) -> MultiDimDatabase:
+        orders = self.db.orders.copy()
+        orders.loc[[2, 5], "user_id"] = [99, 98]
+        orders.loc[7, "promo_id"] = "NOPE"
+        addresses = self.db.addresses.copy()
+        addresses.loc[1, "district_id"] = 99
+        return self.db._replace(orders=orders, addresses=addresses)
+
+    def test_sample_database_is_consistent(self):
+        db, violations = load_validated_database(TABLES_DIR_PATH, "fail")
+        self.assertEqual(violations, [])
+        for expected, actual in zip(self.db, db):
+            pd.testing.assert_frame_equal(expected, actual)
+
+    def test_report_keeps_every_row(self):
+        db, violations = validate_database(self.broken_db())
+        self.assertEqual(len(db.orders), len(self.db.orders))
+        by_column = {(v.table, v.column): v for v in violations}
+        self.assertEqual(by_column["orders", "user_id"].index.tolist(), [2, 5])
+        self.assertEqual(sorted(by_column["orders", "user_id"].keys), [98, 99])
+        self.assertEqual(by_column["orders", "promo_id"].keys.tolist(), ["NOPE"])
+        self.assertEqual(by_column["addresses", "district_id"].index.tolist(), [1])
+        # Orders without a promo are not violations
+        self.assertEqual(by_column["orders", "promo_id"].index.tolist(), [7])
+
+    def test_drop_cascades_from_referenced_tables(self):
+        db, violations = validate_database(self.broken_db(), "drop")
+        self.assertNotIn(1, db.addresses.index)
+        restaurants = self.db.restaurants
+        self.assertEqual(
+            db.restaurants.index.tolist(),
+            restaurants.index[restaurants["address_id"] != 1].tolist(),
+        )
+        orders = self.db.orders
+        kept = (
+            ~orders.index.isin([2, 5, 7])
+            & (orders["address_id"] != 1)
+            & orders["restaurant_id"].isin(db.restaurants.index)
+        )
+        self.assertEqual(db.orders.index.tolist(), orders.index[kept].tolist())
+        self.assertIn(("orders", "address_id"), [v[:2] for v in violations])
+
+    def test_fail_raises_with_every_violation(self):
+        with self.assertRaises(IntegrityError) as raised:
+            validate_database(self.broken_db(), "fail")
+        self.assertEqual(len(raised.exception.violations), 3)
+        self.assertIn("orders.user_id", str(raised.exception))
+
+    def test_tables_without_their_targets_are_not_checked(self):
+        orders = self.db.orders.assign(food_id=99)
+        _, violations = validate_foreign_keys(
+            {"orders": orders, "users": self.db.users}
+        )
+        self.assertEqual(violations, [])
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            validate_database(self.db, "ignore")
+
+    def test_encoded_database(self):
+        encoded, _ = encode_database(self.db)
+        db, violations = validate_database(encoded, "drop")
+        self.assertEqual(violations, [])
+        # Orders without a promo have the -1 code, they are kept
+        self.assertTrue((db.orders["promo_id"] < 0).any())
+        self.assertEqual(len(db.orders), len(self.db.orders))
+
+        encoded, _ = encode_database(self.broken_db())
+        db, violations = validate_database(encoded, "drop")
+        by_column = {(v.table, v.column): v for v in violations}
+        self.assertEqual(by_column["orders", "promo_id"].index.tolist(), [7])
+        self.assertNotIn(7, db.orders.index)
+
+
+class TestMissingValues(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = Path(tempfile.mkdtemp())
+        shutil.copytree(TABLES_DIR_PATH, self.directory, dirs_exist_ok=True)
+        path = self.directory / "orders.csv"
+        lines = path.read_text().splitlines()
+        # Order 2 loses its user
+        lines[2] = lines[2].replace("2,1,", "2,,", 1)
+        path.write_text("\n".join(lines) + "\n")
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_read_table_policies(self):
+        orders = read_table(self.directory, "orders")
+        self.assertNotIn(2, orders.index)
+        self.assertEqual(orders["user_id"].dtype, "int64")
+
+        orders = read_table(self.directory, "orders", policy="report")
+        self.assertIn(2, orders.index)
+        self.assertEqual(orders["user_id"].dtype, "Int64")
+
+        with self.assertRaises(IntegrityError) as raised:
+            read_table(self.directory, "orders", policy="fail")
+        self.assertIn("orders.user_id", str(raised.exception))
+
+        with self.assertRaises(ValueError):
+            read_table(self.directory, "orders", policy="ignore")
+
+    def test_load_validated_database(self):
+        db, violations = load_validated_database(self.directory)
+        self.assertEqual(len(violations), 1)
+        self.assertIsInstance(violations[0], MissingValueViolation)
+        self.assertEqual(violations[0][:2], ("orders", "user_id"))
+        self.assertEqual(violations[0].index.tolist(), [2])
+        self.assertIn(2, db.orders.index)
+
+        db, violations = load_validated_database(self.directory, "drop")
+        self.assertNotIn(2, db.orders.index)
+        self.assertEqual(db.orders["user_id"].dtype, "int64")
+
+        with self.assertRaises(IntegrityError):
+            load_validated_database(self.directory, "fail")
@@ -0,0 +1,64 @@
+import unittest
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from app.join import find_unmatched_keys, join, key_positions
+from test.common import get_reduced_db
+
+
+class TestKeyPositions(unittest.TestCase):
+    def test_dense_keys(self):
+        index = pd.Index([3, 1, 2])
+        positions = key_positions(index, np.array([1, 2, 3, 4, -1, 1]))
+        self.assertEqual(positions.tolist(), [1, 2, 0, -1, -1, 1])
+
+    def test_sparse_keys_fall_back_to_hashing(self):
+        index = pd.Index([10**12, 5])
+        positions = key_positions(index, np.array([5, 10**12, 7]))
+        self.assertEqual(positions.tolist(), [1, 0, -1])
+
+    def test_non_integer_keys_fall_back_to_hashing(self):
+        index = pd.Index([3, 1, 2])
+        positions = key_positions(index, np.array([1.0, np.nan, 3.0]))
+        self.assertEqual(positions.tolist(), [1, -1, 0])
+
+
+class TestJoin(unittest.TestCase):
+    def setUp(self) -> None:
+        self.db = get_reduced_db()
+
+    def test_matches_merge_and_keeps_row_order(self):
+        orders = self.db.orders.iloc[::-1]
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            joined, unmatched = join(
+                orders, "food_id", self.db.food, ["cuisine", "price"]
+            )
+        expected = (
+            orders.reset_index()
+            .merge(self.db.food.reset_index(), on="food_id")
+            .set_index("order_id")[["cuisine", "price"]]
+        )
+        pd.testing.assert_frame_equal(joined, expected.loc[orders.index])
+        self.assertEqual(len(unmatched.rows), 0)
+
+    def test_unmatched_keys_are_reported(self):
+        orders = self.db.orders.assign(user_id=[1, 99, 2, 99, 3, 98, 4, 5, 6, 7])
+        joined, unmatched = join(orders, "user_id", self.db.users, ["birthdate"])
+        self.assertEqual(unmatched.column, "user_id")
+        self.assertEqual(unmatched.rows.tolist(), [1, 3, 5])
+        self.assertEqual(sorted(unmatched.keys.tolist()), [98, 99])
+        self.assertTrue(joined["birthdate"].iloc[[1, 3, 5]].isna().all())
+        self.assertEqual(joined["birthdate"].notna().sum(), 7)
+
+    def test_missing_keys_are_not_unmatched(self):
+        report = find_unmatched_keys(
+            self.db.orders.assign(promo_id=self.db.orders["promo_id"].fillna("NOPE")),
+            {"promo_id": self.db.promos, "food_id": self.db.food},
+        )
+        self.assertEqual(report["promo_id"].keys.tolist(), ["NOPE"])
+        self.assertEqual(len(report["food_id"].rows), 0)
+        report = find_unmatched_keys(self.db.orders, {"promo_id": self.db.promos})
+        self.assertEqual(len(report["promo_id"].rows), 0)
@@ -0,0 +1,67 @@
+import unittest
+
+import pandas as pd
+
+from app.dims_and_facts import (
+    MultiDimDatabase,
+    create_orders_by_meal_type_age_cuisine_table,
+    reduce_dims,
+)
+from app.lazy import lazy_database, lazy_reduced_database
+from app.schema import REDUCE_DIMS_SOURCE_COLUMNS
+from test.common import TABLES_DIR_PATH, get_reduced_db, get_table, load_all_tables
+
+
+class TestLazyDatabase(unittest.TestCase):
+    def test_tables_are_loaded_once_on_first_access(self):
+        db = lazy_database(TABLES_DIR_PATH)
+        self.assertEqual(db.used_tables, [])
+        self.assertIs(db.orders, db.orders)
+        self.assertEqual(db.used_tables, ["orders"])
+        with self.assertRaises(AttributeError):
+            db.payments
+
+    def test_materialized_database_equals_loaded_tables(self):
+        db = lazy_database(TABLES_DIR_PATH).materialize(MultiDimDatabase)
+        for expected, actual in zip(load_all_tables(), db):
+            self.assertIs(type(actual), pd.DataFrame)
+            pd.testing.assert_frame_equal(expected, actual)
+
+    def test_reduce_dims_reports_its_source_columns(self):
+        db = lazy_database(TABLES_DIR_PATH)
+        reduced = reduce_dims(db)
+        for expected, actual in zip(get_reduced_db(), reduced):
+            self.assertIs(type(actual), pd.DataFrame)
+            pd.testing.assert_frame_equal(expected, actual)
+        self.assertEqual(
+            db.used_columns,
+            {
+                table: columns
+                for table, columns in REDUCE_DIMS_SOURCE_COLUMNS.items()
+                if columns
+            },
+        )
+
+    def test_fact_table_only_reads_its_inputs(self):
+        db = lazy_database(TABLES_DIR_PATH)
+        reduced = lazy_reduced_database(db)
+        table = create_orders_by_meal_type_age_cuisine_table(reduced)
+        self.assertIs(type(table), pd.DataFrame)
+        pd.testing.assert_frame_equal(table, get_table())
+        self.assertEqual(reduced.used_tables, ["orders", "users", "food"])
+        self.assertEqual(
+            reduced.used_columns,
+            {
+                "orders": ["user_id", "food_id", "ordered_at"],
+                "users": ["birthdate"],
+                "food": ["cuisine"],
+            },
+        )
+        self.assertEqual(
+            db.used_tables, ["birthdates", "cuisines", "food", "orders", "users"]
+        )
+
+    def test_columns_restrict_parsed_columns(self):
+        db = lazy_database(TABLES_DIR_PATH, {"users": ["birthdate_id"]})
+        self.assertEqual(db.users.columns.tolist(), ["birthdate_id"])
+        self.assertEqual(db.food.columns.tolist(), ["name", "cuisine_id", "price"])
@@ -1,8 +1,12 @@
+import shutil
+import tempfile
 import unittest
+from pathlib import Path
+from unittest import mock
 
 import pandas as pd
 
-from app.dims_and_facts import load_tables
+from app.dims_and_facts import load_tables, load_tables_concurrently, read_table
 from test.common import (
     TABLES_DIR_PATH,
     TABLES_SCHEMA,
@@ -44,5 +48,46 @@ class TestLoadTables(TestCaseWithImplementationCheck):
             self.assertGreater(len(df), 0)
 
 
+class TestLoadTablesConcurrently(TestCaseWithImplementationCheck):
+    def test_tables_equal_sequentially_loaded_tables(self):
+        tables = list(TABLES_SCHEMA.keys())
+        sequential = load_tables_concurrently(TABLES_DIR_PATH, tables, max_workers=1)
+        concurrent = load_tables_concurrently(TABLES_DIR_PATH, tables, max_workers=4)
+        self.assertEqual(len(concurrent), len(tables))
+        for expected, actual in zip(sequential, concurrent):
+            pd.testing.assert_frame_equal(expected, actual)
+
+    def test_columns_are_parsed_with_explicit_types(self):
+        orders = load_single_table("orders")
+        self.assertEqual(orders.index.dtype, "int64")
+        self.assertEqual(orders["user_id"].dtype, "int64")
+        self.assertEqual(orders["ordered_at"].dtype, "datetime64[ns]")
+
+
+class TestMissingForeignKeys(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = Path(tempfile.mkdtemp())
+        orders = (TABLES_DIR_PATH / "orders.csv").read_text().splitlines()
+        # Blank the user_id of order 3
+        orders[3] = orders[3].replace("3,4,", "3,,", 1)
+        (self.directory / "orders.csv").write_text("\n".join(orders) + "\n")
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def assert_row_dropped(self):
+        orders = read_table(self.directory, "orders")
+        expected = read_table(TABLES_DIR_PATH, "orders").drop(3)
+        self.assertEqual(orders["user_id"].dtype, "int64")
+        pd.testing.assert_frame_equal(orders, expected)
+
+    def test_pyarrow_reader(self):
+        self.assert_row_dropped()
+
+    def test_pandas_reader(self):
+        with mock.patch("app.dims_and_facts.pa_csv", None):
+            self.assert_row_dropped()
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,84 @@
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from app.dims_and_facts import (
+    TABLES,
+    MultiDimDatabase,
+    create_orders_by_meal_type_age_cuisine_table,
+    load_tables,
+    read_table,
+    reduce_dims,
+)
+from app.metrics import PROMETHEUS_PREFIX, collect_metrics, stage
+from test.common import TABLES_DIR_PATH
+
+
+class TestMetrics(unittest.TestCase):
+    def test_nothing_is_recorded_when_disabled(self):
+        with collect_metrics() as recorder:
+            pass
+        with stage("load_tables") as metrics:
+            metrics.rows(1, 1)
+        self.assertEqual(recorder.records, [])
+
+    def test_every_stage_and_table_is_recorded(self):
+        with collect_metrics() as recorder:
+            db = reduce_dims(MultiDimDatabase(*load_tables(TABLES_DIR_PATH, TABLES)))
+            create_orders_by_meal_type_age_cuisine_table(db)
+
+        recorded = {(record.stage, record.table) for record in recorder.records}
+        for table in TABLES:
+            self.assertIn(("read_table", table), recorded)
+        for table in db._fields:
+            self.assertIn(("reduce_dims", table), recorded)
+        self.assertIn(("load_tables", None), recorded)
+        self.assertIn(("reduce_dims", None), recorded)
+        self.assertIn(("orders_by_meal_type_age_cuisine", "orders"), recorded)
+
+        for record in recorder.records:
+            self.assertGreaterEqual(record.wall_seconds, 0)
+            self.assertGreaterEqual(record.cpu_seconds, 0)
+            if record.table is not None:
+                self.assertEqual(record.rows_dropped, record.rows_in - record.rows_out)
+
+    def test_rows_dropped_by_load_are_counted(self):
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory)
+        food = pd.read_csv(TABLES_DIR_PATH / "food.csv")
+        food.loc[0, "price"] = None
+        food.to_csv(directory / "food.csv", index=False)
+
+        with collect_metrics() as recorder:
+            read_table(directory, "food")
+
+        (record,) = recorder.records
+        self.assertEqual(record.rows_in, len(food))
+        self.assertEqual(record.rows_out, len(food) - 1)
+        self.assertEqual(record.rows_dropped, 1)
+
+    def test_reports(self):
+        with collect_metrics() as recorder:
+            read_table(TABLES_DIR_PATH, "cuisines")
+            read_table(TABLES_DIR_PATH, "cuisines")
+
+        report = json.loads(recorder.to_json())
+        self.assertEqual(len(report), 2)
+        self.assertEqual(report[0]["stage"], "read_table")
+        self.assertEqual(report[0]["table"], "cuisines")
+
+        lines = recorder.to_prometheus().splitlines()
+        rows_out = [
+            line for line in lines if line.startswith(PROMETHEUS_PREFIX + "rows_out{")
+        ]
+        self.assertEqual(
+            rows_out,
+            [
+                '%srows_out{stage="read_table",table="cuisines"} %d'
+                % (PROMETHEUS_PREFIX, report[-1]["rows_out"])
+            ],
+        )
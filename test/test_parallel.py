@@ -0,0 +1,60 @@
+import unittest
+
+import pandas as pd
+
+from app.dims_and_facts import (
+    MultiDimDatabase,
+    create_orders_by_meal_type_age_cuisine_table_compact,
+    reduce_dims_compact,
+)
+from app.parallel import (
+    build_orders_by_meal_type_age_cuisine_parallel,
+    partition_orders,
+)
+from test.common import get_reduced_db, get_table, load_all_tables
+
+
+class TestPartitionOrders(unittest.TestCase):
+    def test_sorted_orders_are_sliced(self):
+        orders = get_reduced_db().orders
+        chunks = partition_orders(orders, 3)
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 4])
+        pd.testing.assert_frame_equal(pd.concat(chunks), orders)
+
+    def test_unsorted_orders_are_split_by_key_range(self):
+        orders = get_reduced_db().orders.iloc[::-1]
+        chunks = partition_orders(orders, 2)
+        self.assertEqual(chunks[0].index.max(), 5)
+        self.assertEqual(chunks[1].index.min(), 6)
+        # Rows keep their order within each partition
+        self.assertEqual(chunks[1].index.tolist(), [10, 9, 8, 7, 6])
+        pd.testing.assert_frame_equal(pd.concat(chunks[::-1]), orders)
+
+
+class TestParallelBuilder(unittest.TestCase):
+    def test_matches_single_process_table(self):
+        table = build_orders_by_meal_type_age_cuisine_parallel(
+            get_reduced_db(), partitions=3, max_workers=2
+        )
+        pd.testing.assert_frame_equal(table, get_table())
+
+    def test_unsorted_orders_give_sorted_table(self):
+        db = get_reduced_db()
+        db = db._replace(orders=db.orders.sample(frac=1, random_state=0))
+        table = build_orders_by_meal_type_age_cuisine_parallel(
+            db, partitions=4, max_workers=1
+        )
+        pd.testing.assert_frame_equal(table, get_table())
+
+    def test_compact_partitions(self):
+        db = reduce_dims_compact(MultiDimDatabase(*load_all_tables()))
+        table = build_orders_by_meal_type_age_cuisine_parallel(
+            db, partitions=2, max_workers=2, compact=True
+        )
+        pd.testing.assert_frame_equal(
+            table, create_orders_by_meal_type_age_cuisine_table_compact(db)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+from app.dims_and_facts import (
+    TABLES,
+    MultiDimDatabase,
+    create_orders_by_meal_type_age_cuisine_table,
+    empty_table,
+    iter_file_chunks,
+    iter_table_chunks,
+    load_tables,
+    read_table,
+    reduce_dims,
+)
+from app.partitions import discover_partitions, prune_partitions
+from app.pushdown import OrdersPredicate, read_orders
+from app.snapshot import SnapshotStore
+from test.common import TABLES_DIR_PATH, get_table
+
+
+class TestPartitionedTables(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = Path(tempfile.mkdtemp())
+        shutil.copytree(TABLES_DIR_PATH, self.directory, dirs_exist_ok=True)
+        (self.directory / "orders.csv").unlink()
+        self.orders = read_table(TABLES_DIR_PATH, "orders")
+        months = self.orders["ordered_at"].dt.strftime("%Y-%m")
+        for month, orders in self.orders.groupby(months):
+            partition = self.directory / "orders" / ("ordered_month=" + month)
+            partition.mkdir(parents=True)
+            # Every month is split into a plain and a compressed file
+            suffixes = [".csv", ".csv.gz"]
+            for part, rows in enumerate([orders.iloc[:1], orders.iloc[1:]]):
+                rows.to_csv(partition / ("part-%d%s" % (part, suffixes[part])))
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_discovery(self):
+        partitions = discover_partitions(self.directory / "orders")
+        self.assertEqual(len(partitions), 8)
+        self.assertEqual(
+            [partition.values for partition in partitions[:2]],
+            [{"ordered_month": "2020-01"}] * 2,
+        )
+        self.assertEqual(partitions[1].path.name, "part-1.csv.gz")
+
+    def test_pruning(self):
+        partitions = discover_partitions(self.directory / "orders")
+        kept = prune_partitions(partitions, "ordered_at", "2020-02-15", "2020-04-01")
+        self.assertEqual(
+            sorted({partition.values["ordered_month"] for partition in kept}),
+            ["2020-02", "2020-03"],
+        )
+        self.assertEqual(prune_partitions(partitions, "user_id", 1, 2), partitions)
+
+    def test_read_table_concatenates_partitions(self):
+        pd.testing.assert_frame_equal(
+            read_table(self.directory, "orders").sort_index(), self.orders
+        )
+        chunks = list(iter_table_chunks(self.directory, "orders", 2))
+        pd.testing.assert_frame_equal(pd.concat(chunks).sort_index(), self.orders)
+
+    def test_xz_partitions_are_read(self):
+        partition = self.directory / "orders" / "ordered_month=2020-02"
+        gz_path = partition / "part-1.csv.gz"
+        pd.read_csv(gz_path).to_csv(partition / "part-1.csv.xz", index=False)
+        gz_path.unlink()
+        pd.testing.assert_frame_equal(
+            read_table(self.directory, "orders").sort_index(), self.orders
+        )
+        with mock.patch("app.dims_and_facts.pa_csv", None):
+            pd.testing.assert_frame_equal(
+                read_table(self.directory, "orders").sort_index(), self.orders
+            )
+
+    def test_pipeline_reads_partitioned_orders(self):
+        db = MultiDimDatabase(*load_tables(self.directory, TABLES))
+        pd.testing.assert_frame_equal(
+            create_orders_by_meal_type_age_cuisine_table(reduce_dims(db)), get_table()
+        )
+
+    def test_date_filter_only_reads_overlapping_partitions(self):
+        predicate = OrdersPredicate(ordered_from="2020-04-01")
+        with mock.patch(
+            "app.pushdown.iter_file_chunks", wraps=iter_file_chunks
+        ) as read:
+            orders = read_orders(self.directory, predicate, chunksize=1)
+        read_months = {call.args[0].parent.name for call in read.call_args_list}
+        self.assertEqual(read_months, {"ordered_month=2020-04"})
+        expected = self.orders[self.orders["ordered_at"] >= "2020-04-01"]
+        pd.testing.assert_frame_equal(orders.sort_index(), expected)
+
+    def test_everything_pruned(self):
+        orders = read_orders(
+            self.directory, OrdersPredicate(ordered_until="2019-01-01")
+        )
+        pd.testing.assert_frame_equal(orders, empty_table("orders"))
+        pd.testing.assert_frame_equal(orders, self.orders.iloc[:0])
+
+    def test_snapshot_key_covers_every_partition(self):
+        store = SnapshotStore(self.directory / "snapshots")
+        key = store.fingerprint(self.directory, ["orders"])
+        self.assertEqual(store.fingerprint(self.directory, ["orders"]), key)
+        partition = self.directory / "orders" / "ordered_month=2020-03" / "part-0.csv"
+        partition.write_text(partition.read_text().replace("FRIES10OFF", "NYSTYLE"))
+        self.assertNotEqual(store.fingerprint(self.directory, ["orders"]), key)
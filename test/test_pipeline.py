@@ -0,0 +1,121 @@
+import threading
+import unittest
+
+import pandas as pd
+
+from app.pipeline import Pipeline, Stage, reduce_dims_pipeline, shared_pipeline
+from test.common import TABLES_DIR_PATH, get_reduced_db, get_table
+
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self) -> None:
+        self.calls = []
+
+    def stage(self, name, run, inputs=()):
+        def counted(*args):
+            self.calls.append(name)
+            return run(*args)
+
+        return Stage(name, counted, inputs)
+
+    def pipeline(self) -> Pipeline:
+        pipeline = Pipeline(
+            [
+                self.stage("a", lambda: 1),
+                self.stage("b", lambda: 2),
+                self.stage("sum", lambda a, b: a + b, ("a", "b")),
+                self.stage("double", lambda total: 2 * total, ("sum",)),
+            ],
+            max_workers=2,
+        )
+        self.addCleanup(pipeline.close)
+        return pipeline
+
+    def test_each_stage_runs_once(self):
+        pipeline = self.pipeline()
+        self.assertEqual(pipeline.result("double"), 6)
+        self.assertEqual(pipeline.results(["sum", "double", "a"]), [3, 6, 1])
+        self.assertEqual(sorted(self.calls), ["a", "b", "double", "sum"])
+
+    def test_invalidation_reaches_dependents_only(self):
+        pipeline = self.pipeline()
+        pipeline.result("double")
+        self.assertEqual(pipeline.invalidate("b"), ["b", "double", "sum"])
+        self.assertTrue(pipeline.is_memoized("a"))
+        self.assertFalse(pipeline.is_memoized("sum"))
+        self.calls.clear()
+        self.assertEqual(pipeline.result("double"), 6)
+        self.assertEqual(sorted(self.calls), ["b", "double", "sum"])
+        pipeline.invalidate()
+        self.assertFalse(pipeline.is_memoized("a"))
+
+    def test_independent_branches_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+        pipeline = Pipeline(
+            [
+                Stage("left", barrier.wait),
+                Stage("right", barrier.wait),
+                Stage("both", lambda left, right: (left, right), ("left", "right")),
+            ],
+            max_workers=2,
+        )
+        self.addCleanup(pipeline.close)
+        # Both branches only return once they are waiting on the barrier together
+        self.assertEqual(sorted(pipeline.result("both", timeout=10)), [0, 1])
+
+    def test_concurrent_callers_share_one_run(self):
+        pipeline = self.pipeline()
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(pipeline.result("double")))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [6] * 8)
+        self.assertEqual(self.calls.count("double"), 1)
+
+    def test_failures_are_not_memoized(self):
+        attempts = []
+
+        def flaky():
+            attempts.append(None)
+            if len(attempts) == 1:
+                raise OSError("unavailable")
+            return 1
+
+        pipeline = Pipeline(
+            [Stage("flaky", flaky), Stage("next", lambda v: v, ("flaky",))]
+        )
+        self.addCleanup(pipeline.close)
+        with self.assertRaises(OSError):
+            pipeline.result("next")
+        self.assertEqual(pipeline.result("next"), 1)
+
+    def test_unknown_inputs(self):
+        with self.assertRaises(ValueError):
+            Pipeline([Stage("a", lambda b: b, ("b",))])
+
+    def test_reduce_dims_pipeline(self):
+        pipeline = reduce_dims_pipeline(TABLES_DIR_PATH)
+        self.addCleanup(pipeline.close)
+        reduced = pipeline.result("reduced_database")
+        for expected, actual in zip(get_reduced_db(), reduced):
+            pd.testing.assert_frame_equal(expected, actual)
+        pd.testing.assert_frame_equal(
+            pipeline.result("orders_by_meal_type_age_cuisine"), get_table()
+        )
+
+    def test_shared_pipeline_is_shared(self):
+        pipeline = shared_pipeline(TABLES_DIR_PATH)
+        self.assertIs(shared_pipeline(), pipeline)
+        self.assertIs(shared_pipeline(TABLES_DIR_PATH / "."), pipeline)
+        self.assertIs(
+            pipeline.result("reduced_database"), pipeline.result("reduced_database")
+        )
+        for expected, actual in zip(
+            get_reduced_db(), pipeline.result("reduced_database")
+        ):
+            pd.testing.assert_frame_equal(expected, actual)
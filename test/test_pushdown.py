@@ -0,0 +1,104 @@
+import unittest
+
+import pandas as pd
+
+from app.dims_and_facts import (
+    TABLES,
+    create_orders_by_meal_type_age_cuisine_table,
+    read_table,
+    reduce_dims,
+)
+from app.pushdown import (
+    OrdersPredicate,
+    load_database_with_predicate,
+    load_tables_with_predicate,
+    read_orders,
+)
+from app.schema import FOREIGN_KEYS, TABLE_SCHEMAS
+from app.streaming import iter_orders_by_meal_type_age_cuisine
+from test.common import TABLES_DIR_PATH, get_table
+
+
+class TestPushdown(unittest.TestCase):
+    def setUp(self) -> None:
+        self.orders = read_table(TABLES_DIR_PATH, "orders")
+
+    def assertOrders(self, predicate: OrdersPredicate, expected: pd.DataFrame):
+        for chunksize in (3, 100):
+            pd.testing.assert_frame_equal(
+                read_orders(TABLES_DIR_PATH, predicate, chunksize), expected
+            )
+
+    def test_no_predicate_reads_every_order(self):
+        self.assertOrders(OrdersPredicate(), self.orders)
+
+    def test_date_range_is_half_open(self):
+        predicate = OrdersPredicate(
+            ordered_from="2020-02-12 14:04:04", ordered_until="2020-04-14 15:49:23"
+        )
+        ordered_at = self.orders["ordered_at"]
+        expected = self.orders[
+            (ordered_at >= "2020-02-12 14:04:04") & (ordered_at < "2020-04-14 15:49:23")
+        ]
+        self.assertOrders(predicate, expected)
+
+    def test_key_filters(self):
+        predicate = OrdersPredicate(restaurant_ids=[5, 6], user_ids={2, 3, 6})
+        self.assertOrders(predicate, self.orders.loc[[5, 6, 7]])
+
+    def test_promo_filter_can_accept_orders_without_promo(self):
+        self.assertOrders(
+            OrdersPredicate(promo_ids=["PIZZAEMPIRE"]), self.orders.loc[[4, 5]]
+        )
+        without_promo = self.orders[self.orders["promo_id"].isna()]
+        self.assertOrders(OrdersPredicate(promo_ids=[None]), without_promo)
+
+    def test_dimensions_only_keep_referenced_rows(self):
+        db = load_database_with_predicate(
+            TABLES_DIR_PATH, OrdersPredicate(user_ids=[6])
+        )
+        self.assertEqual(db.orders.index.tolist(), [7, 8])
+        self.assertEqual(db.users.index.tolist(), [6])
+        self.assertEqual(db.restaurants.index.tolist(), [6, 7])
+        self.assertEqual(db.promos.index.tolist(), ["NYSTYLE"])
+        self.assertEqual(db.addresses.index.tolist(), [11])
+        for source, keys in FOREIGN_KEYS.items():
+            for column, target in keys.items():
+                referenced = getattr(db, source)[column].dropna()
+                self.assertTrue(referenced.isin(getattr(db, target).index).all())
+
+    def test_tables_without_orders_are_not_reduced(self):
+        tables = ["users", "food"]
+        for table, dataframe in zip(
+            tables,
+            load_tables_with_predicate(
+                TABLES_DIR_PATH, tables, OrdersPredicate(user_ids=[6])
+            ),
+        ):
+            pd.testing.assert_frame_equal(dataframe, read_table(TABLES_DIR_PATH, table))
+
+    def test_fact_table_of_filtered_orders(self):
+        predicate = OrdersPredicate(ordered_until="2020-03-01")
+        table = create_orders_by_meal_type_age_cuisine_table(
+            reduce_dims(load_database_with_predicate(TABLES_DIR_PATH, predicate))
+        )
+        expected = get_table().loc[
+            self.orders.index[self.orders["ordered_at"] < "2020-03-01"]
+        ]
+        pd.testing.assert_frame_equal(table, expected)
+        streamed = pd.concat(
+            iter_orders_by_meal_type_age_cuisine(
+                TABLES_DIR_PATH, chunksize=4, predicate=predicate
+            )
+        )
+        pd.testing.assert_frame_equal(streamed, expected)
+
+    def test_foreign_keys_reference_indices(self):
+        for source, keys in FOREIGN_KEYS.items():
+            self.assertIn(source, TABLES)
+            for column, target in keys.items():
+                self.assertIn(column, dict(TABLE_SCHEMAS[source].columns))
+                self.assertEqual(
+                    dict(TABLE_SCHEMAS[source].columns)[column],
+                    TABLE_SCHEMAS[target].index_dtype,
+                )
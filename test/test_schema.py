@@ -0,0 +1,84 @@
+import unittest
+from unittest import mock
+
+from app.dims_and_facts import load_tables_for_reduce_dims, read_table, reduce_dims
+from app.schema import (
+    ORDERS_BY_MEAL_TYPE_AGE_CUISINE_SCHEMA,
+    REDUCED_TABLE_SCHEMAS,
+    TABLE_SCHEMAS,
+    column_names,
+)
+from test.common import (
+    REDUCED_TABLES_SCHEMA,
+    TABLE_ORDERS_BY_MEAL_TYPE_AGE_CUISINE,
+    TABLES_DIR_PATH,
+    TABLES_SCHEMA,
+    get_sorted_column_names_from_df,
+    get_sorted_column_names_from_schema,
+    get_sorted_column_types_from_df,
+    get_sorted_column_types_from_schema,
+)
+
+
+class TestSchemaRegistry(unittest.TestCase):
+    def test_tables_match_expected_layout(self):
+        self.assertEqual(sorted(TABLE_SCHEMAS.keys()), sorted(TABLES_SCHEMA.keys()))
+        for table, info in TABLES_SCHEMA.items():
+            schema = TABLE_SCHEMAS[table]
+            self.assertEqual(schema.index, info["index"])
+            self.assertEqual(column_names(schema), info["columns"])
+
+    def test_reduced_tables_match_expected_layout(self):
+        self.assertEqual(
+            sorted(REDUCED_TABLE_SCHEMAS.keys()), sorted(REDUCED_TABLES_SCHEMA.keys())
+        )
+        for table, info in REDUCED_TABLES_SCHEMA.items():
+            schema = REDUCED_TABLE_SCHEMAS[table]
+            self.assertEqual(schema.index, info["index"])
+            self.assertEqual(sorted(schema.columns), sorted(info["columns"]))
+
+    def test_derived_table_matches_expected_layout(self):
+        schema = ORDERS_BY_MEAL_TYPE_AGE_CUISINE_SCHEMA
+        self.assertEqual(schema.index, TABLE_ORDERS_BY_MEAL_TYPE_AGE_CUISINE["index"])
+        self.assertEqual(
+            sorted(schema.columns),
+            sorted(TABLE_ORDERS_BY_MEAL_TYPE_AGE_CUISINE["columns"]),
+        )
+
+    def test_nullable_columns_keep_missing_values(self):
+        db = load_tables_for_reduce_dims(TABLES_DIR_PATH)
+        self.assertEqual(len(db.orders), 10)
+        self.assertTrue(db.orders["promo_id"].isna().any())
+
+    def test_missing_strings_are_nan_whichever_the_reader(self):
+        orders = read_table(TABLES_DIR_PATH, "orders")
+        with mock.patch("app.dims_and_facts.pa_csv", None):
+            pandas_orders = read_table(TABLES_DIR_PATH, "orders")
+        for promo_ids in (orders["promo_id"], pandas_orders["promo_id"]):
+            missing = promo_ids[promo_ids.isna()].tolist()
+            self.assertTrue(missing)
+            self.assertTrue(all(isinstance(value, float) for value in missing))
+
+
+class TestLoadTablesForReduceDims(unittest.TestCase):
+    def test_only_needed_columns_are_read(self):
+        db = load_tables_for_reduce_dims(TABLES_DIR_PATH)
+        self.assertEqual(db.birthdates.columns.tolist(), ["year", "month", "day"])
+        self.assertEqual(db.cities.columns.tolist(), ["name", "state_id"])
+
+    def test_reduced_tables_have_correct_column_types(self):
+        reduced_db = reduce_dims(load_tables_for_reduce_dims(TABLES_DIR_PATH))
+        for table, info in REDUCED_TABLES_SCHEMA.items():
+            df = getattr(reduced_db, table)
+            self.assertEqual(
+                get_sorted_column_names_from_df(df),
+                get_sorted_column_names_from_schema(info),
+            )
+            self.assertEqual(
+                get_sorted_column_types_from_df(df),
+                get_sorted_column_types_from_schema(info),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+from app import snapshot
+from app.dims_and_facts import TABLES, load_tables
+from app.snapshot import SnapshotStore, load_database, load_reduced_addresses
+from test.common import TABLES_DIR_PATH, get_reduced_db
+
+
+class TestSnapshotStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = Path(tempfile.mkdtemp())
+        self.tables_dir_path = self.directory / "tables"
+        shutil.copytree(TABLES_DIR_PATH, self.tables_dir_path)
+        self.store = SnapshotStore(self.directory / "snapshots")
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def snapshots(self):
+        return [
+            path.name
+            for path in self.store.directory.iterdir()
+            if (path / "COMPLETE").exists()
+        ]
+
+    def test_warm_start_does_not_parse_csv_files(self):
+        cold = load_database(self.tables_dir_path, self.store)
+        with mock.patch("app.snapshot.load_tables") as load:
+            warm = load_database(self.tables_dir_path, self.store)
+            load.assert_not_called()
+        for expected, actual in zip(cold, warm):
+            pd.testing.assert_frame_equal(expected, actual)
+
+    def test_snapshot_equals_loaded_tables(self):
+        db = load_database(self.tables_dir_path, self.store)
+        db = load_database(self.tables_dir_path, self.store)
+        for expected, actual in zip(load_tables(self.tables_dir_path, TABLES), db):
+            pd.testing.assert_frame_equal(expected, actual)
+
+    def test_changed_csv_invalidates_snapshot(self):
+        load_database(self.tables_dir_path, self.store)
+        stale = self.snapshots()
+        with open(self.tables_dir_path / "promos.csv", "a") as file:
+            file.write("\nBIGSALE,0.3\n")
+        db = load_database(self.tables_dir_path, self.store)
+        self.assertIn("BIGSALE", db.promos.index)
+        self.assertEqual(len(self.snapshots()), 1)
+        self.assertNotEqual(self.snapshots(), stale)
+
+    def test_snapshots_are_evicted_under_size_budget(self):
+        self.store.max_bytes = 1
+        load_database(self.tables_dir_path, self.store)
+        other_tables_dir_path = self.directory / "other"
+        shutil.copytree(self.tables_dir_path, other_tables_dir_path)
+        with open(other_tables_dir_path / "promos.csv", "a") as file:
+            file.write("\nBIGSALE,0.3\n")
+        load_database(other_tables_dir_path, self.store)
+        self.assertEqual(len(self.snapshots()), 1)
+
+    def test_directories_with_the_same_files_keep_their_snapshots(self):
+        other_tables_dir_path = self.directory / "other"
+        shutil.copytree(self.tables_dir_path, other_tables_dir_path)
+        load_database(self.tables_dir_path, self.store)
+        load_database(other_tables_dir_path, self.store)
+        self.assertEqual(len(self.snapshots()), 2)
+        with open(self.tables_dir_path / "promos.csv", "a") as file:
+            file.write("\nBIGSALE,0.3\n")
+        load_database(self.tables_dir_path, self.store)
+        self.assertEqual(len(self.snapshots()), 2)
+        with mock.patch("app.snapshot.load_tables") as load:
+            load_database(other_tables_dir_path, self.store)
+            load.assert_not_called()
+
+    def test_reduced_addresses_are_reused_across_runs(self):
+        cold = load_reduced_addresses(self.tables_dir_path, self.store)
+        with mock.patch("app.snapshot._reduce_addresses") as reduce:
+            warm = load_reduced_addresses(self.tables_dir_path, self.store)
+            reduce.assert_not_called()
+        pd.testing.assert_frame_equal(cold, get_reduced_db().addresses)
+        pd.testing.assert_frame_equal(warm, cold)
+
+    def test_reduced_addresses_version_invalidates_snapshot(self):
+        load_reduced_addresses(self.tables_dir_path, self.store)
+        with mock.patch("app.snapshot.REDUCED_ADDRESSES_VERSION", -1), mock.patch(
+            "app.snapshot._reduce_addresses", wraps=snapshot._reduce_addresses
+        ) as reduce:
+            load_reduced_addresses(self.tables_dir_path, self.store)
+            reduce.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from app.dims_and_facts import (
+    TABLES,
+    MultiDimDatabase,
+    create_orders_by_meal_type_age_cuisine_table,
+    load_tables,
+    reduce_dims,
+)
+from app.sqlite import (
+    create_orders_by_meal_type_age_cuisine_table_sqlite,
+    iter_orders_by_meal_type_age_cuisine_sqlite,
+    iter_reduced_table,
+    load_tables_into_sqlite,
+    reduce_dims_sqlite,
+)
+from test.common import TABLES_DIR_PATH, get_reduced_db, get_table
+
+
+class TestSqlite(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = Path(tempfile.mkdtemp())
+        self.connection = sqlite3.connect(self.directory / "tables.db")
+
+    def tearDown(self) -> None:
+        self.connection.close()
+        shutil.rmtree(self.directory)
+
+    def assertMatchesPandas(self, tables_dir_path: Path):
+        load_tables_into_sqlite(tables_dir_path, self.connection, batch_size=4)
+        expected = reduce_dims(MultiDimDatabase(*load_tables(tables_dir_path, TABLES)))
+        actual = reduce_dims_sqlite(self.connection, batch_size=3)
+        for table in expected._fields:
+            pd.testing.assert_frame_equal(
+                getattr(actual, table), getattr(expected, table)
+            )
+        pd.testing.assert_frame_equal(
+            create_orders_by_meal_type_age_cuisine_table_sqlite(self.connection),
+            create_orders_by_meal_type_age_cuisine_table(expected),
+        )
+
+    def test_results_match_pandas(self):
+        self.assertMatchesPandas(TABLES_DIR_PATH)
+
+    def test_edge_cases_match_pandas(self):
+        tables_dir_path = self.directory / "tables"
+        shutil.copytree(TABLES_DIR_PATH, tables_dir_path)
+        birthdates = pd.read_csv(tables_dir_path / "birthdates.csv")
+        # An invalid date, and an id only known from the users
+        birthdates.loc[0, ["month", "day"]] = [2, 30]
+        birthdates.drop(index=1).to_csv(tables_dir_path / "birthdates.csv", index=False)
+        orders = pd.read_csv(tables_dir_path / "orders.csv")
+        orders.loc[:2, "ordered_at"] = [
+            "2020-01-01 06:00:00",
+            "2020-01-01 10:00:00",
+            "2020-01-01 16:00:00",
+        ]
+        orders.to_csv(tables_dir_path / "orders.csv", index=False)
+
+        self.assertMatchesPandas(tables_dir_path)
+        self.assertEqual(
+            create_orders_by_meal_type_age_cuisine_table_sqlite(self.connection)[
+                "meal_type"
+            ].tolist()[:3],
+            ["dinner", "lunch", "lunch"],
+        )
+
+    def test_meal_type_bins_match_pandas_within_seconds(self):
+        load_tables_into_sqlite(TABLES_DIR_PATH, self.connection)
+        # Exported timestamps hold nanoseconds, others may have fewer digits
+        ordered_at = {
+            1: "2020-01-01T06:00:00.000000001",
+            2: "2020-01-01T09:59:59.999999999",
+            3: "2020-01-01T10:00:00.5",
+            4: "2020-01-01T16:00:00.000000001",
+            5: "2020-01-01T16:00:00",
+            6: "2020-01-01T06:00:00",
+        }
+        self.connection.executemany(
+            "UPDATE orders SET ordered_at = ? WHERE order_id = ?",
+            [(value, order_id) for order_id, value in ordered_at.items()],
+        )
+        db = get_reduced_db()
+        orders = db.orders.copy()
+        for order_id, value in ordered_at.items():
+            orders.loc[order_id, "ordered_at"] = pd.Timestamp(value)
+        expected = create_orders_by_meal_type_age_cuisine_table(
+            db._replace(orders=orders)
+        )
+        actual = create_orders_by_meal_type_age_cuisine_table_sqlite(self.connection)
+        pd.testing.assert_frame_equal(actual, expected)
+        self.assertEqual(
+            actual["meal_type"].tolist()[:6],
+            ["breakfast", "breakfast", "lunch", "dinner", "lunch", "dinner"],
+        )
+
+    def test_results_are_streamed_in_batches(self):
+        load_tables_into_sqlite(TABLES_DIR_PATH, self.connection)
+        batches = list(iter_reduced_table(self.connection, "orders", batch_size=4))
+        self.assertEqual([len(batch) for batch in batches], [4, 4, 2])
+        pd.testing.assert_frame_equal(pd.concat(batches), get_reduced_db().orders)
+        batches = list(
+            iter_orders_by_meal_type_age_cuisine_sqlite(self.connection, batch_size=5)
+        )
+        self.assertEqual([len(batch) for batch in batches], [5, 5])
+        pd.testing.assert_frame_equal(pd.concat(batches), get_table())
+
+    def test_lookups_use_the_key_indexes(self):
+        load_tables_into_sqlite(TABLES_DIR_PATH, self.connection)
+        indexes = {
+            name
+            for (name,) in self.connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index'"
+            )
+        }
+        for table in TABLES:
+            self.assertIn(table + "_pkey", indexes)
+        self.assertIn("orders_user_id", indexes)
+        self.assertIn("users_birthdate_id", indexes)
+
+    def test_empty_query_yields_an_empty_frame(self):
+        load_tables_into_sqlite(TABLES_DIR_PATH, self.connection)
+        self.connection.execute("DELETE FROM orders")
+        (orders,) = iter_reduced_table(self.connection, "orders")
+        self.assertEqual(len(orders), 0)
+        self.assertEqual(list(orders.columns), list(get_reduced_db().orders.columns))
@@ -0,0 +1,40 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from app.streaming import (
+    iter_orders_by_meal_type_age_cuisine,
+    iter_reduced_orders,
+    write_orders_by_meal_type_age_cuisine,
+)
+from test.common import TABLES_DIR_PATH, get_reduced_db, get_table
+
+
+class TestStreaming(unittest.TestCase):
+    def test_reduced_orders_are_read_in_chunks(self):
+        chunks = list(iter_reduced_orders(TABLES_DIR_PATH, chunksize=3))
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 3, 1])
+        pd.testing.assert_frame_equal(pd.concat(chunks), get_reduced_db().orders)
+
+    def test_chunks_concatenate_to_whole_table(self):
+        chunks = list(
+            iter_orders_by_meal_type_age_cuisine(TABLES_DIR_PATH, chunksize=4)
+        )
+        self.assertEqual(len(chunks), 3)
+        pd.testing.assert_frame_equal(pd.concat(chunks), get_table())
+
+    def test_table_is_written_to_csv(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output_path = Path(directory) / "orders_by_meal_type_age_cuisine.csv"
+            rows = write_orders_by_meal_type_age_cuisine(
+                TABLES_DIR_PATH, output_path, chunksize=4
+            )
+            written = pd.read_csv(output_path, index_col="order_id")
+        self.assertEqual(rows, 10)
+        pd.testing.assert_frame_equal(written, get_table(), check_like=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from app.cube import build_cube, rollup
+from app.dims_and_facts import (
+    MultiDimDatabase,
+    create_orders_by_meal_type_age_cuisine_table,
+    reduce_dims,
+)
+from app.surrogate import KeyMap, decode_database, encode_database
+from test.common import get_reduced_db, get_table, load_all_tables
+
+
+class TestKeyMap(unittest.TestCase):
+    def test_round_trip(self):
+        key_map = KeyMap(pd.Index(["A", "B"]))
+        codes = key_map.encode(["B", None, "C", "A", "C"])
+        self.assertEqual(codes.dtype, np.int32)
+        self.assertEqual(codes.tolist(), [1, -1, 2, 0, 2])
+        self.assertEqual(len(key_map), 3)
+        decoded = key_map.decode(codes)
+        self.assertEqual(decoded[[0, 2, 3, 4]].tolist(), ["B", "C", "A", "C"])
+        self.assertTrue(pd.isna(decoded[1]))
+
+
+class TestEncodeDatabase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.db = MultiDimDatabase(*load_all_tables())
+        self.encoded, self.key_maps = encode_database(self.db)
+
+    def test_string_keys_become_integers(self):
+        self.assertEqual(sorted(self.key_maps), ["birthdates", "promos"])
+        self.assertEqual(self.encoded.orders["promo_id"].dtype, np.int32)
+        self.assertEqual(self.encoded.users["birthdate_id"].dtype, np.int32)
+        self.assertEqual(self.encoded.promos.index.dtype.kind, "i")
+        self.assertEqual(self.encoded.birthdates.index.dtype.kind, "i")
+
+    def test_round_trip(self):
+        for expected, actual in zip(
+            self.db, decode_database(self.encoded, self.key_maps)
+        ):
+            pd.testing.assert_frame_equal(expected, actual)
+
+    def test_pipeline_runs_on_codes(self):
+        reduced = reduce_dims(self.encoded)
+        self.assertEqual(reduced.orders["promo_id"].dtype, np.int32)
+        pd.testing.assert_frame_equal(
+            create_orders_by_meal_type_age_cuisine_table(reduced), get_table()
+        )
+        for expected, actual in zip(
+            get_reduced_db(), decode_database(reduced, self.key_maps)
+        ):
+            pd.testing.assert_frame_equal(expected, actual)
+        pd.testing.assert_frame_equal(
+            rollup(build_cube(reduced), ["meal_type"]),
+            rollup(build_cube(get_reduced_db()), ["meal_type"]),
+        )
+
+    def test_unknown_natural_keys_survive_round_trip(self):
+        db = self.db._replace(
+            orders=self.db.orders.assign(
+                promo_id=self.db.orders["promo_id"].fillna("GONE")
+            )
+        )
+        encoded, key_maps = encode_database(db)
+        self.assertFalse(encoded.orders["promo_id"].isin(encoded.promos.index).all())
+        pd.testing.assert_frame_equal(
+            decode_database(encoded, key_maps).orders, db.orders
+        )
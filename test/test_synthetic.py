@@ -0,0 +1,79 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from app.dims_and_facts import (
+    TABLES,
+    MultiDimDatabase,
+    create_orders_by_meal_type_age_cuisine_table,
+    load_tables,
+    reduce_dims,
+)
+from app.synthetic import generate_tables
+from test.common import TABLES_SCHEMA
+
+
+class TestGenerateTables(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.tables_dir_path = Path(cls.directory.name)
+        cls.sizes = generate_tables(cls.tables_dir_path, 5_000, chunksize=2_000)
+        cls.db = MultiDimDatabase(*load_tables(cls.tables_dir_path, TABLES))
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.directory.cleanup()
+
+    def test_tables_have_expected_layout(self):
+        for table, info in TABLES_SCHEMA.items():
+            df = getattr(self.db, table)
+            self.assertEqual(df.index.name, info["index"])
+            self.assertEqual(df.columns.tolist(), info["columns"])
+            self.assertEqual(len(df), self.sizes.get(table, len(df)))
+
+    def test_foreign_keys_are_consistent(self):
+        db = self.db
+        references = [
+            (db.orders["user_id"], db.users),
+            (db.orders["address_id"], db.addresses),
+            (db.orders["restaurant_id"], db.restaurants),
+            (db.orders["food_id"], db.food),
+            (db.orders["promo_id"].dropna(), db.promos),
+            (db.users["birthdate_id"], db.birthdates),
+            (db.food["cuisine_id"], db.cuisines),
+            (db.restaurants["address_id"], db.addresses),
+            (db.addresses["district_id"], db.districts),
+            (db.districts["city_id"], db.cities),
+            (db.cities["state_id"], db.states),
+            (db.states["country_id"], db.countries),
+        ]
+        for keys, table in references:
+            self.assertTrue(keys.isin(table.index).all(), keys.name)
+
+    def test_order_ids_are_unique_and_sorted(self):
+        self.assertTrue(self.db.orders.index.is_unique)
+        self.assertTrue(self.db.orders.index.is_monotonic_increasing)
+
+    def test_popularity_is_skewed(self):
+        orders_per_user = self.db.orders["user_id"].value_counts()
+        self.assertGreater(orders_per_user.iloc[0], 5 * orders_per_user.mean())
+
+    def test_pipeline_runs_on_generated_tables(self):
+        table = create_orders_by_meal_type_age_cuisine_table(reduce_dims(self.db))
+        self.assertEqual(len(table), 5_000)
+        self.assertFalse(table.isna().any().any())
+
+    def test_generation_is_deterministic(self):
+        with tempfile.TemporaryDirectory() as directory:
+            generate_tables(Path(directory), 5_000, chunksize=2_000)
+            pd.testing.assert_frame_equal(
+                pd.read_csv(Path(directory) / "orders.csv"),
+                pd.read_csv(self.tables_dir_path / "orders.csv"),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()